@@ -4,3 +4,10 @@ import os
 import sys
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def pytest_configure(config):
+    # Test groups, e.g. `pytest -m unit` for the portfolio/risk logic alone
+    config.addinivalue_line("markers", "unit: fast portfolio and risk tests with no indicator or backtest setup")
+    config.addinivalue_line("markers", "indicators: tests that compute indicator columns")
+    config.addinivalue_line("markers", "backtest: backtest engine runs")
@@ -4,56 +4,97 @@
 import os
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import numpy as np
 import pandas as pd
 import yaml
 
-from src.api.coinbase_client import CoinbaseClient
+from src.api.coinbase_client import CANDLE_COLUMNS, CoinbaseClient, empty_candles, get_client
+from src.api.market_data import (
+    GRANULARITY_SECONDS,
+    PARQUET_WRITE_OPTIONS,
+    candle_chunks,
+    dedupe_candles,
+)
+from src.backtesting.historical_data import HISTORICAL_DIR, parquet_path
 from src.utils.logger import setup_logger
 
 log = setup_logger("download-historical")
 
-# Coinbase API limits ~300 candles per request
-MAX_PER_REQUEST = 300
-GRANULARITY_SECONDS = {
-    "ONE_HOUR": 3600,
-    "ONE_DAY": 86400,
-}
+MAX_WORKERS = 8  # pairs downloaded concurrently
+MAX_CHUNK_WORKERS = 8  # chunks per pair fetched concurrently
 
 
 def download(product_id: str, client: CoinbaseClient, granularity: str = "ONE_HOUR",
-             days: int = 180) -> pd.DataFrame:
-    """Download historical candles, paginating as needed."""
+             days: int = 180, path: str | None = None) -> pd.DataFrame:
+    """Download historical candles, fetching paginated chunks concurrently.
+
+    If path points at an existing parquet, fetching resumes at its last
+    timestamp and the result is the merged history. Requests from all threads
+    share the client's rate limiter.
+
+    Raises:
+        RuntimeError: if any chunk failed, so a history with a hole is never
+            saved (a later resume would not refetch it).
+    """
     seconds_per = GRANULARITY_SECONDS[granularity]
     end = int(time.time())
     start = end - (days * 86400)
 
-    all_candles = []
-    chunk_start = start
-
-    while chunk_start < end:
-        chunk_end = min(chunk_start + MAX_PER_REQUEST * seconds_per, end)
-        try:
-            candles = client.get_candles(product_id, chunk_start, chunk_end, granularity)
-            all_candles.extend(candles)
-            log.info(f"  {product_id}: fetched {len(candles)} candles "
-                     f"({len(all_candles)} total)")
-        except Exception as e:
-            log.error(f"  {product_id}: error at chunk {chunk_start}: {e}")
-
-        chunk_start = chunk_end
-        time.sleep(0.3)  # rate limit
-
-    if not all_candles:
-        return pd.DataFrame()
-
-    df = pd.DataFrame(all_candles)
-    df.rename(columns={"start": "timestamp"}, inplace=True)
-    df = df[["timestamp", "open", "high", "low", "close", "volume"]]
-    df = df.sort_values("timestamp").drop_duplicates("timestamp").reset_index(drop=True)
-    return df
+    existing = None
+    if path and os.path.exists(path):
+        existing = pd.read_parquet(path, engine="pyarrow", columns=CANDLE_COLUMNS)
+        if not existing.empty:
+            # Refetch the last saved candle: it was still in progress when the
+            # previous run fetched it, and dedupe keeps the new, complete row
+            start = max(start, int(existing["timestamp"].max()))
+            log.info(f"  {product_id}: resuming from {start} ({len(existing)} candles on disk)")
+
+    # Fill preallocated column buffers (sized for every candle the window can
+    # hold) instead of accumulating per-chunk frames
+    chunks = candle_chunks(start, end, seconds_per)
+    capacity = sum((chunk_end - chunk_start) // seconds_per + 1 for chunk_start, chunk_end in chunks)
+    columns = {
+        name: np.empty(capacity, dtype=np.int64 if name == "timestamp" else np.float64)
+        for name in CANDLE_COLUMNS
+    }
+    fetched = 0
+    failed = []
+
+    with ThreadPoolExecutor(max_workers=MAX_CHUNK_WORKERS) as executor:
+        futures = {
+            executor.submit(client.get_candles, product_id, chunk_start, chunk_end, granularity):
+                chunk_start
+            for chunk_start, chunk_end in chunks
+        }
+        for future in as_completed(futures):
+            try:
+                candles = future.result()
+            except Exception as e:
+                log.error(f"  {product_id}: error at chunk {futures[future]}: {e}")
+                failed.append(futures[future])
+                continue
+            k = len(candles)
+            if fetched + k > capacity:  # API returned more than the window holds
+                capacity = max(capacity * 2, fetched + k)
+                columns = {name: np.resize(buf, capacity) for name, buf in columns.items()}
+            for name, buf in columns.items():
+                buf[fetched:fetched + k] = candles[name].to_numpy()
+            fetched += k
+            log.info(f"  {product_id}: fetched {k} candles ({fetched} total)")
+
+    if failed:
+        raise RuntimeError(f"{len(failed)} of {len(chunks)} chunks failed; not saving a partial history")
+    if not fetched:
+        return existing if existing is not None else empty_candles()
+
+    df = pd.DataFrame({name: buf[:fetched] for name, buf in columns.items()})
+    if existing is not None:
+        df = pd.concat([existing, df], ignore_index=True)
+    return dedupe_candles(df)
 
 
 def main():
@@ -64,21 +105,32 @@ def main():
     granularity = config["strategy"]["candle_granularity"]
     days = 180  # 6 months
 
-    os.makedirs("data/historical", exist_ok=True)
-    client = CoinbaseClient()
+    os.makedirs(HISTORICAL_DIR, exist_ok=True)
+    client = get_client()
 
     print(f"Downloading {days} days of {granularity} data for {len(pairs)} pairs...\n")
 
-    for pair in pairs:
-        print(f"Downloading {pair}...")
-        df = download(pair, client, granularity=granularity, days=days)
-        if not df.empty:
-            path = f"data/historical/{pair.replace('-', '_')}_{granularity}.parquet"
-            df.to_parquet(path)
-            print(f"  Saved {len(df)} candles → {path}")
-        else:
-            print(f"  WARNING: No data for {pair}")
-        print()
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(pairs) or 1)) as executor:
+        futures = {
+            executor.submit(download, pair, client, granularity=granularity, days=days,
+                            path=parquet_path(pair, granularity)): pair
+            for pair in pairs
+        }
+        for future in as_completed(futures):
+            pair = futures[future]
+            try:
+                df = future.result()
+            except Exception as e:
+                print(f"  ERROR: {pair} failed: {e}")
+                continue
+            if not df.empty:
+                path = parquet_path(pair, granularity)
+                df.to_parquet(path, **PARQUET_WRITE_OPTIONS)
+                print(f"  Saved {pair}: {len(df)} candles → {path}")
+            else:
+                print(f"  WARNING: No data for {pair}")
+
+    print()
 
     print("Done!")
 
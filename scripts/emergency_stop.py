@@ -6,7 +6,7 @@ import sys
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.api.coinbase_client import CoinbaseClient
+from src.api.coinbase_client import get_client
 from src.notifications.sms_notifier import SMSNotifier
 from src.utils.logger import setup_logger
 
@@ -18,7 +18,7 @@ def main():
     print("  EMERGENCY STOP")
     print("=" * 50)
 
-    client = CoinbaseClient()
+    client = get_client()
     sms = SMSNotifier()
 
     # List all accounts with balances
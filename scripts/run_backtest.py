@@ -6,10 +6,10 @@ import sys
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-import pandas as pd
 import yaml
 
 from src.backtesting.backtest_engine import BacktestEngine
+from src.backtesting.historical_data import HISTORICAL_DIR, load_historical
 from src.backtesting.performance import print_report
 from src.utils.logger import setup_logger
 
@@ -21,21 +21,18 @@ def main():
         config = yaml.safe_load(f)
 
     granularity = config["strategy"]["candle_granularity"]
-    data_dir = "data/historical"
+    data_dir = HISTORICAL_DIR
 
     if not os.path.isdir(data_dir):
         print("No historical data found. Run scripts/download_historical.py first.")
         sys.exit(1)
 
     # Load all available historical data
-    data = {}
-    for pair in config["trading_pairs"]:
-        filename = f"{pair.replace('-', '_')}_{granularity}.parquet"
-        path = os.path.join(data_dir, filename)
-        if os.path.exists(path):
-            df = pd.read_parquet(path)
-            data[pair] = df
-            print(f"Loaded {pair}: {len(df)} candles")
+    pairs = config["trading_pairs"]
+    data = load_historical(pairs, granularity, data_dir)
+    for pair in pairs:
+        if pair in data:
+            print(f"Loaded {pair}: {len(data[pair])} candles")
         else:
             print(f"Skipping {pair} — no data file")
 
@@ -50,14 +47,19 @@ def main():
 
     # Also print individual trades if few enough
     if len(result.trades) <= 50:
-        print("\nTrade Log:")
-        print(f"  {'#':>3}  {'Product':12}  {'Entry':>10}  {'Exit':>10}  "
-              f"{'P&L':>8}  {'%':>7}  {'Reason'}")
-        print("  " + "-" * 70)
-        for i, t in enumerate(result.trades, 1):
-            print(f"  {i:3d}  {t.product_id:12}  ${t.entry_price:>9.4f}  "
-                  f"${t.exit_price:>9.4f}  ${t.pnl:>+7.2f}  "
-                  f"{t.pnl_pct:>+6.1%}  {t.exit_reason}")
+        lines = [
+            "\nTrade Log:",
+            f"  {'#':>3}  {'Product':12}  {'Entry':>10}  {'Exit':>10}  "
+            f"{'P&L':>8}  {'%':>7}  {'Reason'}",
+            "  " + "-" * 70,
+        ]
+        lines.extend(
+            f"  {i:3d}  {t.product_id:12}  ${t.entry_price:>9.4f}  "
+            f"${t.exit_price:>9.4f}  ${t.pnl:>+7.2f}  "
+            f"{t.pnl_pct:>+6.1%}  {t.exit_reason}"
+            for i, t in enumerate(result.trades, 1)
+        )
+        print("\n".join(lines))
 
 
 if __name__ == "__main__":
@@ -6,10 +6,10 @@ import sys
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-import pandas as pd
 import yaml
 
 from src.backtesting.grid_backtest import GridBacktestEngine
+from src.backtesting.historical_data import HISTORICAL_DIR, load_historical
 from src.utils.logger import setup_logger
 
 log = setup_logger("run-grid-backtest")
@@ -20,22 +20,19 @@ def main():
         config = yaml.safe_load(f)
 
     granularity = config["strategy"]["candle_granularity"]
-    data_dir = "data/historical"
-    grid_pairs = config.get("grid", {}).get("pairs", [])
+    data_dir = HISTORICAL_DIR
+    grid_cfg = config.get("grid", {})
+    grid_pairs = grid_cfg.get("pairs", [])
 
     if not os.path.isdir(data_dir):
         print("No historical data found. Run scripts/download_historical.py first.")
         sys.exit(1)
 
     # Load historical data for grid pairs
-    data = {}
+    data = load_historical(grid_pairs, granularity, data_dir)
     for pair in grid_pairs:
-        filename = f"{pair.replace('-', '_')}_{granularity}.parquet"
-        path = os.path.join(data_dir, filename)
-        if os.path.exists(path):
-            df = pd.read_parquet(path)
-            data[pair] = df
-            print(f"Loaded {pair}: {len(df)} candles")
+        if pair in data:
+            print(f"Loaded {pair}: {len(data[pair])} candles")
         else:
             print(f"Skipping {pair} — no data file")
 
@@ -44,9 +41,10 @@ def main():
         sys.exit(1)
 
     print(f"\nRunning grid backtest on {len(data)} pairs...")
-    print(f"Grid config: {config.get('grid', {}).get('num_levels', 5)} levels, "
-          f"{config.get('grid', {}).get('grid_spacing_pct', 0.01):.1%} spacing, "
-          f"${config.get('grid', {}).get('order_size_usd', 10):.0f}/order")
+    num_levels = grid_cfg.get("num_levels", 5)
+    spacing = grid_cfg.get("grid_spacing_pct", 0.01)
+    order_size = grid_cfg.get("order_size_usd", 10)
+    print(f"Grid config: {num_levels} levels, {spacing:.1%} spacing, ${order_size:.0f}/order")
     print()
 
     engine = GridBacktestEngine(config)
@@ -68,12 +66,17 @@ def main():
 
     # Show last 20 trades
     if result.trades:
-        print(f"\nLast 20 trades (of {len(result.trades)}):")
-        print(f"  {'#':>4}  {'Product':12}  {'Side':4}  {'Price':>10}  {'P&L':>8}")
-        print("  " + "-" * 45)
-        for t in result.trades[-20:]:
-            pnl_str = f"${t.pnl:>+7.4f}" if t.pnl else "       -"
-            print(f"  {t.candle_idx:4d}  {t.product_id:12}  {t.side:4}  ${t.price:>9.4f}  {pnl_str}")
+        lines = [
+            f"\nLast 20 trades (of {len(result.trades)}):",
+            f"  {'#':>4}  {'Product':12}  {'Side':4}  {'Price':>10}  {'P&L':>8}",
+            "  " + "-" * 45,
+        ]
+        lines.extend(
+            f"  {t.candle_idx:4d}  {t.product_id:12}  {t.side:4}  ${t.price:>9.4f}  "
+            + (f"${t.pnl:>+7.4f}" if t.pnl else "       -")
+            for t in result.trades[-20:]
+        )
+        print("\n".join(lines))
 
 
 if __name__ == "__main__":
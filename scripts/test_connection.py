@@ -6,7 +6,7 @@ import sys
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.api.coinbase_client import CoinbaseClient
+from src.api.coinbase_client import get_client
 from src.utils.logger import setup_logger
 
 log = setup_logger("test-connection")
@@ -18,7 +18,7 @@ def main():
     print("=" * 50)
 
     try:
-        client = CoinbaseClient()
+        client = get_client()
         accounts = client.list_accounts()
     except Exception as e:
         print(f"\nFAILED to connect: {e}")
@@ -0,0 +1,119 @@
+"""Live five-minute candles from the Coinbase websocket candles channel."""
+
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import orjson
+import pandas as pd
+
+from src.api.coinbase_client import CANDLE_COLUMNS
+from src.utils.logger import setup_logger
+
+log = setup_logger("candle-feed")
+
+# The candles channel only publishes five-minute candles
+FEED_GRANULARITY = "FIVE_MINUTE"
+FEED_CANDLE_SECONDS = 300
+
+# A buffer with no update for this long is treated as stale (missed reconnect)
+FEED_STALE_SECONDS = 2 * FEED_CANDLE_SECONDS
+
+
+class CandleFeed:
+    """Ring buffer of recent candles per product, kept current by the websocket.
+
+    A product's buffer is seeded from a REST frame (seed()), then updated in
+    place as candle messages arrive on the client's background thread. When
+    a message skips a candle (e.g. across a reconnect) or updates stop, the
+    product reads as unseeded again so callers fall back to REST and re-seed.
+    """
+
+    def __init__(self, product_ids: list[str], maxlen: int):
+        self.product_ids = list(product_ids)
+        self.maxlen = maxlen
+        self._buffers: dict[str, deque[tuple]] = {}  # product_id → (timestamp, o, h, l, c, v) rows
+        self._updated_at: dict[str, float] = {}  # product_id → monotonic time of last change
+        self._lock = threading.Lock()
+        self._ws = None
+
+    def start(self):
+        """Connect and subscribe to the candles channel (uses the .env API key)."""
+        from coinbase.websocket import WSClient
+
+        self._ws = WSClient(
+            api_key=os.getenv("COINBASE_API_KEY"),
+            api_secret=os.getenv("COINBASE_API_SECRET"),
+            on_message=self.on_message,
+            retry=True,
+        )
+        self._ws.open()
+        self._ws.candles(self.product_ids)
+        log.info(f"Candle feed subscribed: {self.product_ids}")
+
+    def stop(self):
+        if self._ws is not None:
+            self._ws.close()
+            self._ws = None
+
+    def seed(self, product_id: str, df: pd.DataFrame):
+        """Replace a product's buffer with the tail of a REST candle frame."""
+        rows = df[CANDLE_COLUMNS].tail(self.maxlen).itertuples(index=False, name=None)
+        with self._lock:
+            self._buffers[product_id] = deque(
+                ((int(r[0]), *map(float, r[1:])) for r in rows), maxlen=self.maxlen
+            )
+            self._updated_at[product_id] = time.monotonic()
+
+    def get_candles(self, product_id: str, num_candles: int) -> pd.DataFrame | None:
+        """The latest num_candles candles, or None if the product needs (re-)seeding."""
+        with self._lock:
+            buffer = self._buffers.get(product_id)
+            if buffer is None or len(buffer) < min(num_candles, self.maxlen):
+                return None
+            if time.monotonic() - self._updated_at[product_id] > FEED_STALE_SECONDS:
+                return None
+            rows = list(buffer)[-num_candles:]
+        data = np.array(rows, dtype=np.float64)
+        df = pd.DataFrame(data[:, 1:], columns=CANDLE_COLUMNS[1:])
+        df.insert(0, "timestamp", data[:, 0].astype(np.int64))
+        return df
+
+    def on_message(self, raw: str):
+        """Apply a websocket message (called on the client's thread)."""
+        msg = orjson.loads(raw)
+        if msg.get("channel") != "candles":
+            return
+        for event in msg.get("events", []):
+            for candle in event.get("candles", []):
+                self._apply(candle)
+
+    def _apply(self, candle: dict):
+        product_id = candle.get("product_id")
+        row = (
+            int(candle["start"]),
+            float(candle["open"]),
+            float(candle["high"]),
+            float(candle["low"]),
+            float(candle["close"]),
+            float(candle["volume"]),
+        )
+        with self._lock:
+            buffer = self._buffers.get(product_id)
+            if buffer is None:
+                return  # not seeded yet; REST seeds it on first read
+            last_ts = buffer[-1][0] if buffer else row[0] - FEED_CANDLE_SECONDS
+            if row[0] == last_ts:
+                buffer[-1] = row  # in-progress candle update
+            elif row[0] == last_ts + FEED_CANDLE_SECONDS:
+                buffer.append(row)
+            elif row[0] > last_ts:
+                # Missed at least one candle: drop the buffer so it is re-seeded
+                del self._buffers[product_id]
+                log.warning(f"Candle feed gap for {product_id}; re-seeding from REST")
+                return
+            else:
+                return  # older than the buffer, already superseded
+            self._updated_at[product_id] = time.monotonic()
@@ -1,66 +1,227 @@
 """Coinbase Advanced Trade API wrapper."""
 
 import os
-from decimal import Decimal, ROUND_DOWN
+import time
+import uuid
+from decimal import ROUND_DOWN, Context, Decimal
 
+import numpy as np
+import orjson
+import pandas as pd
+import requests
 from coinbase.rest import RESTClient
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+from src.api.rate_limiter import RateLimiter, call_with_backoff
 from src.utils.logger import setup_logger
 
 log = setup_logger("coinbase-client")
 
+CANDLE_COLUMNS = ["timestamp", "open", "high", "low", "close", "volume"]
+# float64 on purpose: the close becomes the order/stop price, and float32's
+# ~7 significant digits can't hold a BTC price to the cent
+CANDLE_DTYPES = {"timestamp": "int64", **{col: "float64" for col in CANDLE_COLUMNS[1:]}}
+
+
+def empty_candles() -> pd.DataFrame:
+    """A zero-row candle frame with the same dtypes as real results."""
+    return pd.DataFrame(columns=CANDLE_COLUMNS).astype(CANDLE_DTYPES)
+
+# load_dotenv reads and parses .env from disk; once per process is enough
+_DOTENV_LOADED = False
+
+ACCOUNTS_TTL_SECONDS = 5
+
+# Enough pooled keep-alive connections for the concurrent candle fetchers
+# (requests' default pool keeps only 10 per host)
+HTTP_POOL_SIZE = 16
+
+# Above this many ticks a float no longer holds every integer exactly
+_MAX_EXACT_TICKS = 2 ** 53
+
+# Shared context for the Decimal fallback: one quantize truncates in place
+_TRUNCATE_CTX = Context(prec=64, rounding=ROUND_DOWN)
+
+
+class _FastJSONResponse(requests.Response):
+    """Response whose json() decodes with orjson and memoizes the result.
+
+    The SDK calls response.json() twice per request (once only to build a
+    debug log line), so the memo halves parsing on top of orjson's speedup.
+    """
+
+    def json(self, **kwargs):
+        parsed = getattr(self, "_parsed_json", None)
+        if parsed is None:
+            parsed = self._parsed_json = orjson.loads(self.content)
+        return parsed
+
+
+class _SessionAdapter(HTTPAdapter):
+    """HTTPAdapter that hands back _FastJSONResponse objects."""
+
+    def build_response(self, req, resp):
+        response = super().build_response(req, resp)
+        response.__class__ = _FastJSONResponse
+        return response
+
+
+class _Increment:
+    """A product size increment pre-split for integer truncation.
+
+    An increment like "0.00000001" becomes ticks=1 at scale=10**8; sizes are
+    floored to whole ticks with int arithmetic. Decimal is kept as a fallback
+    for values too large to convert exactly.
+    """
+
+    __slots__ = ("dec", "ticks", "scale", "decimals")
+
+    def __init__(self, raw: str):
+        self.dec = Decimal(str(raw))
+        self.decimals = max(0, -self.dec.as_tuple().exponent)
+        self.scale = 10 ** self.decimals
+        self.ticks = int(self.dec * self.scale)
+
+    def truncate(self, value: float) -> str:
+        scaled = value * self.scale
+        if not 0 <= scaled < _MAX_EXACT_TICKS:
+            return self._truncate_decimal(value)
+        # Correct for float error so e.g. 0.29 * 100 -> 29, not 28
+        n = int(scaled)
+        if (n + 1) / self.scale <= value:
+            n += 1
+        elif n / self.scale > value:
+            n -= 1
+        n -= n % self.ticks
+        if not self.decimals:
+            return str(n)
+        whole, frac = divmod(n, self.scale)
+        return f"{whole}.{frac:0{self.decimals}d}"
+
+    def _truncate_decimal(self, value: float) -> str:
+        dec = Decimal(repr(value))
+        if self.ticks == 1:  # power-of-ten increment: quantize is exact
+            return format(dec.quantize(self.dec, context=_TRUNCATE_CTX), "f")
+        return format((dec // self.dec) * self.dec, "f")
+
 
 class CoinbaseClient:
     """Thin wrapper around the Coinbase Advanced Trade REST client."""
 
     def __init__(self):
-        load_dotenv()
+        global _DOTENV_LOADED
+        if not _DOTENV_LOADED:
+            load_dotenv()
+            _DOTENV_LOADED = True
         api_key = os.getenv("COINBASE_API_KEY")
         api_secret = os.getenv("COINBASE_API_SECRET")
         if not api_key or not api_secret:
             raise RuntimeError("COINBASE_API_KEY and COINBASE_API_SECRET must be set in .env")
         self.client = RESTClient(api_key=api_key, api_secret=api_secret)
+        self._configure_session()
         self._product_cache: dict[str, dict] = {}
+        self._product_fetched_at: dict[str, float] = {}  # product_id → monotonic time
+        self._accounts_cache: list[dict] | None = None
+        self._accounts_cached_at = 0.0
+        # Shared by every thread fetching through this client
+        self.limiter = RateLimiter()
         log.info("Coinbase client initialized")
 
+    def _configure_session(self):
+        """Widen the SDK's keep-alive connection pool and retry transient 5xx.
+
+        Only idempotent methods are retried (urllib3's default), so orders are
+        never resent; 429s are left to call_with_backoff. Responses are
+        decoded with orjson.
+        """
+        session = getattr(self.client, "session", None)
+        if not isinstance(session, requests.Session):
+            log.debug("RESTClient has no requests.Session; using SDK defaults")
+            return
+        retry = Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[500, 502, 503, 504],
+            raise_on_status=False,
+        )
+        session.mount("https://", _SessionAdapter(
+            pool_connections=HTTP_POOL_SIZE,
+            pool_maxsize=HTTP_POOL_SIZE,
+            max_retries=retry,
+        ))
+
     # ── Account helpers ──────────────────────────────────────────────
 
-    def list_accounts(self) -> list[dict]:
-        """Return all accounts with non-zero balances."""
+    def _raw_accounts(self) -> list:
         resp = self.client.get_accounts(limit=250)
-        accounts = resp.get("accounts", resp) if isinstance(resp, dict) else resp.accounts
+        return resp.get("accounts", resp) if isinstance(resp, dict) else resp.accounts
+
+    @staticmethod
+    def _available_balance(acct) -> dict:
+        if isinstance(acct, dict):
+            return acct.get("available_balance", {})
+        return acct.available_balance
+
+    def _fresh_accounts(self) -> list[dict] | None:
+        """The cached account list, or None if missing or older than the TTL."""
+        if time.monotonic() - self._accounts_cached_at < ACCOUNTS_TTL_SECONDS:
+            return self._accounts_cache
+        return None
+
+    def list_accounts(self) -> list[dict]:
+        """Return all accounts with non-zero balances (cached for a few seconds)."""
+        cached = self._fresh_accounts()
+        if cached is not None:
+            return list(cached)
+
         results = []
-        for acct in accounts:
+        for acct in self._raw_accounts():
+            available = self._available_balance(acct)
+            bal = float(available.get("value", 0))
+            if bal <= 0:
+                continue
             if isinstance(acct, dict):
-                bal = float(acct.get("available_balance", {}).get("value", 0))
-                currency = acct.get("available_balance", {}).get("currency", "")
-                name = acct.get("name", "")
-                uuid = acct.get("uuid", "")
+                name, acct_uuid = acct.get("name", ""), acct.get("uuid", "")
             else:
-                bal = float(acct.available_balance.get("value", 0))
-                currency = acct.available_balance.get("currency", "")
-                name = acct.name
-                uuid = acct.uuid
-            if bal > 0:
-                results.append({
-                    "uuid": uuid,
-                    "name": name,
-                    "currency": currency,
-                    "balance": bal,
-                })
-        return results
+                name, acct_uuid = acct.name, acct.uuid
+            results.append({
+                "uuid": acct_uuid,
+                "name": name,
+                "currency": available.get("currency", ""),
+                "balance": bal,
+            })
+        self._accounts_cache = results
+        self._accounts_cached_at = time.monotonic()
+        return list(results)
+
+    def get_balance(self, currency: str) -> float:
+        """Return the available balance for one currency.
+
+        Uses the account cache when fresh; otherwise scans the raw response
+        and stops at the first match.
+        """
+        cached = self._fresh_accounts()
+        if cached is not None:
+            for acct in cached:
+                if acct["currency"] == currency:
+                    return acct["balance"]
+            return 0.0
+
+        for acct in self._raw_accounts():
+            available = self._available_balance(acct)
+            if available.get("currency", "") == currency:
+                return float(available.get("value", 0))
+        return 0.0
 
     def get_usd_balance(self) -> float:
         """Return available USD balance."""
-        for acct in self.list_accounts():
-            if acct["currency"] == "USD":
-                return acct["balance"]
-        return 0.0
+        return self.get_balance("USD")
 
     # ── Market data ──────────────────────────────────────────────────
 
-    def get_candles(self, product_id: str, start: int, end: int, granularity: str) -> list[dict]:
+    def get_candles(self, product_id: str, start: int, end: int, granularity: str) -> pd.DataFrame:
         """Fetch OHLCV candles for a product.
 
         Args:
@@ -70,57 +231,105 @@ class CoinbaseClient:
             granularity: e.g. "ONE_HOUR", "ONE_DAY"
 
         Returns:
-            List of dicts with keys: start, low, high, open, close, volume
+            DataFrame with columns: timestamp, open, high, low, close, volume
+            in the order the API returned them (not sorted or deduplicated).
+
+        Safe to call from several threads: requests go through the client's
+        shared rate limiter and 429 responses are retried with backoff.
         """
-        resp = self.client.get_candles(
+        resp = call_with_backoff(
+            self.client.get_candles,
             product_id=product_id,
             start=str(start),
             end=str(end),
             granularity=granularity,
+            limiter=self.limiter,
         )
         candles = resp.get("candles", resp) if isinstance(resp, dict) else resp.candles
-        return [
-            {
-                "start": int(c["start"]) if isinstance(c, dict) else int(c.start),
-                "low": float(c["low"]) if isinstance(c, dict) else float(c.low),
-                "high": float(c["high"]) if isinstance(c, dict) else float(c.high),
-                "open": float(c["open"]) if isinstance(c, dict) else float(c.open),
-                "close": float(c["close"]) if isinstance(c, dict) else float(c.close),
-                "volume": float(c["volume"]) if isinstance(c, dict) else float(c.volume),
-            }
-            for c in candles
-        ]
-
-    def get_product(self, product_id: str) -> dict:
-        """Get current price and product info (cached for precision data)."""
+        n = len(candles)
+        if n and isinstance(candles[0], dict):
+            def column(key):
+                return (c[key] for c in candles)
+        else:
+            def column(key):
+                return (getattr(c, key) for c in candles)
+
+        return pd.DataFrame({
+            "timestamp": np.fromiter(column("start"), dtype=np.int64, count=n),
+            "open": np.fromiter(column("open"), dtype=np.float64, count=n),
+            "high": np.fromiter(column("high"), dtype=np.float64, count=n),
+            "low": np.fromiter(column("low"), dtype=np.float64, count=n),
+            "close": np.fromiter(column("close"), dtype=np.float64, count=n),
+            "volume": np.fromiter(column("volume"), dtype=np.float64, count=n),
+        })
+
+    def get_product(self, product_id: str, max_age: float = 0.0) -> dict:
+        """Get current price and product info (cached for precision data).
+
+        Args:
+            product_id: e.g. "ETH-USD"
+            max_age: Reuse a fetch younger than this many seconds instead of
+                calling the API. The default 0 always refetches.
+
+        The size increments are parsed once here so order-path truncation
+        is plain integer arithmetic.
+        """
+        fetched_at = self._product_fetched_at.get(product_id)
+        if fetched_at is not None and time.monotonic() - fetched_at < max_age:
+            return self._product_cache[product_id]
+
         resp = self.client.get_product(product_id=product_id)
-        data = resp if isinstance(resp, dict) else resp.__dict__
+        return self._store_product(product_id, resp if isinstance(resp, dict) else resp.__dict__)
+
+    def get_products(self, product_ids: list[str], max_age: float = 0.0) -> dict[str, dict]:
+        """Get several products, fetching the stale ones in a single request.
+
+        Same caching as get_product. Returns product_id → product info;
+        products the API doesn't return are left out.
+        """
+        now = time.monotonic()
+        products = {}
+        stale = []
+        for product_id in product_ids:
+            fetched_at = self._product_fetched_at.get(product_id)
+            if fetched_at is not None and now - fetched_at < max_age:
+                products[product_id] = self._product_cache[product_id]
+            else:
+                stale.append(product_id)
+
+        if stale:
+            resp = self.client.get_products(product_ids=stale)
+            listed = resp.get("products", []) if isinstance(resp, dict) else resp.products
+            for product in listed:
+                data = product if isinstance(product, dict) else product.__dict__
+                if data.get("product_id") in stale:
+                    products[data["product_id"]] = self._store_product(data["product_id"], data)
+        return products
+
+    def _store_product(self, product_id: str, data: dict) -> dict:
+        data["_base_inc"] = _Increment(data.get("base_increment") or "0.00000001")
+        data["_quote_inc"] = _Increment(data.get("quote_increment") or "0.01")
         self._product_cache[product_id] = data
+        self._product_fetched_at[product_id] = time.monotonic()
         return data
 
+    def _cached_product(self, product_id: str) -> dict:
+        product = self._product_cache.get(product_id)
+        if product is None:
+            product = self.get_product(product_id)
+        return product
+
     def truncate_base_size(self, product_id: str, size: float) -> str:
         """Truncate a base size to the product's allowed precision.
 
         Fetches product info if not already cached.
         Returns the size as a correctly-formatted string.
         """
-        if product_id not in self._product_cache:
-            self.get_product(product_id)
-        product = self._product_cache[product_id]
-        base_increment = Decimal(str(product.get("base_increment", "0.00000001")))
-        size_dec = Decimal(str(size))
-        truncated = (size_dec / base_increment).to_integral_value(rounding=ROUND_DOWN) * base_increment
-        return str(truncated)
+        return self._cached_product(product_id)["_base_inc"].truncate(size)
 
     def truncate_quote_size(self, product_id: str, amount: float) -> str:
         """Truncate a quote (USD) amount to the product's allowed precision."""
-        if product_id not in self._product_cache:
-            self.get_product(product_id)
-        product = self._product_cache[product_id]
-        quote_increment = Decimal(str(product.get("quote_increment", "0.01")))
-        amount_dec = Decimal(str(amount))
-        truncated = (amount_dec / quote_increment).to_integral_value(rounding=ROUND_DOWN) * quote_increment
-        return str(truncated)
+        return self._cached_product(product_id)["_quote_inc"].truncate(amount)
 
     # ── Orders ───────────────────────────────────────────────────────
 
@@ -132,7 +341,6 @@ class CoinbaseClient:
             base_size: Amount of base asset as string.
             limit_price: Price at which to buy as string.
         """
-        import uuid
         safe_size = self.truncate_base_size(product_id, float(base_size))
         safe_price = self.truncate_quote_size(product_id, float(limit_price))
         client_order_id = str(uuid.uuid4())
@@ -153,7 +361,6 @@ class CoinbaseClient:
             base_size: Amount of base asset as string.
             limit_price: Price at which to sell as string.
         """
-        import uuid
         safe_size = self.truncate_base_size(product_id, float(base_size))
         safe_price = self.truncate_quote_size(product_id, float(limit_price))
         client_order_id = str(uuid.uuid4())
@@ -173,7 +380,6 @@ class CoinbaseClient:
             product_id: e.g. "ETH-USD"
             quote_size: USD amount as string — will be truncated to allowed precision.
         """
-        import uuid
         safe_size = self.truncate_quote_size(product_id, float(quote_size))
         client_order_id = str(uuid.uuid4())
         resp = self.client.market_order_buy(
@@ -191,7 +397,6 @@ class CoinbaseClient:
             product_id: e.g. "ETH-USD"
             base_size: Amount of asset as string — will be truncated to allowed precision.
         """
-        import uuid
         safe_size = self.truncate_base_size(product_id, float(base_size))
         client_order_id = str(uuid.uuid4())
         resp = self.client.market_order_sell(
@@ -207,8 +412,42 @@ class CoinbaseClient:
         resp = self.client.get_order(order_id=order_id)
         return resp if isinstance(resp, dict) else resp.__dict__
 
+    def get_orders(self, order_ids: list[str]) -> dict[str, dict]:
+        """Get several orders by ID in one listing (following pagination).
+
+        Returns order_id → order details; IDs the API doesn't return are
+        left out.
+        """
+        orders = {}
+        cursor = None
+        while True:
+            resp = self.client.list_orders(order_ids=order_ids, cursor=cursor)
+            if not isinstance(resp, dict):
+                resp = resp.__dict__
+            for order in resp.get("orders") or []:
+                data = order if isinstance(order, dict) else order.__dict__
+                orders[data["order_id"]] = data
+            cursor = resp.get("cursor")
+            if not resp.get("has_next") or not cursor:
+                return orders
+
     def cancel_orders(self, order_ids: list[str]) -> dict:
         """Cancel one or more orders."""
         resp = self.client.cancel_orders(order_ids=order_ids)
         log.info(f"Cancelled orders: {order_ids}")
         return resp if isinstance(resp, dict) else resp.__dict__
+
+
+_SINGLETON: CoinbaseClient | None = None
+
+
+def get_client() -> CoinbaseClient:
+    """Process-wide CoinbaseClient, created on first use.
+
+    Scripts share one instance so credentials, the HTTP session and the
+    product/account caches are set up once per process.
+    """
+    global _SINGLETON
+    if _SINGLETON is None:
+        _SINGLETON = CoinbaseClient()
+    return _SINGLETON
@@ -1,15 +1,18 @@
 """OHLCV data fetching with disk caching."""
 
-import hashlib
 import json
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 
 import pandas as pd
 import yaml
 
-from src.api.coinbase_client import CoinbaseClient
+from src.api.candle_feed import FEED_GRANULARITY, CandleFeed
+from src.api.coinbase_client import CoinbaseClient, empty_candles
+from src.api.ticker_feed import TickerFeed
 from src.utils.logger import setup_logger
 
 log = setup_logger("market-data")
@@ -26,6 +29,55 @@ GRANULARITY_SECONDS = {
     "ONE_DAY": 86400,
 }
 
+# Parquet options for all candle files: zstd is smaller than the snappy
+# default at similar read speed, and pinning pyarrow skips engine detection
+PARQUET_WRITE_OPTIONS = {
+    "engine": "pyarrow",
+    "compression": "zstd",
+    "compression_level": 3,
+    "use_dictionary": True,
+}
+
+# Coinbase limits ~300 candles per request
+MAX_PER_REQUEST = 300
+MAX_FETCH_WORKERS = 8
+
+# Prices younger than this are reused, so several components pricing the
+# same pair within one tick share a single API call
+PRICE_MAX_AGE_SECONDS = 1.0
+
+
+def candle_chunks(start: int, end: int, seconds_per: int) -> list[tuple[int, int]]:
+    """Split [start, end) into request-sized (chunk_start, chunk_end) windows."""
+    step = MAX_PER_REQUEST * seconds_per
+    return [(s, min(s + step, end)) for s in range(start, end, step)]
+
+
+def dedupe_candles(df: pd.DataFrame) -> pd.DataFrame:
+    """Drop repeated timestamps (keeping the newest row) and ensure ascending order.
+
+    The sort is skipped when the frame is already monotonic.
+    """
+    df = df.drop_duplicates("timestamp", keep="last", ignore_index=True)
+    if not df["timestamp"].is_monotonic_increasing:
+        df = df.sort_values("timestamp", ignore_index=True)
+    return df
+
+
+def fetch_chunks(client: CoinbaseClient, product_id: str, granularity: str,
+                 chunks: list[tuple[int, int]]) -> list[pd.DataFrame]:
+    """Fetch independent candle windows concurrently, in chunk order.
+
+    Rate limiting and 429 backoff are handled inside client.get_candles.
+    """
+    def fetch(chunk):
+        return client.get_candles(product_id, chunk[0], chunk[1], granularity)
+
+    if len(chunks) <= 1:
+        return [fetch(c) for c in chunks]
+    with ThreadPoolExecutor(max_workers=min(MAX_FETCH_WORKERS, len(chunks))) as executor:
+        return list(executor.map(fetch, chunks))
+
 
 class MarketData:
     """Fetches and caches OHLCV candle data from Coinbase."""
@@ -35,22 +87,28 @@ class MarketData:
         self.config = config
         self.cache_dir = config["data"]["cache_dir"]
         os.makedirs(self.cache_dir, exist_ok=True)
+        # In-process cache of closed candles keyed on candle-aligned windows, so
+        # repeated polls within one interval only refetch the in-progress candle
+        self._get_candles_cached = lru_cache(maxsize=128)(self._fetch_candles)
+        # Live websocket candles, when the bot runs one (see get_candles_multi)
+        self.candle_feed: CandleFeed | None = None
+        # Live websocket prices, when the bot runs one (see get_current_prices)
+        self.ticker_feed: TickerFeed | None = None
 
     def _cache_key(self, product_id: str, granularity: str, start: int, end: int) -> str:
-        raw = f"{product_id}_{granularity}_{start}_{end}"
-        return hashlib.md5(raw.encode()).hexdigest()
+        return f"{product_id}_{granularity}_{start}_{end}"
 
     def _load_cache(self, key: str) -> pd.DataFrame | None:
         path = os.path.join(self.cache_dir, f"{key}.parquet")
         if os.path.exists(path):
             age_minutes = (time.time() - os.path.getmtime(path)) / 60
             if age_minutes < 30:  # cache valid for 30 min
-                return pd.read_parquet(path)
+                return pd.read_parquet(path, engine="pyarrow")
         return None
 
     def _save_cache(self, key: str, df: pd.DataFrame):
         path = os.path.join(self.cache_dir, f"{key}.parquet")
-        df.to_parquet(path)
+        df.to_parquet(path, row_group_size=50000, **PARQUET_WRITE_OPTIONS)
 
     def get_candles(
         self,
@@ -61,50 +119,111 @@ class MarketData:
         """Fetch recent OHLCV candles as a DataFrame.
 
         Returns DataFrame with columns: timestamp, open, high, low, close, volume
-        sorted by timestamp ascending.
+        sorted by timestamp ascending. Closed candles are cached; the
+        in-progress candle, whose close and volume keep changing, is fetched
+        on every call.
         """
         seconds_per = GRANULARITY_SECONDS[granularity]
-        end = int(time.time())
-        start = end - (num_candles * seconds_per)
-
-        cache_key = self._cache_key(product_id, granularity, start, end)
+        end_bucket = int(time.time()) // seconds_per * seconds_per
+        start_bucket = end_bucket - (num_candles * seconds_per)
+        closed = self._get_candles_cached(product_id, granularity, start_bucket, end_bucket)
+        current = self._fetch_open_candle(product_id, granularity, end_bucket)
+        if current.empty:
+            # Shallow copy so callers adding indicator columns don't mutate the
+            # cached frame; copy-on-write copies a column only if it is written to
+            return closed.copy(deep=False)
+        if closed.empty:
+            return current
+        return pd.concat([closed, current], ignore_index=True)
+
+    def get_candles_multi(
+        self,
+        product_ids: list[str],
+        granularity: str = "ONE_HOUR",
+        num_candles: int = 100,
+    ) -> dict[str, pd.DataFrame]:
+        """get_candles for several products, fetched concurrently.
+
+        With a candle_feed attached, five-minute candles come from its live
+        buffers; only products it can't serve yet are fetched over REST,
+        and those frames seed the feed. Returns product_id → DataFrame in
+        the order of product_ids; products whose fetch fails are logged and
+        left out.
+        """
+        frames = {}
+        feed = self.candle_feed if granularity == FEED_GRANULARITY else None
+        if feed is not None:
+            for pid in product_ids:
+                df = feed.get_candles(pid, num_candles)
+                if df is not None:
+                    frames[pid] = df
+
+        def fetch(product_id):
+            try:
+                return self.get_candles(product_id, granularity=granularity, num_candles=num_candles)
+            except Exception as e:
+                log.error(f"Candle fetch failed for {product_id}: {e}")
+                return None
+
+        missing = [pid for pid in product_ids if pid not in frames]
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(MAX_FETCH_WORKERS, len(missing))) as executor:
+                for pid, df in zip(missing, executor.map(fetch, missing)):
+                    if df is None:
+                        continue
+                    frames[pid] = df
+                    if feed is not None and pid in feed.product_ids:
+                        feed.seed(pid, df)
+        return {pid: frames[pid] for pid in product_ids if pid in frames}
+
+    def _fetch_candles(self, product_id: str, granularity: str,
+                       start_bucket: int, end_bucket: int) -> pd.DataFrame:
+        """Load the closed candles before end_bucket from disk cache or the API.
+
+        Closed candles no longer change, so the result is safe to memoize.
+        """
+        seconds_per = GRANULARITY_SECONDS[granularity]
+        cache_key = self._cache_key(product_id, granularity, start_bucket, end_bucket)
         cached = self._load_cache(cache_key)
         if cached is not None:
-            log.debug(f"Cache hit for {product_id} {granularity}")
+            log.debug("Cache hit for %s %s", product_id, granularity)
             return cached
 
-        # Coinbase limits ~300 candles per request; paginate if needed
-        all_candles = []
-        chunk_start = start
-        max_per_request = 300
-
-        while chunk_start < end:
-            chunk_end = min(chunk_start + max_per_request * seconds_per, end)
-            candles = self.client.get_candles(
-                product_id=product_id,
-                start=chunk_start,
-                end=chunk_end,
-                granularity=granularity,
-            )
-            all_candles.extend(candles)
-            chunk_start = chunk_end
-            if len(candles) < max_per_request:
-                break
-
-        if not all_candles:
+        # Paginated windows are independent; fetch them in parallel
+        frames = fetch_chunks(
+            self.client, product_id, granularity, candle_chunks(start_bucket, end_bucket, seconds_per)
+        )
+        if not any(len(f) for f in frames):
             log.warning(f"No candles returned for {product_id}")
-            return pd.DataFrame(columns=["timestamp", "open", "high", "low", "close", "volume"])
+            return empty_candles()
 
-        df = pd.DataFrame(all_candles)
-        df.rename(columns={"start": "timestamp"}, inplace=True)
-        df = df[["timestamp", "open", "high", "low", "close", "volume"]]
-        df = df.sort_values("timestamp").drop_duplicates("timestamp").reset_index(drop=True)
+        df = dedupe_candles(pd.concat(frames, ignore_index=True))
+        # Keep the in-progress candle out, should the API's end bound include it
+        df = df[df["timestamp"] < end_bucket].reset_index(drop=True)
 
         self._save_cache(cache_key, df)
         log.info(f"Fetched {len(df)} candles for {product_id} ({granularity})")
         return df
 
+    def _fetch_open_candle(self, product_id: str, granularity: str, end_bucket: int) -> pd.DataFrame:
+        """The in-progress candle (starting at end_bucket), fresh from the API."""
+        df = self.client.get_candles(product_id, end_bucket, int(time.time()), granularity)
+        return df[df["timestamp"] >= end_bucket].reset_index(drop=True)
+
     def get_current_price(self, product_id: str) -> float:
-        """Get the latest price for a product."""
-        product = self.client.get_product(product_id)
+        """Get the latest price for a product (at most PRICE_MAX_AGE_SECONDS old)."""
+        product = self.client.get_product(product_id, max_age=PRICE_MAX_AGE_SECONDS)
         return float(product.get("price", 0))
+
+    def get_current_prices(self, product_ids: list[str]) -> dict[str, float]:
+        """Latest prices for several products.
+
+        Fresh ticker_feed prices are used first; the rest come from one API
+        request. Products neither source returns are left out.
+        """
+        prices = self.ticker_feed.get_prices(product_ids) if self.ticker_feed else {}
+        missing = [pid for pid in product_ids if pid not in prices]
+        if missing:
+            products = self.client.get_products(missing, max_age=PRICE_MAX_AGE_SECONDS)
+            prices.update((pid, float(product.get("price", 0))) for pid, product in products.items())
+        return prices
@@ -0,0 +1,75 @@
+"""Shared rate limiting for concurrent Coinbase API calls."""
+
+import random
+import threading
+import time
+
+from requests.exceptions import HTTPError
+
+from src.utils.logger import setup_logger
+
+log = setup_logger("rate-limiter")
+
+
+class RateLimiter:
+    """Cap in-flight requests and space request starts by a minimum interval.
+
+    One instance is shared by every worker thread, so parallel fetches
+    cooperate on a single budget instead of each sleeping in isolation.
+    Use as a context manager around each API call.
+    """
+
+    def __init__(self, max_concurrent: int = 10, min_interval: float = 0.1):
+        self.min_interval = min_interval
+        self._slots = threading.Semaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self._next_start = 0.0  # monotonic time the next request may start
+
+    def __enter__(self):
+        self._slots.acquire()
+        with self._lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_start)
+            self._next_start = start_at + self.min_interval
+        if start_at > now:
+            time.sleep(start_at - now)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._slots.release()
+        return False
+
+
+def _retry_after_seconds(response) -> float | None:
+    """Parse a numeric Retry-After header, if the response has one."""
+    try:
+        return float(response.headers["Retry-After"])
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return None
+
+
+def call_with_backoff(fn, *args, limiter: RateLimiter | None = None,
+                      max_retries: int = 5, base_delay: float = 0.5,
+                      max_delay: float = 16.0, **kwargs):
+    """Call fn(*args, **kwargs), retrying HTTP 429 with exponential backoff + full jitter.
+
+    A Retry-After header on the 429 response sets the minimum wait. If a
+    limiter is given, each attempt runs inside it. Non-429 errors and the
+    final failed attempt are re-raised unchanged.
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            if limiter is None:
+                return fn(*args, **kwargs)
+            with limiter:
+                return fn(*args, **kwargs)
+        except HTTPError as e:
+            status = getattr(e.response, "status_code", None)
+            if status != 429 or attempt == max_retries:
+                raise
+            delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+            retry_after = _retry_after_seconds(e.response)
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+            log.warning(f"Rate limited (429), retry {attempt + 1}/{max_retries} in {delay:.2f}s")
+            time.sleep(delay)
@@ -0,0 +1,69 @@
+"""Live last-trade prices from the Coinbase websocket ticker channel."""
+
+import os
+import threading
+import time
+
+import orjson
+
+from src.utils.logger import setup_logger
+
+log = setup_logger("ticker-feed")
+
+# A price with no ticker update for this long is not trusted (quiet market or
+# dropped connection); callers fall back to REST for it
+TICKER_STALE_SECONDS = 30.0
+
+
+class TickerFeed:
+    """Latest ticker price per product, kept current by the websocket.
+
+    Subscribes once to every product the bot may price (trading and grid
+    pairs), so opening or closing positions never needs a resubscribe.
+    """
+
+    def __init__(self, product_ids: list[str]):
+        self.product_ids = list(product_ids)
+        self._prices: dict[str, tuple[float, float]] = {}  # product_id → (price, monotonic time)
+        self._lock = threading.Lock()
+        self._ws = None
+
+    def start(self):
+        """Connect and subscribe to the ticker channel (uses the .env API key)."""
+        from coinbase.websocket import WSClient
+
+        self._ws = WSClient(
+            api_key=os.getenv("COINBASE_API_KEY"),
+            api_secret=os.getenv("COINBASE_API_SECRET"),
+            on_message=self.on_message,
+            retry=True,
+        )
+        self._ws.open()
+        self._ws.ticker(self.product_ids)
+        log.info(f"Ticker feed subscribed: {self.product_ids}")
+
+    def stop(self):
+        if self._ws is not None:
+            self._ws.close()
+            self._ws = None
+
+    def get_prices(self, product_ids: list[str]) -> dict[str, float]:
+        """Fresh prices for the given products; stale or unseen ones are left out."""
+        cutoff = time.monotonic() - TICKER_STALE_SECONDS
+        with self._lock:
+            entries = [(pid, self._prices.get(pid)) for pid in product_ids]
+        return {pid: e[0] for pid, e in entries if e is not None and e[1] >= cutoff}
+
+    def on_message(self, raw: str):
+        """Apply a websocket message (called on the client's thread)."""
+        msg = orjson.loads(raw)
+        if msg.get("channel") != "ticker":
+            return
+        now = time.monotonic()
+        updates = {
+            ticker["product_id"]: (float(ticker["price"]), now)
+            for event in msg.get("events", [])
+            for ticker in event.get("tickers", [])
+        }
+        with self._lock:
+            self._prices.update(updates)
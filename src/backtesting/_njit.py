@@ -0,0 +1,20 @@
+"""Optional Numba JIT for backtest kernels.
+
+Uses numba's njit when it is installed; otherwise njit is a no-op and the
+kernels run as plain Python over the same NumPy arrays. Kernels are
+declared with cache=True, so the compiled machine code is written next to
+the module and later processes load it instead of re-compiling — no
+separate ahead-of-time build step to keep in sync with the source.
+"""
+
+try:
+    from numba import njit
+
+    HAVE_NUMBA = True
+except ImportError:  # numba is optional
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda fn: fn
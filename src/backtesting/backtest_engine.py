@@ -1,32 +1,59 @@
 """Backtest engine — simulate strategy on historical data."""
 
+import copy
+import os
 import time
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 
+import numpy as np
 import pandas as pd
 
+from src.backtesting._njit import njit
 from src.strategy.indicators import add_all_indicators
-from src.strategy.signal_generator import SignalGenerator, SignalType
+from src.strategy.signal_generator import SIGNAL_BUY, SignalGenerator
 from src.utils.logger import setup_logger
 
 log = setup_logger("backtest")
 
+# Exit reason codes returned by _scan_exit
+EXIT_TAKE_PROFIT, EXIT_TRAILING_STOP, EXIT_STOP_LOSS, EXIT_END_OF_DATA = range(4)
+EXIT_REASONS = ("take_profit", "trailing_stop", "stop_loss", "end_of_data")
+
+
+@dataclass(slots=True)
+class BacktestPositions:
+    """Open positions as struct-of-arrays, one slot per product."""
+
+    entry_price: np.ndarray
+    size: np.ndarray
+    usd_cost: np.ndarray
+    entry_idx: np.ndarray
+    exit_idx: np.ndarray
+    exit_price: np.ndarray
+    exit_reason: np.ndarray
+    active: np.ndarray
+
+    @classmethod
+    def empty(cls, n_products: int) -> "BacktestPositions":
+        return cls(
+            entry_price=np.zeros(n_products),
+            size=np.zeros(n_products),
+            usd_cost=np.zeros(n_products),
+            entry_idx=np.zeros(n_products, dtype=np.int64),
+            exit_idx=np.zeros(n_products, dtype=np.int64),
+            exit_price=np.zeros(n_products),
+            exit_reason=np.zeros(n_products, dtype=np.int8),
+            active=np.zeros(n_products, dtype=bool),
+        )
 
-@dataclass
-class BacktestPosition:
-    product_id: str
-    entry_price: float
-    size: float
-    usd_cost: float
-    stop_loss: float
-    take_profit: float
-    entry_idx: int = 0
-    highest_price: float = 0.0
-    trailing_active: bool = False
-    trailing_stop: float = 0.0
+    def in_entry_order(self, mask: np.ndarray) -> np.ndarray:
+        """Slots selected by mask, ordered by when they were opened."""
+        slots = np.flatnonzero(mask)
+        return slots[np.argsort(self.entry_idx[slots], kind="stable")]
 
 
-@dataclass
+@dataclass(slots=True)
 class BacktestTrade:
     product_id: str
     entry_price: float
@@ -41,7 +68,7 @@ class BacktestTrade:
     exit_idx: int
 
 
-@dataclass
+@dataclass(slots=True)
 class BacktestResult:
     trades: list[BacktestTrade] = field(default_factory=list)
     starting_capital: float = 0.0
@@ -56,6 +83,56 @@ class BacktestResult:
     sharpe_ratio: float = 0.0
     profit_factor: float = 0.0
     total_pnl: float = 0.0
+    equity_curve: np.ndarray = field(default_factory=lambda: np.zeros(0))
+
+
+@njit(cache=True)
+def _scan_exit(close, high, low, start, end, entry_price, stop_loss, take_profit,
+               trailing_activate, trailing_distance):
+    """Walk candles start..end-1 until a position opened before start exits.
+
+    On a candle where several exits hit, take-profit wins over the trailing
+    stop (armed once the high-water gain reaches trailing_activate), which
+    wins over the stop-loss.
+
+    Returns:
+        (exit_idx, exit_price, exit_reason code). A position that never
+        hits an exit closes at the last candle's close with EXIT_END_OF_DATA.
+    """
+    highest = entry_price
+    trailing_active = False
+    trailing_stop = 0.0
+    for j in range(start, end):
+        h = high[j]
+        lo = low[j]
+        if h > highest:
+            highest = h
+
+        # Arm the trailing stop once the high-water gain is big enough, then
+        # ratchet it up behind the high
+        if not trailing_active:
+            trailing_active = (highest - entry_price) / entry_price >= trailing_activate
+        if trailing_active:
+            trailing_stop = max(trailing_stop, highest * (1 - trailing_distance))
+
+        # All three exits are evaluated every candle; the priority order only
+        # matters on the (rare) candle where one of them hits
+        hit_tp = h >= take_profit
+        hit_trail = trailing_active & (lo <= trailing_stop)
+        hit_sl = lo <= stop_loss
+        if hit_tp | hit_trail | hit_sl:
+            if hit_tp:
+                return j, take_profit, EXIT_TAKE_PROFIT
+            if hit_trail:
+                return j, trailing_stop, EXIT_TRAILING_STOP
+            return j, stop_loss, EXIT_STOP_LOSS
+    return end - 1, close[end - 1], EXIT_END_OF_DATA
+
+
+def _run_single(config: dict, data: dict[str, pd.DataFrame]):
+    """Worker for run_parallel: returns (trades, ending capital, equity curve)."""
+    result = BacktestEngine(config).run(data)
+    return result.trades, result.ending_capital, result.equity_curve
 
 
 class BacktestEngine:
@@ -84,16 +161,13 @@ class BacktestEngine:
         """
         capital = self.config.get("capital", {}).get("initial_usd", 300.0)
         starting_capital = capital
-        positions: dict[str, BacktestPosition] = {}
         trades: list[BacktestTrade] = []
-        equity_curve = [capital]
 
-        # Add indicators to all datasets
+        # Add indicators to all datasets. A shallow copy is enough: new
+        # indicator columns never reach the caller's frame under copy-on-write.
         enriched = {}
         for pid, df in data.items():
-            df = df.copy()
-            df = add_all_indicators(df, self.config)
-            enriched[pid] = df
+            enriched[pid] = add_all_indicators(df.copy(deep=False), self.config)
 
         # Find common index range
         min_len = min(len(df) for df in enriched.values())
@@ -101,160 +175,178 @@ class BacktestEngine:
             log.warning("Insufficient data for backtest")
             return BacktestResult(starting_capital=starting_capital, ending_capital=capital)
 
-        # Walk forward through candles
+        # Plain arrays for per-candle price lookups, one row per product.
+        # Kept float64: exits trigger on absolute levels rounded to 6 decimals,
+        # finer than float32 can hold at BTC-sized prices.
+        pids = list(enriched)
+        closes = np.vstack([df["close"].to_numpy(dtype=np.float64)[:min_len] for df in enriched.values()])
+        highs = np.vstack([df["high"].to_numpy(dtype=np.float64)[:min_len] for df in enriched.values()])
+        lows = np.vstack([df["low"].to_numpy(dtype=np.float64)[:min_len] for df in enriched.values()])
+        # BUY/SELL/HOLD code per candle, so the walk only looks signals up
+        signal_codes = [self.signal_gen.precompute_signals(df) for df in enriched.values()]
+        pos = BacktestPositions.empty(len(pids))
+        n_open = 0
+
+        # Walk forward through candles. Each position's exit is found by
+        # _scan_exit when it opens, so the loop only books exits as they come due.
         for i in range(30, min_len):
             # Check exits first
-            for pid in list(positions.keys()):
-                pos = positions[pid]
-                df = enriched[pid]
-                current_price = df.iloc[i]["close"]
-                high = df.iloc[i]["high"]
-                low = df.iloc[i]["low"]
-
-                # Update highest price
-                if high > pos.highest_price:
-                    pos.highest_price = high
-
-                exit_reason = None
-
-                # Take-profit
-                if high >= pos.take_profit:
-                    exit_reason = "take_profit"
-                    exit_price = pos.take_profit
-
-                # Trailing stop logic
-                gain_pct = (pos.highest_price - pos.entry_price) / pos.entry_price
-                if not pos.trailing_active and gain_pct >= self.trailing_activate:
-                    pos.trailing_active = True
-                    pos.trailing_stop = pos.highest_price * (1 - self.trailing_distance)
-
-                if pos.trailing_active:
-                    new_trail = pos.highest_price * (1 - self.trailing_distance)
-                    if new_trail > pos.trailing_stop:
-                        pos.trailing_stop = new_trail
-                    if low <= pos.trailing_stop and exit_reason is None:
-                        exit_reason = "trailing_stop"
-                        exit_price = pos.trailing_stop
-
-                # Stop-loss
-                if low <= pos.stop_loss and exit_reason is None:
-                    exit_reason = "stop_loss"
-                    exit_price = pos.stop_loss
-
-                if exit_reason:
-                    usd_return = pos.size * exit_price
-                    pnl = usd_return - pos.usd_cost
-                    trade = BacktestTrade(
-                        product_id=pid,
-                        entry_price=pos.entry_price,
-                        exit_price=exit_price,
-                        size=pos.size,
-                        usd_cost=pos.usd_cost,
-                        usd_return=usd_return,
-                        pnl=pnl,
-                        pnl_pct=pnl / pos.usd_cost if pos.usd_cost else 0,
-                        exit_reason=exit_reason,
-                        entry_idx=pos.entry_idx,
-                        exit_idx=i,
-                    )
-                    trades.append(trade)
-                    capital += usd_return
-                    del positions[pid]
+            due = pos.active & (pos.exit_idx == i) & (pos.exit_reason != EXIT_END_OF_DATA)
+            if due.any():
+                for k in pos.in_entry_order(due):
+                    capital += self._close_position(pos, k, pids[k], trades)
+                    n_open -= 1
 
             # Check for new entry signals
-            for pid, df in enriched.items():
-                if pid in positions:
+            for k in range(len(pids)):
+                if pos.active[k]:
                     continue
-                if len(positions) >= self.max_open:
+                if n_open >= self.max_open:
                     break
 
-                window = df.iloc[:i + 1]
-                signal = self.signal_gen.generate(window, pid)
-
-                if signal.signal_type == SignalType.BUY:
+                if signal_codes[k][i] == SIGNAL_BUY:
                     usd_amount = capital * self.max_position_pct
                     if usd_amount < 1.0:
                         continue
-                    price = df.iloc[i]["close"]
-                    size = usd_amount / price
+                    price = closes[k, i]
+                    stop_loss, take_profit = self.signal_gen.buy_levels(price)
                     capital -= usd_amount
 
-                    positions[pid] = BacktestPosition(
-                        product_id=pid,
-                        entry_price=price,
-                        size=size,
-                        usd_cost=usd_amount,
-                        stop_loss=signal.stop_loss,
-                        take_profit=signal.take_profit,
-                        entry_idx=i,
-                        highest_price=price,
+                    pos.entry_price[k] = price
+                    pos.size[k] = usd_amount / price
+                    pos.usd_cost[k] = usd_amount
+                    pos.entry_idx[k] = i
+                    pos.exit_idx[k], pos.exit_price[k], pos.exit_reason[k] = _scan_exit(
+                        closes[k], highs[k], lows[k], i + 1, min_len, price,
+                        stop_loss, take_profit,
+                        self.trailing_activate, self.trailing_distance,
                     )
-
-            # Track equity
-            unrealized = sum(
-                pos.size * enriched[pid].iloc[i]["close"] - pos.usd_cost
-                for pid, pos in positions.items()
-            )
-            equity_curve.append(capital + unrealized +
-                                sum(pos.usd_cost for pos in positions.values()))
+                    pos.active[k] = True
+                    n_open += 1
 
         # Close remaining positions at last price
-        for pid, pos in list(positions.items()):
-            last_price = enriched[pid].iloc[min_len - 1]["close"]
-            usd_return = pos.size * last_price
-            pnl = usd_return - pos.usd_cost
-            trades.append(BacktestTrade(
-                product_id=pid,
-                entry_price=pos.entry_price,
-                exit_price=last_price,
-                size=pos.size,
-                usd_cost=pos.usd_cost,
-                usd_return=usd_return,
-                pnl=pnl,
-                pnl_pct=pnl / pos.usd_cost if pos.usd_cost else 0,
-                exit_reason="end_of_data",
-                entry_idx=pos.entry_idx,
-                exit_idx=min_len - 1,
-            ))
-            capital += usd_return
+        for k in pos.in_entry_order(pos.active):
+            capital += self._close_position(pos, k, pids[k], trades)
 
+        equity_curve = self._equity_curve(trades, pids, closes, starting_capital, 30)
         return self._calc_metrics(trades, starting_capital, capital, equity_curve)
 
+    def run_parallel(self, data: dict[str, pd.DataFrame],
+                     max_workers: int | None = None) -> BacktestResult:
+        """Backtest each product in its own process and combine the results.
+
+        Unlike run(), products don't share a capital pool or the
+        max_open_positions cap: each gets an equal slice of the initial
+        capital. Trades are merged in exit order and metrics recomputed on
+        the summed equity curve.
+        """
+        capital = self.config.get("capital", {}).get("initial_usd", 300.0)
+        if not data:
+            return BacktestResult(starting_capital=capital, ending_capital=capital)
+
+        worker_config = copy.deepcopy(self.config)
+        worker_config.setdefault("capital", {})["initial_usd"] = capital / len(data)
+        workers = min(max_workers or os.cpu_count() or 1, len(data))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_run_single, worker_config, {pid: df}) for pid, df in data.items()]
+            results = [f.result() for f in futures]
+
+        trades = sorted((t for r in results for t in r[0]), key=lambda t: (t.exit_idx, t.entry_idx))
+        # A sleeve's curve ends at its unrounded ending capital; too-short data has no curve
+        curves = [curve if len(curve) else np.array([end]) for _, end, curve in results]
+        ending_capital = float(sum(curve[-1] for curve in curves))
+
+        # Products can cover different lengths; a finished sleeve holds its final equity
+        equity_curve = np.zeros(max(len(curve) for curve in curves))
+        for curve in curves:
+            equity_curve[:len(curve)] += curve
+            equity_curve[len(curve):] += curve[-1]
+        return self._calc_metrics(trades, capital, ending_capital, equity_curve)
+
+    @staticmethod
+    def _close_position(pos: BacktestPositions, k: int, product_id: str,
+                        trades: list[BacktestTrade]) -> float:
+        """Book slot k as a trade at its scanned exit. Returns the USD proceeds."""
+        size = float(pos.size[k])
+        usd_cost = float(pos.usd_cost[k])
+        exit_price = float(pos.exit_price[k])
+        usd_return = size * exit_price
+        pnl = usd_return - usd_cost
+        trades.append(BacktestTrade(
+            product_id=product_id,
+            entry_price=float(pos.entry_price[k]),
+            exit_price=exit_price,
+            size=size,
+            usd_cost=usd_cost,
+            usd_return=usd_return,
+            pnl=pnl,
+            pnl_pct=pnl / usd_cost if usd_cost else 0,
+            exit_reason=EXIT_REASONS[pos.exit_reason[k]],
+            entry_idx=int(pos.entry_idx[k]),
+            exit_idx=int(pos.exit_idx[k]),
+        ))
+        pos.active[k] = False
+        return usd_return
+
+    @staticmethod
+    def _equity_curve(trades: list[BacktestTrade], pids: list[str], closes: np.ndarray,
+                      starting_capital: float, first_idx: int) -> np.ndarray:
+        """Rebuild per-candle equity (cash + marked-to-close holdings) from the trades.
+
+        Entry costs leave cash on the entry candle and exit proceeds return on
+        the exit candle; a position is marked at the close of every candle it
+        is held at the end of. Returns starting_capital followed by equity at
+        each candle from first_idx on.
+        """
+        n_candles = closes.shape[1]
+        cash_delta = np.zeros(n_candles)
+        holdings = np.zeros(n_candles)
+        row = {pid: k for k, pid in enumerate(pids)}
+        for t in trades:
+            cash_delta[t.entry_idx] -= t.usd_cost
+            if t.exit_reason == "end_of_data":  # still held on the last candle
+                held_until = n_candles
+            else:
+                held_until = t.exit_idx
+                cash_delta[t.exit_idx] += t.usd_return
+            holdings[t.entry_idx:held_until] += t.size * closes[row[t.product_id], t.entry_idx:held_until]
+        # Fill one preallocated curve in place instead of chaining temporaries
+        curve = np.empty(n_candles - first_idx + 1)
+        curve[0] = starting_capital
+        np.cumsum(cash_delta, out=cash_delta)
+        np.add(cash_delta[first_idx:], starting_capital, out=curve[1:])
+        curve[1:] += holdings[first_idx:]
+        return curve
+
     def _calc_metrics(self, trades, starting_capital, ending_capital, equity_curve) -> BacktestResult:
         if not trades:
             return BacktestResult(
                 starting_capital=starting_capital,
                 ending_capital=ending_capital,
+                equity_curve=np.asarray(equity_curve, dtype=np.float64),
             )
 
-        wins = [t for t in trades if t.pnl > 0]
-        losses = [t for t in trades if t.pnl <= 0]
+        pnls = np.fromiter((t.pnl for t in trades), dtype=np.float64, count=len(trades))
+        win_mask = pnls > 0
+        win_pnls = pnls[win_mask]
+        loss_pnls = pnls[~win_mask]
 
         # Max drawdown
-        peak = equity_curve[0]
-        max_dd = 0
-        for eq in equity_curve:
-            if eq > peak:
-                peak = eq
-            dd = (peak - eq) / peak if peak > 0 else 0
-            if dd > max_dd:
-                max_dd = dd
+        eq = np.asarray(equity_curve, dtype=np.float64)
+        peaks = np.maximum.accumulate(eq)
+        drawdowns = np.divide(peaks - eq, peaks, out=np.zeros_like(eq), where=peaks > 0)
+        max_dd = max(float(drawdowns.max()), 0.0)
 
         # Sharpe ratio (simplified — daily returns)
-        returns = []
-        for i in range(1, len(equity_curve)):
-            r = (equity_curve[i] - equity_curve[i - 1]) / equity_curve[i - 1] if equity_curve[i - 1] else 0
-            returns.append(r)
-
-        import numpy as np
-        returns_arr = np.array(returns)
+        prev = eq[:-1]
+        returns_arr = np.divide(np.diff(eq), prev, out=np.zeros_like(prev), where=prev != 0)
         mean_r = returns_arr.mean() if len(returns_arr) else 0
         std_r = returns_arr.std() if len(returns_arr) else 1
         sharpe = (mean_r / std_r * (252 ** 0.5)) if std_r > 0 else 0
 
         # Profit factor
-        gross_profit = sum(t.pnl for t in wins)
-        gross_loss = abs(sum(t.pnl for t in losses))
+        gross_profit = float(win_pnls.sum())
+        gross_loss = abs(float(loss_pnls.sum()))
         profit_factor = gross_profit / gross_loss if gross_loss > 0 else float("inf")
 
         return BacktestResult(
@@ -262,13 +354,14 @@ class BacktestEngine:
             starting_capital=starting_capital,
             ending_capital=round(ending_capital, 2),
             total_return_pct=round((ending_capital - starting_capital) / starting_capital * 100, 2),
-            win_count=len(wins),
-            loss_count=len(losses),
-            win_rate=round(len(wins) / len(trades), 2) if trades else 0,
-            avg_win=round(sum(t.pnl for t in wins) / len(wins), 2) if wins else 0,
-            avg_loss=round(sum(t.pnl for t in losses) / len(losses), 2) if losses else 0,
+            win_count=len(win_pnls),
+            loss_count=len(loss_pnls),
+            win_rate=round(len(win_pnls) / len(trades), 2),
+            avg_win=round(gross_profit / len(win_pnls), 2) if len(win_pnls) else 0,
+            avg_loss=round(float(loss_pnls.sum()) / len(loss_pnls), 2) if len(loss_pnls) else 0,
             max_drawdown_pct=round(max_dd * 100, 2),
-            sharpe_ratio=round(sharpe, 2),
+            sharpe_ratio=round(float(sharpe), 2),
             profit_factor=round(profit_factor, 2),
-            total_pnl=round(sum(t.pnl for t in trades), 2),
+            total_pnl=round(float(pnls.sum()), 2),
+            equity_curve=eq,
         )
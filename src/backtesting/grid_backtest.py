@@ -1,16 +1,19 @@
 """Grid strategy backtester — simulate grid trading on historical OHLCV data."""
 
+import heapq
 from dataclasses import dataclass, field
 
+import numpy as np
 import pandas as pd
 
+from src.backtesting._njit import njit
 from src.strategy.grid_strategy import GridStrategy
 from src.utils.logger import setup_logger
 
 log = setup_logger("grid-backtest")
 
 
-@dataclass
+@dataclass(slots=True)
 class GridBacktestTrade:
     product_id: str
     side: str
@@ -20,7 +23,7 @@ class GridBacktestTrade:
     candle_idx: int
 
 
-@dataclass
+@dataclass(slots=True)
 class GridBacktestResult:
     trades: list[GridBacktestTrade] = field(default_factory=list)
     total_pnl: float = 0.0
@@ -32,6 +35,20 @@ class GridBacktestResult:
     num_rebalances: int = 0
 
 
+@njit(cache=True)
+def _scan_grid(close, low, high, start, stop, buy_max, sell_min, center, rebalance_threshold):
+    """First candle in [start, stop) that fills an open level or triggers a rebalance.
+
+    That is a candle whose low reaches buy_max (the highest open buy), whose
+    high reaches sell_min (the lowest open sell), or whose close drifts
+    rebalance_threshold or more from center. Returns stop if none.
+    """
+    for j in range(start, stop):
+        if low[j] <= buy_max or high[j] >= sell_min or abs(close[j] - center) / center >= rebalance_threshold:
+            return j
+    return stop
+
+
 class GridBacktestEngine:
     """Simulate grid trading on historical candle data."""
 
@@ -70,55 +87,67 @@ class GridBacktestEngine:
         if min_len < 2:
             return GridBacktestResult(grid_capital=grid_capital)
 
-        for i in range(min_len):
-            for pid in pairs:
-                df = data[pid]
-                close = df.iloc[i]["close"]
-                high = df.iloc[i]["high"]
-                low = df.iloc[i]["low"]
-
-                # Initialize or rebalance grid
-                if self.grid.needs_rebalance(pid, close):
-                    preserved = self.grid.clear_grid(pid)
-                    total_pnl += preserved
-                    self.grid.initialize_grid(pid, close)
-                    num_rebalances += 1
-
-                    # Mark all levels as open
-                    for level in self.grid.get_pending_levels(pid):
-                        self.grid.mark_level_open(pid, level.index, f"bt-{i}-{level.index}")
-
-                # Check for fills using candle high/low
-                filled = self.grid.check_fills_paper(pid, close, low, high)
-
-                for level in filled:
-                    pnl = 0.0
-                    if level.side == "BUY":
-                        deployed += level.base_size * level.price
-                        total_buys += 1
-                    elif level.side == "SELL":
-                        buy_price = level.price * (1 - self.grid.spacing_pct)
-                        pnl = level.base_size * (level.price - buy_price)
-                        total_pnl += pnl
-                        deployed -= level.base_size * buy_price
-                        total_sells += 1
-
-                    trades.append(GridBacktestTrade(
-                        product_id=pid,
-                        side=level.side,
-                        price=level.price,
-                        size=level.base_size,
-                        pnl=pnl,
-                        candle_idx=i,
-                    ))
-
-                    # Place the opposite order
-                    new_level = self.grid.handle_fill(pid, level)
-                    if new_level:
-                        self.grid.mark_level_open(pid, new_level.index, f"bt-{i}-{new_level.index}")
-
-                if deployed > max_deployed:
-                    max_deployed = deployed
+        # (close, high, low) rows per pair, each row contiguous for the event scans
+        ohlc = {
+            pid: np.ascontiguousarray(data[pid][["close", "high", "low"]].to_numpy(dtype=np.float64).T)
+            for pid in pairs
+        }
+
+        # Only candles that can fill or rebalance a pair's grid need simulating.
+        # The heap yields them in (candle, pair) order, as a full scan would.
+        events = [(0, k) for k in range(len(pairs))]
+        while events:
+            i, k = heapq.heappop(events)
+            pid = pairs[k]
+            prices = ohlc[pid]
+            close, high, low = prices[:, i]
+
+            # Initialize or rebalance grid
+            if self.grid.needs_rebalance(pid, close):
+                preserved = self.grid.clear_grid(pid)
+                total_pnl += preserved
+                self.grid.initialize_grid(pid, close)
+                num_rebalances += 1
+
+                # Mark all levels as open
+                for level in self.grid.get_pending_levels(pid):
+                    self.grid.mark_level_open(pid, level.index, f"bt-{i}-{level.index}")
+
+            # Check for fills using candle high/low
+            filled = self.grid.check_fills_paper(pid, close, low, high)
+
+            for level in filled:
+                pnl = 0.0
+                if level.side == "BUY":
+                    deployed += level.base_size * level.price
+                    total_buys += 1
+                elif level.side == "SELL":
+                    buy_price = level.price * self.grid.down_mult
+                    pnl = level.base_size * (level.price - buy_price)
+                    total_pnl += pnl
+                    deployed -= level.base_size * buy_price
+                    total_sells += 1
+
+                trades.append(GridBacktestTrade(
+                    product_id=pid,
+                    side=level.side,
+                    price=level.price,
+                    size=level.base_size,
+                    pnl=pnl,
+                    candle_idx=i,
+                ))
+
+                # Place the opposite order
+                new_level = self.grid.handle_fill(pid, level)
+                if new_level:
+                    self.grid.mark_level_open(pid, new_level.index, f"bt-{i}-{new_level.index}")
+
+            if deployed > max_deployed:
+                max_deployed = deployed
+
+            nxt = self._next_event(pid, prices[0], prices[2], prices[1], i + 1, min_len)
+            if nxt < min_len:
+                heapq.heappush(events, (nxt, k))
 
         return_pct = (total_pnl / grid_capital * 100) if grid_capital > 0 else 0
 
@@ -132,3 +161,16 @@ class GridBacktestEngine:
             max_deployed=round(max_deployed, 2),
             num_rebalances=num_rebalances,
         )
+
+    def _next_event(self, product_id: str, close: np.ndarray, low: np.ndarray,
+                    high: np.ndarray, start: int, stop: int) -> int:
+        """Index of the first candle in [start, stop) that touches the pair's grid.
+
+        The grid can't change before then, so candles in between are skipped.
+        """
+        state = self.grid.grids[product_id]
+        open_levels = [l for l in state.levels.values() if l.status == "open"]
+        buy_max = max((l.price for l in open_levels if l.side == "BUY"), default=-np.inf)
+        sell_min = min((l.price for l in open_levels if l.side == "SELL"), default=np.inf)
+        return _scan_grid(close, low, high, start, stop, buy_max, sell_min,
+                          state.center_price, self.grid.rebalance_threshold)
@@ -0,0 +1,37 @@
+"""Saved historical candle files used by the backtest scripts."""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from src.api.coinbase_client import CANDLE_COLUMNS
+
+HISTORICAL_DIR = "data/historical"
+MAX_LOAD_WORKERS = 8
+
+
+def parquet_path(product_id: str, granularity: str, data_dir: str = HISTORICAL_DIR) -> str:
+    """Location of the saved candles for a pair."""
+    return os.path.join(data_dir, f"{product_id.replace('-', '_')}_{granularity}.parquet")
+
+
+def load_historical(pairs: list[str], granularity: str,
+                    data_dir: str = HISTORICAL_DIR) -> dict[str, pd.DataFrame]:
+    """Load saved OHLCV candles for each pair that has a file.
+
+    Files are read concurrently (pyarrow releases the GIL while decoding).
+    Returns product_id → DataFrame in the order of pairs; pairs without a
+    file are left out.
+    """
+    paths = {pair: parquet_path(pair, granularity, data_dir) for pair in pairs}
+    paths = {pair: path for pair, path in paths.items() if os.path.exists(path)}
+    if not paths:
+        return {}
+
+    def read(path):
+        return pd.read_parquet(path, engine="pyarrow", columns=CANDLE_COLUMNS)
+
+    with ThreadPoolExecutor(max_workers=min(MAX_LOAD_WORKERS, len(paths))) as executor:
+        frames = executor.map(read, paths.values())
+        return dict(zip(paths.keys(), frames))
@@ -1,5 +1,7 @@
 """Performance reporting for backtest results."""
 
+from collections import Counter, defaultdict
+
 from src.backtesting.backtest_engine import BacktestResult
 from src.utils.logger import setup_logger
 
@@ -29,25 +31,24 @@ def print_report(result: BacktestResult):
     print("=" * 60)
 
     if result.trades:
-        # Breakdown by exit reason
-        reasons = {}
+        # Per exit reason and per product counts/P&L, aggregated in one pass
+        reason_counts, reason_pnl = Counter(), defaultdict(float)
+        product_counts, product_pnl, product_wins = Counter(), defaultdict(float), Counter()
         for t in result.trades:
-            reasons.setdefault(t.exit_reason, []).append(t)
+            reason_counts[t.exit_reason] += 1
+            reason_pnl[t.exit_reason] += t.pnl
+            product_counts[t.product_id] += 1
+            product_pnl[t.product_id] += t.pnl
+            if t.pnl > 0:
+                product_wins[t.product_id] += 1
+
         print("\n  Exit Reason Breakdown:")
-        for reason, trades in sorted(reasons.items()):
-            count = len(trades)
-            pnl = sum(t.pnl for t in trades)
-            print(f"    {reason:20s}  {count:3d} trades  ${pnl:+8.2f}")
+        for reason, count in sorted(reason_counts.items()):
+            print(f"    {reason:20s}  {count:3d} trades  ${reason_pnl[reason]:+8.2f}")
 
-        # Breakdown by product
-        products = {}
-        for t in result.trades:
-            products.setdefault(t.product_id, []).append(t)
         print("\n  Product Breakdown:")
-        for pid, trades in sorted(products.items()):
-            count = len(trades)
-            pnl = sum(t.pnl for t in trades)
-            wins = sum(1 for t in trades if t.pnl > 0)
-            print(f"    {pid:12s}  {count:3d} trades  W:{wins} L:{count - wins}  ${pnl:+8.2f}")
+        for pid, count in sorted(product_counts.items()):
+            wins = product_wins[pid]
+            print(f"    {pid:12s}  {count:3d} trades  W:{wins} L:{count - wins}  ${product_pnl[pid]:+8.2f}")
 
     print()
@@ -1,15 +1,12 @@
 """SQLAlchemy models for trade history and performance tracking."""
 
-from datetime import datetime, timezone
-
-
-def _utcnow():
-    return datetime.now(timezone.utc)
-
-from sqlalchemy import Boolean, Column, DateTime, Float, Integer, String, create_engine
+from sqlalchemy import Boolean, Column, DateTime, Float, Index, Integer, String, create_engine, event, func, text
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from sqlalchemy.pool import QueuePool
 
 
+# Timestamp columns default to func.now(): SQLite fills CURRENT_TIMESTAMP (UTC)
+# inside the INSERT itself, so existing databases need no schema change.
 class Base(DeclarativeBase):
     pass
 
@@ -32,9 +29,14 @@ class Trade(Base):
     exit_reason = Column(String)  # stop_loss, take_profit, trailing_stop, signal
     order_id = Column(String)
     paper = Column(Integer, default=1)  # 1=paper, 0=live
-    entry_time = Column(DateTime, default=_utcnow)
+    entry_time = Column(DateTime, default=func.now())
     exit_time = Column(DateTime)
-    created_at = Column(DateTime, default=_utcnow)
+    created_at = Column(DateTime, default=func.now())
+
+    # Open trades only — serves the latest-open-trade lookup on close
+    __table_args__ = (
+        Index("ix_trades_open", product_id, id.desc(), sqlite_where=exit_price.is_(None)),
+    )
 
 
 class SignalLog(Base):
@@ -47,7 +49,7 @@ class SignalLog(Base):
     confidence = Column(Float)
     reasons = Column(String)  # JSON string
     acted_on = Column(Integer, default=0)  # 1 if a trade was placed
-    created_at = Column(DateTime, default=_utcnow)
+    created_at = Column(DateTime, default=func.now())
 
 
 class GridOrder(Base):
@@ -65,9 +67,14 @@ class GridOrder(Base):
     grid_center = Column(Float)  # center price when grid was created
     level_index = Column(Integer)  # grid level (-N to +N, 0 = center)
     paper = Column(Integer, default=1)
-    created_at = Column(DateTime, default=_utcnow)
+    created_at = Column(DateTime, default=func.now())
     filled_at = Column(DateTime)
 
+    # Open orders only — fills, cancels and open-order listings filter on status
+    __table_args__ = (
+        Index("ix_grid_orders_open", product_id, order_id, sqlite_where=status == "open"),
+    )
+
 
 class DailyPerformance(Base):
     __tablename__ = "daily_performance"
@@ -82,12 +89,50 @@ class DailyPerformance(Base):
     realized_pnl = Column(Float, default=0)
     unrealized_pnl = Column(Float, default=0)
     max_drawdown = Column(Float, default=0)
-    created_at = Column(DateTime, default=_utcnow)
+    created_at = Column(DateTime, default=func.now())
+
+
+SQLITE_MMAP_BYTES = 256 * 1024 * 1024
+SQLITE_CACHE_KIB = 64 * 1024
+SQLITE_BUSY_TIMEOUT = 30.0  # seconds
+
+
+def _set_sqlite_pragmas(dbapi_conn, _connection_record):
+    """WAL + synchronous=NORMAL: commits append to the log instead of fsyncing the db.
+
+    Temp tables/sorts stay in memory, reads go through a memory map, and
+    each connection keeps a 64 MiB page cache.
+    """
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_BYTES}")
+    cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_KIB}")  # negative = KiB
+    cursor.close()
 
 
 def init_db(db_path: str = "data/trading.db"):
     """Create all tables and return engine + session factory."""
-    engine = create_engine(f"sqlite:///{db_path}", echo=False)
+    # Pooled connections: each Session checkout reuses an open SQLite handle
+    # (and its pragmas/schema cache) instead of reopening the file. Not a
+    # StaticPool: a unit of work holds its connection for the whole tick.
+    # A 30s busy timeout lets writers wait out a script holding the lock.
+    engine = create_engine(
+        f"sqlite:///{db_path}",
+        poolclass=QueuePool,
+        pool_size=5,
+        connect_args={"timeout": SQLITE_BUSY_TIMEOUT},
+        echo=False,
+    )
+    event.listen(engine, "connect", _set_sqlite_pragmas)
     Base.metadata.create_all(engine)
+    # create_all skips existing tables, so add indexes introduced since a db was made
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+    # Refresh planner stats so the partial indexes win over the plain product_id ones
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
     Session = sessionmaker(bind=engine)
     return engine, Session
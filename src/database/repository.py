@@ -1,8 +1,13 @@
 """Database CRUD operations."""
 
-import json
-from datetime import datetime, timezone
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
 
+import orjson
+from sqlalchemy import Row, bindparam, func, insert, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 
 from src.database.models import DailyPerformance, GridOrder, SignalLog, Trade
@@ -13,75 +18,217 @@ from src.utils.logger import setup_logger
 log = setup_logger("db-repo")
 
 
+# Marks an open grid order filled; executed with one parameter set per fill
+_FILL_GRID_ORDER = (
+    update(GridOrder.__table__)
+    .where(GridOrder.order_id == bindparam("b_order_id"), GridOrder.status == "open")
+    .values(status="filled", fill_price=bindparam("b_fill_price"),
+            pnl=bindparam("b_pnl"), filled_at=func.now())
+)
+
+
+class BulkWriter:
+    """Buffer rows for one table and write them in a single transaction.
+
+    Rows are inserted, or passed as parameter sets to stmt when given.
+    Flushes once max_rows are queued or the oldest queued row is max_age
+    seconds old (checked on add), and whenever flush() is called.
+
+    session_scope is called as ``with session_scope() as session`` and must
+    commit on exit, e.g. Repository.session_scope.
+    """
+
+    def __init__(self, session_scope, model, max_rows: int = 100, max_age: float = 5.0,
+                 stmt=None):
+        self.session_scope = session_scope
+        self.model = model
+        self.stmt = stmt if stmt is not None else insert(model)
+        self.max_rows = max_rows
+        self.max_age = max_age
+        self._rows: deque[dict] = deque()
+        self._oldest_at = 0.0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def add(self, row: dict):
+        if not self._rows:
+            self._oldest_at = time.monotonic()
+        self._rows.append(row)
+        if len(self._rows) >= self.max_rows or time.monotonic() - self._oldest_at >= self.max_age:
+            self.flush()
+
+    def flush(self) -> int:
+        """Write all queued rows. Returns the number written."""
+        if not self._rows:
+            return 0
+        rows = list(self._rows)
+        try:
+            with self.session_scope() as session:
+                session.execute(self.stmt, rows)
+        except Exception:
+            log.error("Writing %d %s rows failed; kept for the next flush",
+                      len(rows), self.model.__tablename__)
+            raise
+        # Dropped only once written, so a failed write loses nothing
+        for _ in rows:
+            self._rows.popleft()
+        log.debug("Flushed %d %s rows", len(rows), self.model.__tablename__)
+        return len(rows)
+
+
 class Repository:
     """Database access layer for trades, signals, and daily performance."""
 
     def __init__(self, session_factory):
         self.Session = session_factory
+        self._uow: ContextVar[Session | None] = ContextVar(f"repo_session_{id(self)}", default=None)
+        self.signal_writer = BulkWriter(self.session_scope, SignalLog)
+        self.fill_writer = BulkWriter(self.session_scope, GridOrder, stmt=_FILL_GRID_ORDER)
+
+    # ── Sessions ────────────────────────────────────────────────────
+
+    @contextmanager
+    def unit_of_work(self):
+        """Run every repository call in the block on one Session, committed once at the end.
+
+        For batches of database work only: keep network calls (prices, order
+        placement) out of the block so the write lock isn't held across them.
+        When the block raises, rows written so far are still committed if the
+        session is usable, otherwise rolled back; the block's exception is
+        re-raised either way. Nested calls join the outer unit.
+        """
+        if self._uow.get() is not None:
+            yield
+            return
+        with self.Session() as session:
+            token = self._uow.set(session)
+            try:
+                yield
+            except BaseException:
+                transaction = session.get_transaction()
+                if transaction is not None and transaction.is_active:
+                    session.commit()
+                else:
+                    session.rollback()  # a failed flush left it unusable
+                raise
+            else:
+                session.commit()
+            finally:
+                self._uow.reset(token)
+
+    @contextmanager
+    def session_scope(self):
+        """The current unit of work's Session, or a new one committed on exit."""
+        session = self._uow.get()
+        if session is not None:
+            yield session
+            return
+        with self.Session() as session:
+            yield session
+            session.commit()
+
+    def _bulk_insert(self, model, rows: list[dict]) -> int:
+        if not rows:
+            return 0
+        with self.session_scope() as session:
+            session.execute(insert(model), rows)
+        return len(rows)
+
+    def flush(self):
+        """Write any buffered signal rows and grid fills."""
+        self.signal_writer.flush()
+        self.fill_writer.flush()
 
     # ── Trades ───────────────────────────────────────────────────────
 
     def save_trade_open(self, product_id: str, entry_price: float, size: float,
                         usd_cost: float, stop_loss: float, take_profit: float,
                         order_id: str, paper: bool) -> int:
-        with self.Session() as session:
-            trade = Trade(
-                product_id=product_id,
-                side="BUY",
-                entry_price=entry_price,
-                size=size,
-                usd_cost=usd_cost,
-                stop_loss=stop_loss,
-                take_profit=take_profit,
-                order_id=order_id,
-                paper=1 if paper else 0,
-            )
-            session.add(trade)
-            session.commit()
-            log.debug(f"Saved open trade #{trade.id} for {product_id}")
-            return trade.id
+        stmt = insert(Trade).values(
+            product_id=product_id,
+            side="BUY",
+            entry_price=entry_price,
+            size=size,
+            usd_cost=usd_cost,
+            stop_loss=stop_loss,
+            take_profit=take_profit,
+            order_id=order_id,
+            paper=1 if paper else 0,
+        ).returning(Trade.id)
+        with self.session_scope() as session:
+            trade_id = session.execute(stmt).scalar_one()
+        log.debug("Saved open trade #%s for %s", trade_id, product_id)
+        return trade_id
+
+    def save_trades_bulk(self, trades: list[dict]) -> int:
+        """Insert many trade rows (Trade column name → value) in one transaction."""
+        return self._bulk_insert(Trade, trades)
 
     def save_trade_close(self, product_id: str, closed: ClosedTrade):
-        with self.Session() as session:
-            # Find the most recent open trade for this product
-            trade = (
-                session.query(Trade)
-                .filter(Trade.product_id == product_id, Trade.exit_price.is_(None))
+        if closed.trade_id is not None:
+            trade_id = closed.trade_id
+        else:
+            # Row id not known (e.g. opened before a restart): close the most
+            # recent open trade for this product
+            trade_id = (
+                select(Trade.id)
+                .where(Trade.product_id == product_id, Trade.exit_price.is_(None))
                 .order_by(Trade.id.desc())
-                .first()
+                .limit(1)
+                .scalar_subquery()
             )
-            if trade:
-                trade.exit_price = closed.exit_price
-                trade.usd_return = closed.usd_return
-                trade.pnl = closed.pnl
-                trade.pnl_pct = closed.pnl_pct
-                trade.exit_reason = closed.exit_reason
-                trade.exit_time = datetime.now(timezone.utc)
-                session.commit()
-                log.debug(f"Saved close for trade #{trade.id}")
+        stmt = (
+            update(Trade)
+            .where(Trade.id == trade_id, Trade.exit_price.is_(None))
+            .values(
+                exit_price=closed.exit_price,
+                usd_return=closed.usd_return,
+                pnl=closed.pnl,
+                pnl_pct=closed.pnl_pct,
+                exit_reason=closed.exit_reason,
+                exit_time=func.now(),
+            )
+            .returning(Trade.id)
+        )
+        with self.session_scope() as session:
+            trade_id = session.execute(stmt).scalar()
+            if trade_id is not None:
+                log.debug("Saved close for trade #%s", trade_id)
 
-    def get_trades(self, limit: int = 50) -> list[Trade]:
-        with self.Session() as session:
-            return session.query(Trade).order_by(Trade.id.desc()).limit(limit).all()
+    # Read-only queries select from the tables directly and return plain Rows
+    # (same attribute names as the models) to skip ORM instance hydration.
 
-    def get_open_trades(self) -> list[Trade]:
-        with self.Session() as session:
-            return session.query(Trade).filter(Trade.exit_price.is_(None)).all()
+    def get_trades(self, limit: int = 50) -> list[Row]:
+        with self.session_scope() as session:
+            q = select(Trade.__table__).order_by(Trade.id.desc()).limit(limit)
+            return session.execute(q).all()
+
+    def get_open_trades(self) -> list[Row]:
+        with self.session_scope() as session:
+            q = select(Trade.__table__).where(Trade.exit_price.is_(None))
+            return session.execute(q).all()
 
     # ── Signals ──────────────────────────────────────────────────────
 
+    @staticmethod
+    def _signal_row(signal: Signal, acted_on: bool) -> dict:
+        return {
+            "product_id": signal.product_id,
+            "signal_type": signal.signal_type.value,
+            "price": signal.price,
+            "confidence": signal.confidence,
+            "reasons": orjson.dumps(signal.reasons).decode(),
+            "acted_on": 1 if acted_on else 0,
+        }
+
     def save_signal(self, signal: Signal, acted_on: bool = False):
-        with self.Session() as session:
-            entry = SignalLog(
-                product_id=signal.product_id,
-                signal_type=signal.signal_type.value,
-                price=signal.price,
-                confidence=signal.confidence,
-                reasons=json.dumps(signal.reasons),
-                acted_on=1 if acted_on else 0,
-            )
-            session.add(entry)
-            session.commit()
+        with self.session_scope() as session:
+            session.add(SignalLog(**self._signal_row(signal, acted_on)))
+
+    def queue_signal(self, signal: Signal, acted_on: bool = False):
+        """Buffer a signal row; written in batches by signal_writer."""
+        self.signal_writer.add(self._signal_row(signal, acted_on))
 
     # ── Daily Performance ────────────────────────────────────────────
 
@@ -100,79 +247,85 @@ class Repository:
         # Drop None values so defaults apply
         mapped = {k: v for k, v in mapped.items() if v is not None}
 
-        with self.Session() as session:
-            existing = session.query(DailyPerformance).filter_by(date=date_str).first()
-            if existing:
-                for k, v in mapped.items():
-                    setattr(existing, k, v)
-            else:
-                entry = DailyPerformance(date=date_str, **mapped)
-                session.add(entry)
-            session.commit()
+        # One statement: insert the day, or update the columns given if it exists
+        stmt = sqlite_insert(DailyPerformance).values(date=date_str, **mapped)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[DailyPerformance.date],
+            set_={k: stmt.excluded[k] for k in mapped},
+        )
+        with self.session_scope() as session:
+            session.execute(stmt)
 
-    def get_daily_performance(self, days: int = 30) -> list[DailyPerformance]:
-        with self.Session() as session:
-            return (
-                session.query(DailyPerformance)
-                .order_by(DailyPerformance.date.desc())
-                .limit(days)
-                .all()
-            )
+    def get_daily_performance(self, days: int = 30) -> list[Row]:
+        with self.session_scope() as session:
+            q = select(DailyPerformance.__table__).order_by(DailyPerformance.date.desc()).limit(days)
+            return session.execute(q).all()
 
     # ── Grid Orders ───────────────────────────────────────────────────
 
     def save_grid_order(self, product_id: str, side: str, level_price: float,
                         base_size: float, order_id: str, grid_center: float,
                         level_index: int, paper: bool, status: str = "open") -> int:
-        with self.Session() as session:
-            order = GridOrder(
-                product_id=product_id,
-                side=side,
-                level_price=level_price,
-                base_size=base_size,
-                order_id=order_id,
-                grid_center=grid_center,
-                level_index=level_index,
-                paper=1 if paper else 0,
-                status=status,
-            )
-            session.add(order)
-            session.commit()
-            log.debug(f"Saved grid order #{order.id} {side} {product_id} @ ${level_price:.4f}")
-            return order.id
+        stmt = insert(GridOrder).values(
+            product_id=product_id,
+            side=side,
+            level_price=level_price,
+            base_size=base_size,
+            order_id=order_id,
+            grid_center=grid_center,
+            level_index=level_index,
+            paper=1 if paper else 0,
+            status=status,
+        ).returning(GridOrder.id)
+        with self.session_scope() as session:
+            grid_order_id = session.execute(stmt).scalar_one()
+        log.debug("Saved grid order #%s %s %s @ $%.4f", grid_order_id, side, product_id, level_price)
+        return grid_order_id
+
+    def save_grid_orders_bulk(self, orders: list[dict]) -> int:
+        """Insert many grid order rows (GridOrder column name → value) in one transaction."""
+        return self._bulk_insert(GridOrder, orders)
 
     def fill_grid_order(self, order_id: str, fill_price: float, pnl: float = 0.0):
-        with self.Session() as session:
-            order = session.query(GridOrder).filter_by(order_id=order_id, status="open").first()
-            if order:
-                order.status = "filled"
-                order.fill_price = fill_price
-                order.pnl = pnl
-                order.filled_at = datetime.now(timezone.utc)
-                session.commit()
+        stmt = (
+            update(GridOrder)
+            .where(GridOrder.order_id == order_id, GridOrder.status == "open")
+            .values(status="filled", fill_price=fill_price, pnl=pnl, filled_at=func.now())
+        )
+        with self.session_scope() as session:
+            session.execute(stmt)
+
+    def queue_grid_fill(self, order_id: str, fill_price: float, pnl: float = 0.0):
+        """Buffer a fill; written in batches by fill_writer.
+
+        Grid order queries and cancels write pending fills first, so they
+        never see a queued fill's order as still open.
+        """
+        self.fill_writer.add({"b_order_id": order_id, "b_fill_price": fill_price, "b_pnl": pnl})
 
     def cancel_grid_orders(self, product_id: str):
-        with self.Session() as session:
-            orders = session.query(GridOrder).filter(
-                GridOrder.product_id == product_id,
-                GridOrder.status == "open"
-            ).all()
-            for order in orders:
-                order.status = "cancelled"
-            session.commit()
-            log.debug(f"Cancelled {len(orders)} grid orders for {product_id}")
+        stmt = (
+            update(GridOrder)
+            .where(GridOrder.product_id == product_id, GridOrder.status == "open")
+            .values(status="cancelled")
+        )
+        self.fill_writer.flush()
+        with self.session_scope() as session:
+            cancelled = session.execute(stmt).rowcount
+            log.debug("Cancelled %d grid orders for %s", cancelled, product_id)
 
-    def get_open_grid_orders(self, product_id: str = None) -> list[GridOrder]:
-        with self.Session() as session:
-            q = session.query(GridOrder).filter_by(status="open")
+    def get_open_grid_orders(self, product_id: str = None) -> list[Row]:
+        self.fill_writer.flush()
+        with self.session_scope() as session:
+            q = select(GridOrder.__table__).where(GridOrder.status == "open")
             if product_id:
-                q = q.filter_by(product_id=product_id)
-            return q.all()
+                q = q.where(GridOrder.product_id == product_id)
+            return session.execute(q).all()
 
     def get_grid_pnl(self, product_id: str = None) -> float:
-        with self.Session() as session:
-            q = session.query(GridOrder).filter_by(status="filled")
+        self.fill_writer.flush()
+        with self.session_scope() as session:
+            q = select(func.coalesce(func.sum(GridOrder.pnl), 0.0)).where(GridOrder.status == "filled")
             if product_id:
-                q = q.filter_by(product_id=product_id)
-            orders = q.all()
-            return sum(o.pnl or 0 for o in orders)
+                q = q.where(GridOrder.product_id == product_id)
+            return session.execute(q).scalar()
@@ -1,18 +1,22 @@
 """Crypto trading bot — main entry point and loop."""
 
 import os
+import random
+import signal
 import sys
+import threading
 import time
 import traceback
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 
-import schedule
 import yaml
 from dotenv import load_dotenv
 
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from src.api.candle_feed import FEED_GRANULARITY, CandleFeed
+from src.api.ticker_feed import TickerFeed
 from src.api.coinbase_client import CoinbaseClient
 from src.api.market_data import MarketData
 from src.api.order_executor import OrderExecutor
@@ -26,11 +30,33 @@ from src.risk.risk_manager import RiskManager
 from src.risk.stop_loss import StopLossManager
 from src.strategy.grid_strategy import GridStrategy
 from src.strategy.indicators import add_all_indicators
-from src.strategy.signal_generator import SignalGenerator, SignalType
+from src.strategy.signal_generator import Signal, SignalGenerator, SignalType
 from src.utils.logger import setup_logger
 
 log = setup_logger("main")
 
+# Cap, in seconds, on how long a pair whose data fetch keeps failing is skipped
+PAIR_BACKOFF_MAX = 300
+
+
+def _signal_key(df) -> tuple[int, float, float]:
+    """Cache key for a candle frame's signal: the latest candle's timestamp, close and volume.
+
+    Feed frames rewrite the in-progress candle in place, so the timestamp
+    alone would keep the first tick's signal for the whole interval.
+    """
+    last = df.iloc[-1]
+    return int(last["timestamp"]), float(last["close"]), float(last["volume"])
+
+
+def _next_daily_deadline(hour: int) -> float:
+    """Epoch time of the next local hour:00 after now."""
+    now = datetime.now()
+    target = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+    if target <= now:
+        target += timedelta(days=1)
+    return target.timestamp()
+
 
 class TradingBot:
     """Main trading bot orchestrator."""
@@ -44,6 +70,10 @@ class TradingBot:
         mode = os.getenv("BOT_MODE", self.config["bot"]["mode"])
         self.config["bot"]["mode"] = mode
         log.info(f"Bot mode: {mode}")
+        # Settings read every tick, resolved once
+        self.paper_mode = mode == "paper"
+        self.granularity = self.config["strategy"]["candle_granularity"]
+        self.lookback = self.config["strategy"]["lookback_candles"]
 
         # Core components
         self.client = CoinbaseClient()
@@ -80,6 +110,8 @@ class TradingBot:
             log.info(f"Grid trading enabled: ${self.grid_capital:.2f} across {grid_cfg.get('pairs', [])}")
 
         self.trading_pairs = self.config["trading_pairs"]
+        self._signal_cache: dict[str, tuple[tuple, Signal]] = {}  # product_id → (_signal_key, signal)
+        self._pair_backoff: dict[str, tuple[int, float]] = {}  # product_id → (consecutive errors, retry at)
         self.running = True
 
         log.info(f"Strategy mode: {self.strategy_mode}")
@@ -97,114 +129,218 @@ class TradingBot:
         grid_info = ""
         if self.grid_strategy:
             grid_info = f"\nGrid: ${self.grid_capital:.2f} on {len(self.grid_strategy.pairs)} pairs"
-        self.sms.send(
+        self.sms.send_async(
             f"Bot started ({self.config['bot']['mode']} mode, {self.strategy_mode})\n"
             f"Signal capital: ${self.portfolio.capital:.2f}\n"
             f"Pairs: {len(self.trading_pairs)}{grid_info}"
         )
 
-        # Schedule daily summary
+        # Daily summary: one deadline compared each tick
         summary_hour = self.config["bot"].get("daily_summary_hour", 20)
-        schedule.every().day.at(f"{summary_hour:02d}:00").do(self._daily_summary)
+        next_summary_ts = _next_daily_deadline(summary_hour)
 
         interval = self.config["bot"]["loop_interval_seconds"]
         log.info(f"Loop interval: {interval}s")
+        self._start_candle_feed()
+        self._start_ticker_feed()
 
-        while self.running:
-            try:
-                self._tick()
-                schedule.run_pending()
-                time.sleep(interval)
-            except KeyboardInterrupt:
-                log.info("Shutting down (keyboard interrupt)")
-                self.running = False
-            except Exception as e:
-                log.error(f"Tick error: {e}\n{traceback.format_exc()}")
-                self.sms.error(str(e))
-                time.sleep(interval * 2)  # back off on errors
+        # SIGTERM (launchd, kill) and Ctrl-C end the loop after the current
+        # tick, so the finally block below always flushes and stops the feeds
+        stopped = threading.Event()
+
+        def request_stop(signum, frame):
+            log.info(f"Shutting down ({signal.Signals(signum).name})")
+            self.running = False
+            stopped.set()
+
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, request_stop)
+
+        try:
+            while self.running:
+                try:
+                    self._tick()
+                    if time.time() >= next_summary_ts:
+                        # Recomputed rather than += 86400 so DST shifts don't drift it
+                        next_summary_ts = _next_daily_deadline(summary_hour)
+                        self._daily_summary()
+                    stopped.wait(interval)
+                except Exception as e:
+                    log.error(f"Tick error: {e}\n{traceback.format_exc()}")
+                    self.sms.error(str(e))
+                    stopped.wait(interval * 2)  # back off on errors
+        finally:
+            for feed in (self.market_data.candle_feed, self.market_data.ticker_feed):
+                if feed:
+                    feed.stop()
+            self.repo.flush()  # anything queued since the last tick
+            self.sms.flush()
 
         log.info("Bot stopped")
 
-    def _tick(self):
-        """One iteration of the main loop."""
-        # 1. Signal strategy: check exits and entries
-        if self.strategy_mode in ("signal", "both"):
-            self._check_exits()
-            if not self.risk_mgr.is_paused:
-                self._check_entries()
-
-        # 2. Grid strategy: check fills and manage grid
+    def _start_candle_feed(self):
+        """Serve entry-scan candles from the websocket feed when it can.
+
+        The feed only carries five-minute candles; set data.candle_feed to
+        false to always poll REST. If it can't connect, REST is used.
+        """
+        if self.granularity != FEED_GRANULARITY or not self.config["data"].get("candle_feed", True):
+            return
+        feed = CandleFeed(self.trading_pairs, maxlen=self.lookback)
+        try:
+            feed.start()
+        except Exception as e:
+            log.error(f"Candle feed unavailable, polling REST: {e}")
+            return
+        self.market_data.candle_feed = feed
+
+    def _start_ticker_feed(self):
+        """Price exits and grids from the websocket ticker when it can.
+
+        Subscribes every pair the bot may price; set data.ticker_feed to
+        false to always poll REST. If it can't connect, REST is used.
+        """
+        if not self.config["data"].get("ticker_feed", True):
+            return
+        pairs = list(self.trading_pairs)
         if self.grid_strategy:
-            self._grid_tick()
+            pairs += [pid for pid in self.grid_strategy.pairs if pid not in pairs]
+        feed = TickerFeed(pairs)
+        try:
+            feed.start()
+        except Exception as e:
+            log.error(f"Ticker feed unavailable, polling REST: {e}")
+            return
+        self.market_data.ticker_feed = feed
+
+    def _tick(self):
+        """One iteration of the main loop.
+
+        Writes that record exchange orders commit as they happen, so a crash
+        mid-tick never loses the record of an order already sent.
+        """
+        try:
+            # 1. Signal strategy: check exits and entries
+            if self.strategy_mode in ("signal", "both"):
+                self._check_exits()
+                if not self.risk_mgr.is_paused:
+                    self._check_entries()
+
+            # 2. Grid strategy: check fills and manage grid
+            if self.grid_strategy:
+                self._grid_tick()
+        finally:
+            self.repo.flush()  # signals and grid fills logged this tick
 
     def _check_exits(self):
         """Check all open positions for exit conditions."""
-        for product_id in list(self.portfolio.positions.keys()):
-            try:
-                price = self.market_data.get_current_price(product_id)
-                exit_reason = self.stop_loss_mgr.check(product_id, price)
+        if not self.portfolio.positions:
+            return
+        try:
+            prices = self.market_data.get_current_prices(list(self.portfolio.positions))
+        except Exception as e:
+            log.error(f"Exit check price fetch failed: {e}")
+            return
+
+        for product_id in self.portfolio.positions:
+            if product_id not in prices:
+                log.error(f"Exit check error for {product_id}: no price returned")
+        # Every position's exits in one pass over the stop-loss arrays
+        exits = self.stop_loss_mgr.check_all(prices)
 
-                if exit_reason:
-                    self._close_position(product_id, price, exit_reason)
+        for product_id, exit_reason in exits.items():
+            try:
+                self._close_position(product_id, prices[product_id], exit_reason)
             except Exception as e:
                 log.error(f"Exit check error for {product_id}: {e}")
 
     def _check_entries(self):
         """Scan trading pairs for entry signals."""
-        granularity = self.config["strategy"]["candle_granularity"]
-        lookback = self.config["strategy"]["lookback_candles"]
-
-        for product_id in self.trading_pairs:
-            if product_id in self.portfolio.positions:
-                continue
+        now = time.time()
+        candidates = [
+            pid for pid in self.trading_pairs
+            if pid not in self.portfolio.positions
+            and self._pair_backoff.get(pid, (0, 0.0))[1] <= now
+            and self.risk_mgr.can_trade(pid, self.portfolio.open_position_count)[0]
+        ]
+        if not candidates:
+            return
+        # Fetch every candidate's candles concurrently up front
+        candles = self.market_data.get_candles_multi(
+            candidates, granularity=self.granularity, num_candles=self.lookback
+        )
 
+        for product_id in candidates:
             try:
-                # Risk check
+                # Risk check again: entries earlier in this scan count toward the limit
                 allowed, reason = self.risk_mgr.can_trade(
                     product_id, self.portfolio.open_position_count
                 )
                 if not allowed:
                     continue
 
-                # Fetch data and calculate indicators
-                df = self.market_data.get_candles(
-                    product_id, granularity=granularity, num_candles=lookback
-                )
+                # Calculate indicators
+                df = candles.get(product_id)
+                if df is None:
+                    self._backoff_pair(product_id)
+                    continue
+                self._pair_backoff.pop(product_id, None)
                 if len(df) < 30:
                     continue
 
-                df = add_all_indicators(df, self.config)
-                signal = self.signal_gen.generate(df, product_id)
+                # Until the latest candle changes (a new candle, or a feed
+                # update to the in-progress one) its signal is unchanged
+                key = _signal_key(df)
+                cached = self._signal_cache.get(product_id)
+                if cached and cached[0] == key:
+                    signal = cached[1]
+                else:
+                    df = add_all_indicators(df, self.config)
+                    signal = self.signal_gen.generate(df, product_id)
+                    self._signal_cache[product_id] = (key, signal)
 
-                # Log all non-HOLD signals
-                if signal.signal_type != SignalType.HOLD:
-                    self.repo.save_signal(signal)
-                    log.info(
-                        f"Signal: {signal.signal_type.value} {product_id} "
-                        f"@ ${signal.price:.4f} confidence={signal.confidence:.2f} "
-                        f"reasons={signal.reasons}"
-                    )
+                if signal.signal_type == SignalType.HOLD:
+                    continue
+                log.info(
+                    f"Signal: {signal.signal_type.value} {product_id} "
+                    f"@ ${signal.price:.4f} confidence={signal.confidence:.2f} "
+                    f"reasons={signal.reasons}"
+                )
 
-                # Act on BUY signals
-                if signal.signal_type == SignalType.BUY:
-                    self._open_position(product_id, signal)
+                # Act on BUY signals, then log the signal once with the outcome
+                acted_on = False
+                try:
+                    if signal.signal_type == SignalType.BUY:
+                        acted_on = self._open_position(product_id, signal)
+                finally:
+                    self.repo.queue_signal(signal, acted_on=acted_on)
 
             except Exception as e:
                 log.error(f"Entry check error for {product_id}: {e}")
 
-    def _open_position(self, product_id, signal):
-        """Execute a buy order and register position."""
+    def _backoff_pair(self, product_id: str):
+        """Skip a pair whose fetch failed for an exponentially growing, jittered delay.
+
+        Other pairs keep trading on schedule while one is failing.
+        """
+        errors = self._pair_backoff.get(product_id, (0, 0.0))[0] + 1
+        delay = min(PAIR_BACKOFF_MAX, 2 ** errors) * random.uniform(0.5, 1.5)
+        self._pair_backoff[product_id] = (errors, time.time() + delay)
+        log.warning(f"Skipping {product_id} for {delay:.0f}s after {errors} failed fetch(es)")
+
+    def _open_position(self, product_id, signal) -> bool:
+        """Execute a buy order and register position. Returns whether it filled."""
         sizing = self.position_sizer.calculate(self.portfolio.capital, signal.price)
         usd_amount = sizing["usd_amount"]
 
         if usd_amount < 1.0:
             log.warning(f"Position too small for {product_id}: ${usd_amount:.2f}")
-            return
+            return False
 
         result = self.executor.buy(product_id, usd_amount, signal.price)
 
         if result.filled:
-            self.portfolio.open_position(
+            pos = self.portfolio.open_position(
                 product_id=product_id,
                 entry_price=result.price,
                 size=result.size,
@@ -216,7 +352,7 @@ class TradingBot:
             self.stop_loss_mgr.register(
                 product_id, result.price, signal.stop_loss, signal.take_profit
             )
-            self.repo.save_trade_open(
+            pos.trade_id = self.repo.save_trade_open(
                 product_id=product_id,
                 entry_price=result.price,
                 size=result.size,
@@ -226,12 +362,12 @@ class TradingBot:
                 order_id=result.order_id,
                 paper=result.paper,
             )
-            self.repo.save_signal(signal, acted_on=True)
 
             self.sms.trade_opened(
                 product_id, result.price, result.size,
                 usd_amount, signal.stop_loss, signal.take_profit,
             )
+        return result.filled
 
     def _close_position(self, product_id, price, exit_reason):
         """Execute a sell order and record the close."""
@@ -261,25 +397,33 @@ class TradingBot:
 
     def _grid_tick(self):
         """One iteration of the grid strategy loop."""
-        for product_id in self.grid_strategy.pairs:
+        pairs = [pid for pid in self.grid_strategy.pairs if not self.protected.is_protected(pid)]
+        if not pairs:
+            return
+        # Every grid pair's price from one request instead of one per pair
+        try:
+            prices = self.market_data.get_current_prices(pairs)
+        except Exception as e:
+            log.error(f"Grid price fetch failed: {e}")
+            return
+
+        for product_id in pairs:
             try:
-                # Check protected assets
-                if self.protected.is_protected(product_id):
+                price = prices.get(product_id)
+                if price is None:
+                    log.error(f"Grid tick error for {product_id}: no price returned")
                     continue
 
-                price = self.market_data.get_current_price(product_id)
-
                 # Initialize grid if not yet created or needs rebalance
                 if self.grid_strategy.needs_rebalance(product_id, price):
                     self._grid_rebalance(product_id, price)
 
                 # Place any pending orders
                 pending = self.grid_strategy.get_pending_levels(product_id)
-                for level in pending:
-                    self._grid_place_order(product_id, level)
+                self._grid_place_orders(product_id, pending)
 
                 # In paper mode, check for simulated fills using recent candle range
-                if self.config["bot"]["mode"] == "paper":
+                if self.paper_mode:
                     self._grid_check_paper_fills(product_id, price)
 
                 # In live mode, check order status via API
@@ -295,7 +439,7 @@ class TradingBot:
         self.grid_pnl_total += preserved_pnl
 
         # Cancel existing exchange orders for this pair
-        if self.config["bot"]["mode"] != "paper":
+        if not self.paper_mode:
             open_orders = self.repo.get_open_grid_orders(product_id)
             order_ids = [o.order_id for o in open_orders if o.order_id]
             if order_ids:
@@ -309,8 +453,23 @@ class TradingBot:
         self.grid_strategy.initialize_grid(product_id, current_price)
         log.info(f"Grid rebalanced for {product_id} at ${current_price:.4f}")
 
-    def _grid_place_order(self, product_id: str, level):
-        """Place a single grid order."""
+    def _grid_place_orders(self, product_id: str, levels):
+        """Place grid orders and record the placed ones in a single insert."""
+        placed = []
+        try:
+            for level in levels:
+                row = self._grid_place_order(product_id, level)
+                if row:
+                    placed.append(row)
+        finally:
+            self.repo.save_grid_orders_bulk(placed)
+
+    def _grid_place_order(self, product_id: str, level) -> dict | None:
+        """Place a single grid order.
+
+        Returns:
+            The grid_orders row to record, or None if nothing was placed.
+        """
         result = None
         if level.side == "BUY":
             result = self.executor.limit_buy(product_id, level.base_size, level.price)
@@ -319,16 +478,18 @@ class TradingBot:
 
         if result:
             self.grid_strategy.mark_level_open(product_id, level.index, result.order_id)
-            self.repo.save_grid_order(
-                product_id=product_id,
-                side=level.side,
-                level_price=level.price,
-                base_size=level.base_size,
-                order_id=result.order_id,
-                grid_center=self.grid_strategy.grids[product_id].center_price,
-                level_index=level.index,
-                paper=result.paper,
-            )
+            return {
+                "product_id": product_id,
+                "side": level.side,
+                "level_price": level.price,
+                "base_size": level.base_size,
+                "order_id": result.order_id,
+                "grid_center": self.grid_strategy.grids[product_id].center_price,
+                "level_index": level.index,
+                "paper": 1 if result.paper else 0,
+                "status": "open",
+            }
+        return None
 
     def _grid_check_paper_fills(self, product_id: str, current_price: float):
         """Check for paper fills using current price as both high and low approximation."""
@@ -340,18 +501,18 @@ class TradingBot:
         for level in filled:
             pnl = 0.0
             if level.side == "SELL":
-                buy_price = level.price * (1 - self.grid_strategy.spacing_pct)
+                buy_price = level.price * self.grid_strategy.down_mult
                 pnl = level.base_size * (level.price - buy_price)
 
-            self.repo.fill_grid_order(level.order_id, current_price, pnl)
+            self.repo.queue_grid_fill(level.order_id, current_price, pnl)
 
             # Create the opposite order
             new_level = self.grid_strategy.handle_fill(product_id, level)
             if new_level:
-                self._grid_place_order(product_id, new_level)
+                self._grid_place_orders(product_id, [new_level])
 
             # SMS for fills
-            self.sms.send(
+            self.sms.send_async(
                 f"GRID {level.side} FILLED {product_id}\n"
                 f"Price: ${level.price:,.4f}\n"
                 f"Size: {level.base_size:.8f}" +
@@ -364,12 +525,22 @@ class TradingBot:
         if not state:
             return
 
-        for idx, level in list(state.levels.items()):
-            if level.status != "open" or not level.order_id:
+        open_levels = [l for l in state.levels.values() if l.status == "open" and l.order_id]
+        if not open_levels:
+            return
+        # One order listing for the whole grid instead of a request per level
+        try:
+            orders = self.client.get_orders([l.order_id for l in open_levels])
+        except Exception as e:
+            log.error(f"Grid order check failed for {product_id}: {e}")
+            return
+
+        for level in open_levels:
+            order_info = orders.get(level.order_id)
+            if order_info is None:
                 continue
 
             try:
-                order_info = self.client.get_order(level.order_id)
                 status = order_info.get("status", "")
 
                 if status in ("FILLED", "COMPLETED"):
@@ -378,19 +549,19 @@ class TradingBot:
                     pnl = 0.0
 
                     if level.side == "SELL":
-                        buy_price = level.price * (1 - self.grid_strategy.spacing_pct)
+                        buy_price = level.price * self.grid_strategy.down_mult
                         pnl = level.base_size * (fill_price - buy_price)
                         state.total_sells_filled += 1
                     else:
                         state.total_buys_filled += 1
 
-                    self.repo.fill_grid_order(level.order_id, fill_price, pnl)
+                    self.repo.queue_grid_fill(level.order_id, fill_price, pnl)
 
                     new_level = self.grid_strategy.handle_fill(product_id, level)
                     if new_level:
-                        self._grid_place_order(product_id, new_level)
+                        self._grid_place_orders(product_id, [new_level])
 
-                    self.sms.send(
+                    self.sms.send_async(
                         f"GRID {level.side} FILLED {product_id}\n"
                         f"Price: ${fill_price:,.4f}\n"
                         f"Size: {level.base_size:.8f}" +
@@ -404,9 +575,9 @@ class TradingBot:
         """Send daily performance summary."""
         try:
             prices = {}
-            for pid in self.portfolio.positions:
+            if self.portfolio.positions:
                 try:
-                    prices[pid] = self.market_data.get_current_price(pid)
+                    prices = self.market_data.get_current_prices(list(self.portfolio.positions))
                 except Exception:
                     pass
 
@@ -6,6 +6,7 @@ osascript if running interactively.
 """
 
 import os
+import queue
 import subprocess
 import threading
 import time
@@ -21,6 +22,9 @@ MSG_QUEUE = "/Users/claude/projects/investment/crypto-trader/data/sms_queue.txt"
 
 ET = timezone(timedelta(hours=-5))
 
+# The writer thread collects send_async messages for this long before each write
+SMS_BATCH_SECONDS = 0.5
+
 
 def _is_quiet_hours() -> bool:
     """Check if current time is within quiet hours (10 PM - 7 AM ET)."""
@@ -38,31 +42,72 @@ class SMSNotifier:
         os.makedirs(os.path.dirname(MSG_QUEUE), exist_ok=True)
         if not self.phone:
             log.warning("SMS_PHONE_NUMBER not set — notifications disabled")
+        # Lines waiting to be appended to MSG_QUEUE by the writer thread
+        self._outbox: queue.Queue[str] = queue.Queue()
+        self._writer = threading.Thread(target=self._drain_outbox, name="sms-writer", daemon=True)
+        self._writer.start()
 
-    def send(self, message: str):
-        """Queue an SMS for delivery. Non-blocking. Suppressed during quiet hours (10PM-7AM ET)."""
+    def _queue_line(self, message: str) -> str | None:
+        """The queue-file line for message, or None if it shouldn't be sent."""
         if not self.phone:
-            log.debug(f"SMS skipped (no phone): {message[:80]}")
-            return
+            log.debug("SMS skipped (no phone): %.80s", message)
+            return None
 
         if _is_quiet_hours():
             log.info(f"SMS suppressed (quiet hours): {message[:80]}")
-            return
+            return None
+
+        return message.replace("\n", " | ") + "\n"
 
+    @staticmethod
+    def _append(lines: list[str]):
         # Write to queue file for the helper to pick up
-        clean = message.replace("\n", " | ")
         try:
             with open(MSG_QUEUE, "a") as f:
-                f.write(clean + "\n")
-            log.info(f"SMS queued: {message[:80]}...")
+                f.writelines(lines)
+            for line in lines:
+                log.info(f"SMS queued: {line[:80].rstrip()}...")
         except Exception as e:
             log.warning(f"SMS queue failed: {e}")
 
+    def send(self, message: str):
+        """Queue an SMS for delivery, writing the queue file before returning.
+
+        Suppressed during quiet hours (10PM-7AM ET).
+        """
+        line = self._queue_line(message)
+        if line:
+            self._append([line])
+
+    def send_async(self, message: str):
+        """Like send, but the queue-file write happens on the writer thread."""
+        line = self._queue_line(message)
+        if line:
+            self._outbox.put(line)
+
+    def flush(self):
+        """Block until every send_async message has been written."""
+        self._outbox.join()
+
+    def _drain_outbox(self):
+        while True:
+            lines = [self._outbox.get()]
+            # Batch whatever else arrives in the window into the same write
+            deadline = time.monotonic() + SMS_BATCH_SECONDS
+            while (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    lines.append(self._outbox.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._append(lines)
+            for _ in lines:
+                self._outbox.task_done()
+
     # ── Convenience methods ──────────────────────────────────────────
 
     def trade_opened(self, product_id: str, price: float, size: float,
                      usd_amount: float, stop_loss: float, take_profit: float):
-        self.send(
+        self.send_async(
             f"BUY {product_id}\n"
             f"Price: ${price:,.4f}\n"
             f"Size: {size:.8f} (${usd_amount:.2f})\n"
@@ -72,13 +117,13 @@ class SMSNotifier:
     def trade_closed(self, product_id: str, pnl: float, pnl_pct: float,
                      exit_reason: str):
         emoji = "+" if pnl >= 0 else ""
-        self.send(
+        self.send_async(
             f"CLOSED {product_id} ({exit_reason})\n"
             f"P&L: {emoji}${pnl:.2f} ({pnl_pct:+.1%})"
         )
 
     def daily_limit_hit(self, daily_loss: float):
-        self.send(
+        self.send_async(
             f"DAILY LOSS LIMIT HIT\n"
             f"Loss today: ${daily_loss:.2f}\n"
             f"Trading paused until tomorrow"
@@ -95,7 +140,7 @@ class SMSNotifier:
         )
         if "grid_pnl" in summary:
             msg += f"\nGrid P&L: ${summary['grid_pnl']:.4f} ({summary.get('grid_pairs', 0)} pairs)"
-        self.send(msg)
+        self.send_async(msg)
 
     def error(self, message: str):
-        self.send(f"BOT ERROR: {message}")
+        self.send_async(f"BOT ERROR: {message}")
@@ -8,7 +8,7 @@ from src.utils.logger import setup_logger
 log = setup_logger("portfolio")
 
 
-@dataclass
+@dataclass(slots=True)
 class Position:
     product_id: str
     side: str  # "BUY"
@@ -19,9 +19,10 @@ class Position:
     take_profit: float
     entry_time: float = field(default_factory=time.time)
     order_id: str = ""
+    trade_id: int | None = None  # Trade row id, once saved
 
 
-@dataclass
+@dataclass(slots=True)
 class ClosedTrade:
     product_id: str
     entry_price: float
@@ -34,6 +35,7 @@ class ClosedTrade:
     exit_reason: str  # stop_loss, take_profit, trailing_stop, signal
     entry_time: float = 0
     exit_time: float = field(default_factory=time.time)
+    trade_id: int | None = None
 
 
 class PortfolioManager:
@@ -44,6 +46,10 @@ class PortfolioManager:
         self.capital = self.initial_capital
         self.positions: dict[str, Position] = {}  # product_id → Position
         self.closed_trades: list[ClosedTrade] = []
+        # Running totals over closed_trades, updated by close_position
+        self._total_pnl = 0.0
+        self._wins = 0
+        self._losses = 0
 
     def open_position(
         self,
@@ -96,8 +102,14 @@ class PortfolioManager:
             pnl_pct=pnl_pct,
             exit_reason=exit_reason,
             entry_time=pos.entry_time,
+            trade_id=pos.trade_id,
         )
         self.closed_trades.append(trade)
+        self._total_pnl += pnl
+        if pnl > 0:
+            self._wins += 1
+        else:
+            self._losses += 1
         self.capital += usd_return
 
         emoji = "+" if pnl >= 0 else ""
@@ -114,23 +126,23 @@ class PortfolioManager:
 
     @property
     def total_pnl(self) -> float:
-        return sum(t.pnl for t in self.closed_trades)
+        return self._total_pnl
 
     @property
     def win_count(self) -> int:
-        return sum(1 for t in self.closed_trades if t.pnl > 0)
+        return self._wins
 
     @property
     def loss_count(self) -> int:
-        return sum(1 for t in self.closed_trades if t.pnl <= 0)
+        return self._losses
 
     def unrealized_pnl(self, prices: dict[str, float]) -> float:
         """Calculate unrealized P&L across all open positions."""
-        total = 0.0
-        for pid, pos in self.positions.items():
-            price = prices.get(pid, pos.entry_price)
-            total += (price * pos.size) - pos.usd_cost
-        return total
+        # Positions without a price are marked at entry
+        return sum(
+            prices.get(pid, pos.entry_price) * pos.size - pos.usd_cost
+            for pid, pos in self.positions.items()
+        )
 
     def summary(self, prices: dict[str, float] | None = None) -> dict:
         """Return a portfolio summary dict."""
@@ -1,10 +1,18 @@
 """Guard against trading protected assets (SHIB, BTC)."""
 
+from functools import lru_cache
+
 from src.utils.logger import setup_logger
 
 log = setup_logger("protected-assets")
 
 
+@lru_cache(maxsize=256)
+def _base(product_id: str) -> str:
+    """Upper-cased base asset of a product id ("shib-usd" → "SHIB")."""
+    return product_id.partition("-")[0].upper()
+
+
 class ProtectedAssetError(Exception):
     """Raised when an operation would affect a protected asset."""
 
@@ -13,7 +21,7 @@ class ProtectedAssets:
     """Prevents any trading of protected assets."""
 
     def __init__(self, config: dict):
-        self.protected = set(
+        self.protected = frozenset(
             s.upper() for s in config.get("protected_assets", ["SHIB", "BTC"])
         )
         log.info(f"Protected assets: {self.protected}")
@@ -24,12 +32,11 @@ class ProtectedAssets:
         Args:
             product_id: e.g. "ETH-USD", "SHIB-USD", "BTC-USD"
         """
-        base = product_id.split("-")[0].upper()
+        base = _base(product_id)
         if base in self.protected:
             raise ProtectedAssetError(
                 f"BLOCKED: {product_id} involves protected asset {base}"
             )
 
     def is_protected(self, product_id: str) -> bool:
-        base = product_id.split("-")[0].upper()
-        return base in self.protected
+        return _base(product_id) in self.protected
@@ -25,9 +25,10 @@ class PositionSizer:
         usd_amount = round(capital * self.max_position_pct, 2)
         base_size = usd_amount / price if price > 0 else 0
 
+        # %-style args: only formatted if a handler takes the debug record
         log.debug(
-            f"Position size: ${usd_amount:.2f} / ${price:.4f} = {base_size:.8f} "
-            f"({self.max_position_pct:.0%} of ${capital:.2f})"
+            "Position size: $%.2f / $%.4f = %.8f (%.0f%% of $%.2f)",
+            usd_amount, price, base_size, self.max_position_pct * 100, capital,
         )
         return {
             "usd_amount": usd_amount,
@@ -1,6 +1,7 @@
 """Pre-trade safety checks and daily loss limits."""
 
-from datetime import date
+import time
+from datetime import date, datetime, timedelta
 
 from src.portfolio.protected_assets import ProtectedAssets
 from src.utils.logger import setup_logger
@@ -8,6 +9,12 @@ from src.utils.logger import setup_logger
 log = setup_logger("risk-manager")
 
 
+def _next_midnight() -> float:
+    """Epoch time of the next local midnight."""
+    tomorrow = date.today() + timedelta(days=1)
+    return datetime.combine(tomorrow, datetime.min.time()).timestamp()
+
+
 class RiskManager:
     """Enforces all risk rules before any trade is placed."""
 
@@ -21,11 +28,16 @@ class RiskManager:
 
         # Daily tracking
         self._today = date.today()
+        self._next_reset_ts = _next_midnight()
         self._daily_loss = 0.0
         self._trading_paused = False
 
     def _reset_if_new_day(self):
+        # Called on every risk check: only look at the date once the day is over
+        if time.time() < self._next_reset_ts:
+            return
         today = date.today()
+        self._next_reset_ts = _next_midnight()
         if today != self._today:
             log.info(f"New trading day: resetting daily loss (was ${self._daily_loss:.2f})")
             self._today = today
@@ -1,13 +1,23 @@
 """Stop-loss and trailing stop management."""
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 
+import numpy as np
+
+from src.backtesting._njit import njit
 from src.utils.logger import setup_logger
 
 log = setup_logger("stop-loss")
 
+# Per-slot exit codes returned by _check_batch
+EXIT_NONE, EXIT_STOP_LOSS, EXIT_TAKE_PROFIT, EXIT_TRAILING_STOP = range(4)
+EXIT_REASONS = (None, "stop_loss", "take_profit", "trailing_stop")
+
+# Initial slot capacity; the arrays double when full
+INITIAL_SLOTS = 8
+
 
-@dataclass
+@dataclass(slots=True)
 class StopLossState:
     """Tracks stop-loss state for an open position."""
 
@@ -22,11 +32,58 @@ class StopLossState:
     trailing_stop: float = 0.0
 
     def __post_init__(self):
-        self.highest_price = self.entry_price
+        if not self.highest_price:
+            self.highest_price = self.entry_price
+
+
+@njit(cache=True)
+def _check_batch(prices, entry, sl, tp, high, trail, active, ta_pct, td_pct):
+    """Check every slot's exits against its current price.
+
+    Slots whose price is NaN (no quote, or no position) are skipped. Updates
+    high, trail and active in place.
+
+    Returns:
+        int8 exit code per slot (EXIT_NONE when no exit hit).
+    """
+    n = prices.shape[0]
+    codes = np.zeros(n, dtype=np.int8)
+    for k in range(n):
+        price = prices[k]
+        if np.isnan(price):
+            continue
+        if price > high[k]:
+            high[k] = price
+
+        if price >= tp[k]:
+            codes[k] = EXIT_TAKE_PROFIT
+            continue
+
+        # Arm the trailing stop once the gain is big enough
+        if not active[k] and (price - entry[k]) / entry[k] >= ta_pct:
+            active[k] = True
+            trail[k] = price * (1 - td_pct)
+
+        # Ratchet the trailing stop up behind the high
+        if active[k]:
+            new_trail = high[k] * (1 - td_pct)
+            if new_trail > trail[k]:
+                trail[k] = new_trail
+            if price <= trail[k]:
+                codes[k] = EXIT_TRAILING_STOP
+                continue
+
+        if price <= sl[k]:
+            codes[k] = EXIT_STOP_LOSS
+    return codes
 
 
 class StopLossManager:
-    """Manages stop-loss, take-profit, and trailing stops for all positions."""
+    """Manages stop-loss, take-profit, and trailing stops for all positions.
+
+    State is kept as parallel arrays with one slot per tracked position, so
+    all positions are checked in one _check_batch pass.
+    """
 
     def __init__(self, config: dict):
         risk = config.get("risk", {})
@@ -35,19 +92,45 @@ class StopLossManager:
         self.trailing_activate_pct = risk.get("trailing_stop_activate_pct", 0.03)
         self.trailing_distance_pct = risk.get("trailing_stop_distance_pct", 0.015)
 
-        # product_id → StopLossState
-        self._positions: dict[str, StopLossState] = {}
+        # product_id → slot index into the state arrays
+        self._slots: dict[str, int] = {}
+        self._free: list[int] = []
+        self._alloc(INITIAL_SLOTS)
+
+    # ── Slots ────────────────────────────────────────────────────────
+
+    def _alloc(self, n: int):
+        self._entry = np.zeros(n)
+        self._stop_loss = np.zeros(n)
+        self._take_profit = np.zeros(n)
+        self._highest = np.zeros(n)
+        self._trailing_stop = np.zeros(n)
+        self._trailing_active = np.zeros(n, dtype=np.bool_)
+        self._free = list(range(n - 1, -1, -1))
+
+    def _grow(self):
+        old = (self._entry, self._stop_loss, self._take_profit, self._highest,
+               self._trailing_stop, self._trailing_active)
+        n = len(self._entry)
+        self._alloc(2 * n)
+        for new, arr in zip((self._entry, self._stop_loss, self._take_profit, self._highest,
+                             self._trailing_stop, self._trailing_active), old):
+            new[:n] = arr
+        self._free = list(range(2 * n - 1, n - 1, -1))
 
     def register(self, product_id: str, entry_price: float, stop_loss: float, take_profit: float):
         """Register a new position for stop-loss tracking."""
-        self._positions[product_id] = StopLossState(
-            product_id=product_id,
-            entry_price=entry_price,
-            stop_loss=stop_loss,
-            take_profit=take_profit,
-            trailing_activate_pct=self.trailing_activate_pct,
-            trailing_distance_pct=self.trailing_distance_pct,
-        )
+        k = self._slots.get(product_id)
+        if k is None:
+            if not self._free:
+                self._grow()
+            k = self._slots[product_id] = self._free.pop()
+        self._entry[k] = entry_price
+        self._stop_loss[k] = stop_loss
+        self._take_profit[k] = take_profit
+        self._highest[k] = entry_price
+        self._trailing_stop[k] = 0.0
+        self._trailing_active[k] = False
         log.info(
             f"Registered stop-loss for {product_id}: "
             f"entry=${entry_price:.4f} SL=${stop_loss:.4f} TP=${take_profit:.4f}"
@@ -55,7 +138,11 @@ class StopLossManager:
 
     def unregister(self, product_id: str):
         """Remove a position from tracking."""
-        self._positions.pop(product_id, None)
+        k = self._slots.pop(product_id, None)
+        if k is not None:
+            self._free.append(k)
+
+    # ── Exit checks ──────────────────────────────────────────────────
 
     def check(self, product_id: str, current_price: float) -> str | None:
         """Check if any exit condition is met.
@@ -63,52 +150,67 @@ class StopLossManager:
         Returns:
             "stop_loss", "take_profit", "trailing_stop", or None
         """
-        state = self._positions.get(product_id)
-        if state is None:
-            return None
+        return self.check_all({product_id: current_price}).get(product_id)
 
-        # Update highest price
-        if current_price > state.highest_price:
-            state.highest_price = current_price
-
-        # Check take-profit
-        if current_price >= state.take_profit:
-            log.info(f"{product_id} hit take-profit at ${current_price:.4f} (TP=${state.take_profit:.4f})")
-            return "take_profit"
-
-        # Activate trailing stop if gain exceeds threshold
-        gain_pct = (current_price - state.entry_price) / state.entry_price
-        if not state.trailing_active and gain_pct >= state.trailing_activate_pct:
-            state.trailing_active = True
-            state.trailing_stop = current_price * (1 - state.trailing_distance_pct)
-            log.info(
-                f"{product_id} trailing stop activated at ${current_price:.4f} "
-                f"(trail=${state.trailing_stop:.4f})"
-            )
-
-        # Update trailing stop (ratchet up)
-        if state.trailing_active:
-            new_trail = state.highest_price * (1 - state.trailing_distance_pct)
-            if new_trail > state.trailing_stop:
-                state.trailing_stop = new_trail
-
-            if current_price <= state.trailing_stop:
-                log.info(
-                    f"{product_id} hit trailing stop at ${current_price:.4f} "
-                    f"(trail=${state.trailing_stop:.4f})"
-                )
-                return "trailing_stop"
+    def check_all(self, prices: dict[str, float]) -> dict[str, str]:
+        """Check every tracked position that has a price in one pass.
 
-        # Check fixed stop-loss
-        if current_price <= state.stop_loss:
-            log.info(f"{product_id} hit stop-loss at ${current_price:.4f} (SL=${state.stop_loss:.4f})")
-            return "stop_loss"
+        Returns:
+            product_id → exit reason, for the positions that hit an exit
+        """
+        slot_prices = np.full(len(self._entry), np.nan)
+        for product_id, k in self._slots.items():
+            price = prices.get(product_id)
+            if price is not None:
+                slot_prices[k] = price
+        was_active = self._trailing_active.copy()
+
+        codes = _check_batch(
+            slot_prices, self._entry, self._stop_loss, self._take_profit, self._highest,
+            self._trailing_stop, self._trailing_active,
+            self.trailing_activate_pct, self.trailing_distance_pct,
+        )
 
-        return None
+        exits = {}
+        for product_id, k in self._slots.items():
+            price = slot_prices[k]
+            if self._trailing_active[k] and not was_active[k]:
+                log.info(
+                    f"{product_id} trailing stop activated at ${price:.4f} "
+                    f"(trail=${self._trailing_stop[k]:.4f})"
+                )
+            code = codes[k]
+            if code == EXIT_NONE:
+                continue
+            if code == EXIT_TAKE_PROFIT:
+                log.info(f"{product_id} hit take-profit at ${price:.4f} (TP=${self._take_profit[k]:.4f})")
+            elif code == EXIT_TRAILING_STOP:
+                log.info(
+                    f"{product_id} hit trailing stop at ${price:.4f} "
+                    f"(trail=${self._trailing_stop[k]:.4f})"
+                )
+            else:
+                log.info(f"{product_id} hit stop-loss at ${price:.4f} (SL=${self._stop_loss[k]:.4f})")
+            exits[product_id] = EXIT_REASONS[code]
+        return exits
 
     def get_state(self, product_id: str) -> StopLossState | None:
-        return self._positions.get(product_id)
+        """A snapshot of a position's stop-loss state."""
+        k = self._slots.get(product_id)
+        if k is None:
+            return None
+        return StopLossState(
+            product_id=product_id,
+            entry_price=float(self._entry[k]),
+            stop_loss=float(self._stop_loss[k]),
+            take_profit=float(self._take_profit[k]),
+            trailing_activate_pct=self.trailing_activate_pct,
+            trailing_distance_pct=self.trailing_distance_pct,
+            highest_price=float(self._highest[k]),
+            trailing_active=bool(self._trailing_active[k]),
+            trailing_stop=float(self._trailing_stop[k]),
+        )
 
     @property
     def tracked_products(self) -> list[str]:
-        return list(self._positions.keys())
+        return list(self._slots.keys())
@@ -14,7 +14,7 @@ from src.utils.logger import setup_logger
 log = setup_logger("grid-strategy")
 
 
-@dataclass
+@dataclass(slots=True)
 class GridLevel:
     """A single price level in the grid."""
     index: int          # -N to +N (negative = below center, positive = above)
@@ -25,7 +25,7 @@ class GridLevel:
     status: str = "pending"  # pending, open, filled
 
 
-@dataclass
+@dataclass(slots=True)
 class GridState:
     """State of a grid for one trading pair."""
     product_id: str
@@ -44,6 +44,9 @@ class GridStrategy:
         grid_cfg = config.get("grid", {})
         self.num_levels = grid_cfg.get("num_levels", 5)
         self.spacing_pct = grid_cfg.get("grid_spacing_pct", 0.01)
+        # Price multipliers for the replacement order one level up / down
+        self.up_mult = 1 + self.spacing_pct
+        self.down_mult = 1 - self.spacing_pct
         self.order_size_usd = grid_cfg.get("order_size_usd", 10.0)
         self.rebalance_threshold = grid_cfg.get("rebalance_threshold_pct", 0.05)
         self.grid_capital = grid_cfg.get("grid_capital_usd", 150.0)
@@ -59,32 +62,30 @@ class GridStrategy:
             Negative indices = buy levels below center.
             Positive indices = sell levels above center.
         """
-        levels = []
+        return list(self._iter_levels(center_price))
+
+    def _iter_levels(self, center_price: float):
+        """Yield calculate_grid_levels() tuples, in ascending index order."""
+        for i in range(self.num_levels, 0, -1):
+            yield -i, round(center_price * (1 - i * self.spacing_pct), 6), "BUY"
         for i in range(1, self.num_levels + 1):
-            buy_price = center_price * (1 - i * self.spacing_pct)
-            sell_price = center_price * (1 + i * self.spacing_pct)
-            levels.append((-i, round(buy_price, 6), "BUY"))
-            levels.append((i, round(sell_price, 6), "SELL"))
-        return sorted(levels, key=lambda x: x[0])
+            yield i, round(center_price * (1 + i * self.spacing_pct), 6), "SELL"
 
     def initialize_grid(self, product_id: str, current_price: float) -> GridState:
         """Create a new grid centered on the current price."""
         state = GridState(product_id=product_id, center_price=current_price)
-        level_list = self.calculate_grid_levels(current_price)
-
-        for idx, price, side in level_list:
-            base_size = self.order_size_usd / price
+        for idx, price, side in self._iter_levels(current_price):
             state.levels[idx] = GridLevel(
                 index=idx,
                 price=price,
                 side=side,
-                base_size=base_size,
+                base_size=self.order_size_usd / price,
             )
 
         self.grids[product_id] = state
         log.info(
-            f"Grid initialized for {product_id}: center=${current_price:.4f}, "
-            f"{len(state.levels)} levels, spacing={self.spacing_pct:.1%}"
+            "Grid initialized for %s: center=$%.4f, %d levels, spacing=%.1f%%",
+            product_id, current_price, len(state.levels), self.spacing_pct * 100,
         )
         return state
 
@@ -110,7 +111,8 @@ class GridStrategy:
             return []
 
         filled = []
-        for idx, level in list(state.levels.items()):
+        # Only level attributes change here, so the dict needs no snapshot
+        for level in state.levels.values():
             if level.status != "open":
                 continue
 
@@ -141,7 +143,7 @@ class GridStrategy:
 
         if filled_level.side == "BUY":
             # Buy filled → place sell at the next level up
-            sell_price = filled_level.price * (1 + self.spacing_pct)
+            sell_price = filled_level.price * self.up_mult
             pnl = filled_level.base_size * (sell_price - filled_level.price)
             new_level = GridLevel(
                 index=filled_level.index,
@@ -150,15 +152,16 @@ class GridStrategy:
                 base_size=filled_level.base_size,
             )
             state.levels[filled_level.index] = new_level
+            # %-style: the grid backtester calls this per fill, often below INFO
             log.info(
-                f"Grid {product_id}: BUY filled @ ${filled_level.price:.4f} → "
-                f"placing SELL @ ${sell_price:.4f} (potential P&L: ${pnl:.4f})"
+                "Grid %s: BUY filled @ $%.4f → placing SELL @ $%.4f (potential P&L: $%.4f)",
+                product_id, filled_level.price, sell_price, pnl,
             )
             return new_level
 
         elif filled_level.side == "SELL":
             # Sell filled → calculate P&L and place buy back at original level
-            buy_price = filled_level.price * (1 - self.spacing_pct)
+            buy_price = filled_level.price * self.down_mult
             pnl = filled_level.base_size * (filled_level.price - buy_price)
             state.realized_pnl += pnl
             new_level = GridLevel(
@@ -169,8 +172,8 @@ class GridStrategy:
             )
             state.levels[filled_level.index] = new_level
             log.info(
-                f"Grid {product_id}: SELL filled @ ${filled_level.price:.4f} → "
-                f"placing BUY @ ${buy_price:.4f} (P&L: +${pnl:.4f})"
+                "Grid %s: SELL filled @ $%.4f → placing BUY @ $%.4f (P&L: +$%.4f)",
+                product_id, filled_level.price, buy_price, pnl,
             )
             return new_level
 
@@ -196,8 +199,9 @@ class GridStrategy:
         if not state:
             return {}
 
-        open_buys = sum(1 for l in state.levels.values() if l.side == "BUY" and l.status == "open")
-        open_sells = sum(1 for l in state.levels.values() if l.side == "SELL" and l.status == "open")
+        open_sides = [l.side for l in state.levels.values() if l.status == "open"]
+        open_buys = open_sides.count("BUY")
+        open_sells = len(open_sides) - open_buys
 
         return {
             "product_id": product_id,
@@ -214,9 +218,8 @@ class GridStrategy:
         if product_id in self.grids:
             state = self.grids[product_id]
             log.info(
-                f"Clearing grid for {product_id}: "
-                f"P&L=${state.realized_pnl:.4f}, "
-                f"fills={state.total_buys_filled}B/{state.total_sells_filled}S"
+                "Clearing grid for %s: P&L=$%.4f, fills=%dB/%dS",
+                product_id, state.realized_pnl, state.total_buys_filled, state.total_sells_filled,
             )
             # Preserve P&L across rebalances
             return state.realized_pnl
@@ -1,27 +1,78 @@
-"""Technical indicator calculations using pandas + ta-lib."""
+"""Technical indicator calculations with pandas and NumPy.
 
+Each indicator reproduces the ta library's definition. RSI and EMA run on
+plain arrays; with numba installed their smoothing runs as a compiled loop,
+_ewm, otherwise through pandas' own ewm.
+"""
+
+import numpy as np
 import pandas as pd
-import ta
+
+from src.backtesting._njit import HAVE_NUMBA, njit
+
+
+@njit(cache=True)
+def _ewm(values, alpha, min_periods):
+    """values.ewm(alpha=alpha, min_periods=min_periods, adjust=False).mean()."""
+    n = values.shape[0]
+    out = np.empty(n)
+    weighted = np.nan
+    old_wt = 1.0
+    nobs = 0
+    for i in range(n):
+        cur = values[i]
+        is_obs = not np.isnan(cur)
+        nobs += is_obs
+        if not np.isnan(weighted):
+            old_wt *= 1.0 - alpha
+            if is_obs:
+                if weighted != cur:
+                    weighted = (old_wt * weighted + alpha * cur) / (old_wt + alpha)
+                old_wt = 1.0
+        elif is_obs:
+            weighted = cur
+        out[i] = weighted if nobs >= min_periods else np.nan
+    return out
+
+
+def _ewm_mean(values: np.ndarray, alpha: float, min_periods: int) -> np.ndarray:
+    if HAVE_NUMBA:
+        return _ewm(values, alpha, min_periods)
+    # The uncompiled loop is slower than pandas' Cython ewm
+    return pd.Series(values).ewm(alpha=alpha, min_periods=min_periods, adjust=False).mean().to_numpy()
 
 
 def calc_rsi(df: pd.DataFrame, period: int = 14) -> pd.Series:
-    """Relative Strength Index."""
-    return ta.momentum.RSIIndicator(close=df["close"], window=period).rsi()
+    """Relative Strength Index (matches ta.momentum.RSIIndicator)."""
+    close = df["close"].to_numpy(dtype=np.float64)
+    diff = np.empty_like(close)
+    diff[:1] = np.nan
+    np.subtract(close[1:], close[:-1], out=diff[1:])
+    # NaN diffs count as no move, as in ta's where(diff > 0, 0.0)
+    up = np.where(diff > 0, diff, 0.0)
+    down = np.where(diff < 0, -diff, 0.0)
+    ema_up = _ewm_mean(up, 1.0 / period, period)
+    ema_down = _ewm_mean(down, 1.0 / period, period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = np.where(ema_down == 0, 100.0, 100.0 - 100.0 / (1.0 + ema_up / ema_down))
+    return pd.Series(rsi, index=df.index, name="rsi")
 
 
 def calc_ema(df: pd.DataFrame, period: int = 12) -> pd.Series:
-    """Exponential Moving Average."""
-    return ta.trend.EMAIndicator(close=df["close"], window=period).ema_indicator()
+    """Exponential Moving Average (matches ta.trend.EMAIndicator)."""
+    close = df["close"].to_numpy(dtype=np.float64)
+    return pd.Series(_ewm_mean(close, 2.0 / (period + 1), period), index=df.index, name=f"ema_{period}")
 
 
 def calc_bollinger_bands(
     df: pd.DataFrame, period: int = 20, std_dev: float = 2.0
 ) -> tuple[pd.Series, pd.Series, pd.Series]:
     """Bollinger Bands — returns (upper, middle, lower)."""
-    bb = ta.volatility.BollingerBands(
-        close=df["close"], window=period, window_dev=std_dev
-    )
-    return bb.bollinger_hband(), bb.bollinger_mavg(), bb.bollinger_lband()
+    # Same as ta.volatility.BollingerBands: population std over the window
+    rolling = df["close"].rolling(window=period, min_periods=period)
+    middle = rolling.mean()
+    band = std_dev * rolling.std(ddof=0)
+    return (middle + band).rename("hband"), middle.rename("mavg"), (middle - band).rename("lband")
 
 
 def calc_volume_ratio(df: pd.DataFrame, period: int = 20) -> pd.Series:
@@ -30,27 +81,36 @@ def calc_volume_ratio(df: pd.DataFrame, period: int = 20) -> pd.Series:
     return df["volume"] / avg_vol
 
 
+INDICATOR_COLUMNS = ("rsi", "ema_fast", "ema_slow", "bb_upper", "bb_middle", "bb_lower", "volume_ratio")
+
+
 def add_all_indicators(df: pd.DataFrame, config: dict) -> pd.DataFrame:
-    """Add all indicator columns to the DataFrame in-place and return it.
+    """Return df with all indicator columns appended, in INDICATOR_COLUMNS order.
 
-    Added columns:
-        rsi, ema_fast, ema_slow, bb_upper, bb_middle, bb_lower, volume_ratio
+    The columns are joined in one concat rather than inserted one by one
+    (each insert costs ~0.2ms on a pandas 3 frame); df itself is left
+    unchanged, and any indicator columns it already has are replaced.
     """
     ind = config.get("indicators", {})
-
     rsi_cfg = ind.get("rsi", {})
-    df["rsi"] = calc_rsi(df, period=rsi_cfg.get("period", 14))
-
     ema_cfg = ind.get("ema", {})
-    df["ema_fast"] = calc_ema(df, period=ema_cfg.get("fast", 12))
-    df["ema_slow"] = calc_ema(df, period=ema_cfg.get("slow", 26))
-
     bb_cfg = ind.get("bollinger", {})
-    df["bb_upper"], df["bb_middle"], df["bb_lower"] = calc_bollinger_bands(
-        df, period=bb_cfg.get("period", 20), std_dev=bb_cfg.get("std_dev", 2.0)
-    )
-
     vol_cfg = ind.get("volume", {})
-    df["volume_ratio"] = calc_volume_ratio(df, period=vol_cfg.get("period", 20))
 
-    return df
+    bb_upper, bb_middle, bb_lower = calc_bollinger_bands(
+        df, period=bb_cfg.get("period", 20), std_dev=bb_cfg.get("std_dev", 2.0)
+    )
+    columns = {
+        "rsi": calc_rsi(df, period=rsi_cfg.get("period", 14)),
+        "ema_fast": calc_ema(df, period=ema_cfg.get("fast", 12)),
+        "ema_slow": calc_ema(df, period=ema_cfg.get("slow", 26)),
+        "bb_upper": bb_upper,
+        "bb_middle": bb_middle,
+        "bb_lower": bb_lower,
+        "volume_ratio": calc_volume_ratio(df, period=vol_cfg.get("period", 20)),
+    }
+    if not df.columns.isin(INDICATOR_COLUMNS).any():
+        base = df
+    else:
+        base = df.drop(columns=list(INDICATOR_COLUMNS), errors="ignore")
+    return pd.concat([base, pd.DataFrame(columns, index=df.index)], axis=1)
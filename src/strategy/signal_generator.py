@@ -3,12 +3,26 @@
 from dataclasses import dataclass
 from enum import Enum
 
+import numpy as np
 import pandas as pd
 
 from src.utils.logger import setup_logger
 
 log = setup_logger("signal-gen")
 
+# Per-bar codes returned by SignalGenerator.precompute_signals()
+SIGNAL_HOLD, SIGNAL_BUY, SIGNAL_SELL = 0, 1, -1
+
+
+def _present(v) -> bool:
+    """False for a missing (None) or NaN indicator value."""
+    return v is not None and v == v
+
+
+def _reasons(*reasons) -> list[str]:
+    """The reason strings among reasons (unmet conditions are passed as False)."""
+    return [r for r in reasons if r]
+
 
 class SignalType(str, Enum):
     BUY = "BUY"
@@ -16,7 +30,7 @@ class SignalType(str, Enum):
     HOLD = "HOLD"
 
 
-@dataclass
+@dataclass(slots=True)
 class Signal:
     signal_type: SignalType
     product_id: str
@@ -44,74 +58,72 @@ class SignalGenerator:
     def generate(self, df: pd.DataFrame, product_id: str) -> Signal:
         """Evaluate the latest candle and return a signal.
 
-        Expects df to already have indicator columns from add_all_indicators().
+        Expects df to already have indicator columns from add_all_indicators()
+        and only numeric columns (candles plus indicators).
         """
         if len(df) < 2:
             return Signal(SignalType.HOLD, product_id, 0, 0, 0, 0, ["insufficient data"])
 
-        latest = df.iloc[-1]
-        prev = df.iloc[-2]
-        price = latest["close"]
-
-        buy_reasons = []
-        sell_reasons = []
-
-        # 1. RSI
-        rsi = latest.get("rsi")
-        if pd.notna(rsi):
-            if rsi < self.rsi_oversold:
-                buy_reasons.append(f"RSI oversold ({rsi:.1f})")
-            elif rsi > self.rsi_overbought:
-                sell_reasons.append(f"RSI overbought ({rsi:.1f})")
-
-        # 2. EMA crossover
-        ema_fast = latest.get("ema_fast")
-        ema_slow = latest.get("ema_slow")
-        prev_ema_fast = prev.get("ema_fast")
-        prev_ema_slow = prev.get("ema_slow")
-        if all(pd.notna(v) for v in [ema_fast, ema_slow, prev_ema_fast, prev_ema_slow]):
-            if ema_fast > ema_slow and prev_ema_fast <= prev_ema_slow:
-                buy_reasons.append("EMA bullish crossover")
-            elif ema_fast > ema_slow:
-                buy_reasons.append("EMA bullish trend")
-            if ema_fast < ema_slow and prev_ema_fast >= prev_ema_slow:
-                sell_reasons.append("EMA bearish crossover")
-            elif ema_fast < ema_slow:
-                sell_reasons.append("EMA bearish trend")
-
-        # 3. Bollinger Bands
-        bb_lower = latest.get("bb_lower")
-        bb_upper = latest.get("bb_upper")
-        if pd.notna(bb_lower) and pd.notna(bb_upper):
-            bb_range = bb_upper - bb_lower
-            if bb_range > 0:
-                bb_pct = (price - bb_lower) / bb_range
-                if bb_pct < 0.15:
-                    buy_reasons.append(f"Price near lower BB ({bb_pct:.0%})")
-                elif bb_pct > 0.85:
-                    sell_reasons.append(f"Price near upper BB ({bb_pct:.0%})")
-
-        # 4. Volume confirmation
-        volume_ratio = latest.get("volume_ratio")
-        volume_ok = pd.notna(volume_ratio) and volume_ratio >= self.volume_multiplier
-        if volume_ok:
-            buy_reasons.append(f"Volume confirmed ({volume_ratio:.1f}x)")
-            sell_reasons.append(f"Volume confirmed ({volume_ratio:.1f}x)")
-
-        # Decide signal
-        buy_score = len(buy_reasons)
-        sell_score = len(sell_reasons)
+        # One float block for the last two rows instead of a row Series each,
+        # as Python floats (much cheaper to compare than NumPy scalars)
+        tail = df.iloc[-2:].to_numpy(dtype=np.float64).tolist()
+        pos = {col: k for k, col in enumerate(df.columns)}
+
+        def at(col, row=1):
+            k = pos.get(col)
+            return None if k is None else tail[row][k]
+
+        return self._evaluate(
+            product_id, at("close"), at("rsi"),
+            at("ema_fast"), at("ema_slow"), at("ema_fast", 0), at("ema_slow", 0),
+            at("bb_lower"), at("bb_upper"), at("volume_ratio"),
+        )
+
+    def _evaluate(self, product_id, price, rsi, ema_fast, ema_slow, prev_ema_fast,
+                  prev_ema_slow, bb_lower, bb_upper, volume_ratio) -> Signal:
+        """Score the latest candle's indicator values into a signal.
+
+        The scores are counted from the conditions first; reason strings are
+        only built for a BUY or SELL.
+        """
+        rsi_ok = _present(rsi)
+        rsi_buy = rsi_ok and rsi < self.rsi_oversold
+        rsi_sell = rsi_ok and not rsi_buy and rsi > self.rsi_overbought
+
+        ema_ok = (_present(ema_fast) and _present(ema_slow)
+                  and _present(prev_ema_fast) and _present(prev_ema_slow))
+        ema_buy = ema_ok and ema_fast > ema_slow
+        ema_sell = ema_ok and ema_fast < ema_slow
+
+        bb_pct = 0.0
+        bb_ok = _present(bb_lower) and _present(bb_upper) and bb_upper - bb_lower > 0
+        if bb_ok:
+            bb_pct = (price - bb_lower) / (bb_upper - bb_lower)
+        bb_buy = bb_ok and bb_pct < 0.15
+        bb_sell = bb_ok and not bb_buy and bb_pct > 0.85
+
+        volume_ok = _present(volume_ratio) and volume_ratio >= self.volume_multiplier
+
+        buy_score = rsi_buy + ema_buy + bb_buy + volume_ok
+        sell_score = rsi_sell + ema_sell + bb_sell + volume_ok
 
         if buy_score >= self.min_confirmations and buy_score > sell_score:
             confidence = min(buy_score / 4.0, 1.0)
+            stop_loss, take_profit = self.buy_levels(price)
             return Signal(
                 signal_type=SignalType.BUY,
                 product_id=product_id,
                 price=price,
-                stop_loss=round(price * (1 - self.stop_loss_pct), 6),
-                take_profit=round(price * (1 + self.take_profit_pct), 6),
+                stop_loss=stop_loss,
+                take_profit=take_profit,
                 confidence=confidence,
-                reasons=buy_reasons,
+                reasons=_reasons(
+                    rsi_buy and f"RSI oversold ({rsi:.1f})",
+                    ema_buy and ("EMA bullish crossover" if prev_ema_fast <= prev_ema_slow
+                                 else "EMA bullish trend"),
+                    bb_buy and f"Price near lower BB ({bb_pct:.0%})",
+                    volume_ok and f"Volume confirmed ({volume_ratio:.1f}x)",
+                ),
             )
 
         if sell_score >= self.min_confirmations and sell_score > buy_score:
@@ -123,7 +135,13 @@ class SignalGenerator:
                 stop_loss=round(price * (1 + self.stop_loss_pct), 6),
                 take_profit=round(price * (1 - self.take_profit_pct), 6),
                 confidence=confidence,
-                reasons=sell_reasons,
+                reasons=_reasons(
+                    rsi_sell and f"RSI overbought ({rsi:.1f})",
+                    ema_sell and ("EMA bearish crossover" if prev_ema_fast >= prev_ema_slow
+                                  else "EMA bearish trend"),
+                    bb_sell and f"Price near upper BB ({bb_pct:.0%})",
+                    volume_ok and f"Volume confirmed ({volume_ratio:.1f}x)",
+                ),
             )
 
         return Signal(
@@ -135,3 +153,54 @@ class SignalGenerator:
             confidence=0,
             reasons=[f"Buy({buy_score}) Sell({sell_score}) < min({self.min_confirmations})"],
         )
+
+    def buy_levels(self, price: float) -> tuple[float, float]:
+        """(stop_loss, take_profit) for a BUY entered at price."""
+        return round(price * (1 - self.stop_loss_pct), 6), round(price * (1 + self.take_profit_pct), 6)
+
+    def precompute_signals(self, df: pd.DataFrame) -> np.ndarray:
+        """Signal code for every bar of df at once.
+
+        Vectorized form of the generate() rules: codes[i] is SIGNAL_BUY,
+        SIGNAL_SELL or SIGNAL_HOLD matching generate(df.iloc[:i + 1]).
+        Expects indicator columns from add_all_indicators().
+
+        Returns:
+            int8 array with one code per row.
+        """
+        n = len(df)
+        missing = np.full(n, np.nan)
+
+        def col(name):
+            return df[name].to_numpy(dtype=np.float64) if name in df.columns else missing
+
+        price, rsi, vol_ratio = col("close"), col("rsi"), col("volume_ratio")
+        ema_fast, ema_slow = col("ema_fast"), col("ema_slow")
+        bb_lower, bb_upper = col("bb_lower"), col("bb_upper")
+
+        # NaN compares False, so bars with missing indicators add no reasons
+        rsi_buy = rsi < self.rsi_oversold
+        buy = rsi_buy.astype(np.int8)
+        sell = (~rsi_buy & (rsi > self.rsi_overbought)).astype(np.int8)
+
+        ema_ok = ~np.isnan(ema_fast) & ~np.isnan(ema_slow)
+        ema_ok[1:] = ema_ok[1:] & ema_ok[:-1]  # the crossover rule also needs the previous bar
+        buy += ema_ok & (ema_fast > ema_slow)
+        sell += ema_ok & (ema_fast < ema_slow)
+
+        bb_range = bb_upper - bb_lower
+        with np.errstate(divide="ignore", invalid="ignore"):
+            bb_pct = (price - bb_lower) / bb_range
+        bb_ok = bb_range > 0
+        buy += bb_ok & (bb_pct < 0.15)
+        sell += bb_ok & (bb_pct > 0.85)
+
+        volume_ok = vol_ratio >= self.volume_multiplier
+        buy += volume_ok
+        sell += volume_ok
+
+        codes = np.full(n, SIGNAL_HOLD, dtype=np.int8)
+        codes[(buy >= self.min_confirmations) & (buy > sell)] = SIGNAL_BUY
+        codes[(sell >= self.min_confirmations) & (sell > buy)] = SIGNAL_SELL
+        codes[:1] = SIGNAL_HOLD  # generate() needs two rows
+        return codes
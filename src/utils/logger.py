@@ -1,18 +1,36 @@
 """Centralized logging configuration."""
 
+import atexit
 import logging
 import os
+import queue
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 
+_listener: QueueListener | None = None
+_queue: queue.SimpleQueue = queue.SimpleQueue()
 
-def setup_logger(name: str = "crypto-trader", level: str = "INFO") -> logging.Logger:
-    """Create a logger that writes to both console and daily log file."""
-    logger = logging.getLogger(name)
-    if logger.handlers:
-        return logger
 
-    logger.setLevel(getattr(logging, level.upper(), logging.INFO))
+class _QueueHandler(QueueHandler):
+    """Enqueue records with their message merged but otherwise unformatted.
+
+    The stock prepare() renders the traceback into the message, which the
+    listener's formatter would then append a second time.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def _start_listener():
+    """Start the background thread that writes every logger's records.
 
+    Loggers only put records on _queue; the console and daily-file writes
+    happen on the listener thread, off the trading loop.
+    """
+    global _listener
     fmt = logging.Formatter(
         "%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
         datefmt="%Y-%m-%d %H:%M:%S",
@@ -21,7 +39,6 @@ def setup_logger(name: str = "crypto-trader", level: str = "INFO") -> logging.Lo
     # Console handler
     console = logging.StreamHandler()
     console.setFormatter(fmt)
-    logger.addHandler(console)
 
     # File handler — daily rotation by filename
     log_dir = os.path.join(os.path.dirname(__file__), "..", "..", "logs")
@@ -29,6 +46,20 @@ def setup_logger(name: str = "crypto-trader", level: str = "INFO") -> logging.Lo
     log_file = os.path.join(log_dir, f"{datetime.now():%Y-%m-%d}.log")
     file_handler = logging.FileHandler(log_file)
     file_handler.setFormatter(fmt)
-    logger.addHandler(file_handler)
 
+    _listener = QueueListener(_queue, console, file_handler)
+    _listener.start()
+    atexit.register(_listener.stop)  # drains queued records on exit
+
+
+def setup_logger(name: str = "crypto-trader", level: str = "INFO") -> logging.Logger:
+    """Create a logger that writes to both console and daily log file."""
+    logger = logging.getLogger(name)
+    if logger.handlers:
+        return logger
+
+    logger.setLevel(getattr(logging, level.upper(), logging.INFO))
+    if _listener is None:
+        _start_listener()
+    logger.addHandler(_QueueHandler(_queue))
     return logger
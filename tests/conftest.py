@@ -0,0 +1,24 @@
+"""Shared pytest fixtures."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def _make_df(prices, volumes=None) -> pd.DataFrame:
+    """Create a minimal OHLCV DataFrame from close prices (volume defaults to 100)."""
+    p = np.asarray(prices, dtype=np.float64)
+    return pd.DataFrame({
+        "timestamp": np.arange(len(p)),
+        "open": p,
+        "high": p * 1.01,
+        "low": p * 0.99,
+        "close": p,
+        "volume": np.full(len(p), 100.0) if volumes is None else np.asarray(volumes, dtype=np.float64),
+    })
+
+
+@pytest.fixture(scope="session")
+def make_df():
+    """Factory: make_df(prices, volumes=None) -> OHLCV DataFrame."""
+    return _make_df
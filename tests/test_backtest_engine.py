@@ -0,0 +1,155 @@
+"""Tests for the strategy backtest engine."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtesting.backtest_engine import BacktestEngine, BacktestTrade
+from src.strategy.signal_generator import SIGNAL_BUY, SIGNAL_HOLD
+
+pytestmark = pytest.mark.backtest
+
+
+@pytest.fixture
+def config():
+    return {
+        "capital": {"initial_usd": 1000.0},
+        "risk": {
+            "max_position_pct": 0.10,
+            "max_open_positions": 2,
+            "trailing_stop_activate_pct": 0.03,
+            "trailing_stop_distance_pct": 0.015,
+        },
+    }
+
+
+def make_candles(closes: list[float]) -> pd.DataFrame:
+    closes = np.asarray(closes, dtype=float)
+    return pd.DataFrame({
+        "timestamp": 1700000000 + 3600 * np.arange(len(closes)),
+        "open": closes,
+        "high": closes * 1.001,
+        "low": closes * 0.999,
+        "close": closes,
+        "volume": 1000.0,
+    })
+
+
+class BuyAt:
+    """Signal stub: BUY at the given candle indexes, HOLD otherwise."""
+
+    def __init__(self, *idxs: int, stop_pct: float = 0.05, tp_pct: float = 0.05):
+        self.idxs = idxs
+        self.stop_pct = stop_pct
+        self.tp_pct = tp_pct
+
+    def precompute_signals(self, df):
+        codes = np.full(len(df), SIGNAL_HOLD, dtype=np.int8)
+        codes[[i for i in self.idxs if i < len(df)]] = SIGNAL_BUY
+        return codes
+
+    def buy_levels(self, price):
+        return price * (1 - self.stop_pct), price * (1 + self.tp_pct)
+
+
+def run(config, closes, signal, pid="ETH-USD"):
+    engine = BacktestEngine(config)
+    engine.signal_gen = signal
+    return engine.run({pid: make_candles(closes)})
+
+
+class TestBacktestExits:
+    def test_input_frames_not_modified(self, config):
+        df = make_candles([100.0] * 40)
+        engine = BacktestEngine(config)
+        engine.signal_gen = BuyAt(35)
+        engine.run({"ETH-USD": df})
+        assert list(df.columns) == ["timestamp", "open", "high", "low", "close", "volume"]
+
+    def test_insufficient_data(self, config):
+        result = run(config, [100.0] * 20, BuyAt(5))
+        assert result.trades == []
+        assert result.ending_capital == 1000.0
+
+    def test_take_profit(self, config):
+        closes = [100.0] * 40 + [106.0] * 10
+        result = run(config, closes, BuyAt(35))
+        trade, = result.trades
+        assert trade.exit_reason == "take_profit"
+        assert trade.exit_price == pytest.approx(105.0)
+        assert trade.entry_idx == 35 and trade.exit_idx == 40
+
+    def test_stop_loss(self, config):
+        closes = [100.0] * 40 + [90.0] * 10
+        trade, = run(config, closes, BuyAt(35)).trades
+        assert trade.exit_reason == "stop_loss"
+        assert trade.exit_price == pytest.approx(95.0)
+        assert trade.pnl == pytest.approx(-5.0)
+
+    def test_equity_marks_open_position_to_close(self, config):
+        closes = [100.0] * 40 + [97.0] * 3 + [90.0] * 5
+        result = run(config, closes, BuyAt(35))
+        # Held at 97 for three candles (-0.3%), then stopped out at 95 (-0.5%)
+        assert result.max_drawdown_pct == 0.5
+        assert result.ending_capital == 995.0
+
+    def test_trailing_stop(self, config):
+        closes = [100.0] * 40 + [104.0, 104.0, 101.0] + [101.0] * 5
+        trade, = run(config, closes, BuyAt(35, tp_pct=0.10)).trades
+        assert trade.exit_reason == "trailing_stop"
+        assert trade.exit_price == pytest.approx(104.0 * 1.001 * 0.985)
+        assert trade.exit_idx == 42
+
+    def test_open_position_closed_at_end(self, config):
+        closes = [100.0] * 40 + [102.0] * 5
+        result = run(config, closes, BuyAt(35))
+        trade, = result.trades
+        assert trade.exit_reason == "end_of_data"
+        assert trade.exit_idx == 44
+        assert result.ending_capital == pytest.approx(1002.0)
+
+    def test_no_entry_on_last_candle_after_end_of_data(self, config):
+        config["risk"]["max_open_positions"] = 1
+        engine = BacktestEngine(config)
+        engine.signal_gen = BuyAt(35, 44)
+        data = {"ETH-USD": make_candles([100.0] * 45), "SOL-USD": make_candles([50.0] * 45)}
+        result = engine.run(data)
+        assert [t.product_id for t in result.trades] == ["ETH-USD"]
+
+
+class TestRunParallel:
+    def test_matches_isolated_sleeves(self, config):
+        config["strategy"] = {"min_confirmations": 2}
+        rng = np.random.default_rng(3)
+        data = {pid: make_candles(100 * np.exp(np.cumsum(rng.normal(0, 0.02, 300))))
+                for pid in ("ETH-USD", "SOL-USD")}
+        result = BacktestEngine(config).run_parallel(data, max_workers=2)
+
+        sleeve_config = {**config, "capital": {"initial_usd": 500.0}}
+        sleeves = [BacktestEngine(sleeve_config).run({pid: df}) for pid, df in data.items()]
+        assert len(result.trades) == sum(len(r.trades) for r in sleeves) > 0
+        assert result.starting_capital == 1000.0
+        assert result.ending_capital == pytest.approx(sum(r.ending_capital for r in sleeves), abs=0.01)
+        assert [t.exit_idx for t in result.trades] == sorted(t.exit_idx for t in result.trades)
+
+    def test_short_product_keeps_its_capital(self, config):
+        data = {"ETH-USD": make_candles([100.0] * 60), "SOL-USD": make_candles([50.0] * 10)}
+        result = BacktestEngine(config).run_parallel(data, max_workers=1)
+        assert result.ending_capital == 1000.0
+        assert len(result.equity_curve) == 31
+
+
+class TestCalcMetrics:
+    def _trade(self, pnl):
+        return BacktestTrade("ETH-USD", 100.0, 100.0 + pnl, 1.0, 100.0, 100.0 + pnl,
+                             pnl, pnl / 100, "take_profit", 0, 1)
+
+    def test_trade_and_equity_metrics(self, config):
+        trades = [self._trade(p) for p in (6.0, -2.0, 3.0, -1.0)]
+        equity = [1000.0, 1010.0, 0.0, 990.0, 1020.0]
+        result = BacktestEngine(config)._calc_metrics(trades, 1000.0, 1006.0, equity)
+        assert (result.win_count, result.loss_count, result.win_rate) == (2, 2, 0.5)
+        assert (result.avg_win, result.avg_loss) == (4.5, -1.5)
+        assert result.profit_factor == 3.0
+        assert result.total_pnl == 6.0
+        assert result.max_drawdown_pct == 100.0
@@ -0,0 +1,64 @@
+"""Tests for the websocket candle buffer."""
+
+import orjson
+import pandas as pd
+import pytest
+
+from src.api.candle_feed import FEED_CANDLE_SECONDS, CandleFeed
+
+T0 = 1700000100
+
+
+def _rest_frame(n: int, start: int = T0) -> pd.DataFrame:
+    return pd.DataFrame({
+        "timestamp": [start + i * FEED_CANDLE_SECONDS for i in range(n)],
+        "open": [100.0] * n,
+        "high": [101.0] * n,
+        "low": [99.0] * n,
+        "close": [100.5] * n,
+        "volume": [10.0] * n,
+    })
+
+
+def _message(start: int, close: float, product_id: str = "ETH-USD") -> str:
+    candle = {"start": str(start), "open": "100", "high": "102", "low": "99",
+              "close": str(close), "volume": "12.5", "product_id": product_id}
+    return orjson.dumps({"channel": "candles", "events": [{"type": "update", "candles": [candle]}]}).decode()
+
+
+@pytest.fixture
+def feed():
+    feed = CandleFeed(["ETH-USD"], maxlen=5)
+    feed.seed("ETH-USD", _rest_frame(5))
+    return feed
+
+
+class TestCandleFeed:
+    def test_unseeded_product_reads_none(self):
+        feed = CandleFeed(["ETH-USD"], maxlen=5)
+        feed.on_message(_message(T0, 101.0))
+        assert feed.get_candles("ETH-USD", 5) is None
+
+    def test_seed_matches_rest_frame(self, feed):
+        df = feed.get_candles("ETH-USD", 5)
+        pd.testing.assert_frame_equal(df, _rest_frame(5))
+
+    def test_updates_in_progress_candle(self, feed):
+        feed.on_message(_message(T0 + 4 * FEED_CANDLE_SECONDS, 103.0))
+        df = feed.get_candles("ETH-USD", 5)
+        assert len(df) == 5
+        assert df["close"].iloc[-1] == 103.0
+
+    def test_appends_next_candle(self, feed):
+        feed.on_message(_message(T0 + 5 * FEED_CANDLE_SECONDS, 104.0))
+        df = feed.get_candles("ETH-USD", 5)
+        assert df["timestamp"].iloc[0] == T0 + FEED_CANDLE_SECONDS
+        assert df["close"].iloc[-1] == 104.0
+
+    def test_gap_drops_buffer(self, feed):
+        feed.on_message(_message(T0 + 7 * FEED_CANDLE_SECONDS, 104.0))
+        assert feed.get_candles("ETH-USD", 5) is None
+
+    def test_other_channels_ignored(self, feed):
+        feed.on_message(orjson.dumps({"channel": "heartbeats", "events": []}).decode())
+        assert len(feed.get_candles("ETH-USD", 5)) == 5
@@ -0,0 +1,177 @@
+"""Tests for the CoinbaseClient wrapper."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.api import coinbase_client
+from src.api.coinbase_client import CoinbaseClient, _FastJSONResponse, get_client
+from src.api.rate_limiter import RateLimiter
+
+
+@pytest.fixture
+def client():
+    """CoinbaseClient with a mocked REST client (skips credential loading)."""
+    c = CoinbaseClient.__new__(CoinbaseClient)
+    c.client = MagicMock()
+    c.client.get_product.side_effect = lambda product_id: {
+        "ETH-USD": {"price": "2000.00", "base_increment": "0.00000001", "quote_increment": "0.01"},
+        "DOGE-USD": {"price": "0.08", "base_increment": "0.1", "quote_increment": "0.00001"},
+    }[product_id]
+    c._product_cache = {}
+    c._product_fetched_at = {}
+    c._accounts_cache = None
+    c._accounts_cached_at = 0.0
+    c.limiter = RateLimiter(min_interval=0)
+    return c
+
+
+class TestTruncation:
+    def test_base_size_truncates_down(self, client):
+        assert client.truncate_base_size("ETH-USD", 0.0031234567891) == "0.00312345"
+
+    def test_quote_size_truncates_down(self, client):
+        assert client.truncate_quote_size("ETH-USD", 12.349) == "12.34"
+
+    def test_coarse_increment(self, client):
+        assert client.truncate_base_size("DOGE-USD", 123.456) == "123.4"
+        assert client.truncate_quote_size("DOGE-USD", 0.0812349) == "0.08123"
+
+    def test_exact_multiple_unchanged(self, client):
+        assert client.truncate_quote_size("ETH-USD", 10.5) == "10.50"
+
+    def test_no_scientific_notation(self, client):
+        assert client.truncate_base_size("ETH-USD", 5e-9) == "0.00000000"
+
+    def test_float_representation_error(self, client):
+        # 0.29 * 100 == 28.999999999999996 in floating point
+        assert client.truncate_quote_size("ETH-USD", 0.29) == "0.29"
+        assert client.truncate_quote_size("ETH-USD", 1.15) == "1.15"
+
+    def test_matches_decimal_reference(self, client):
+        from decimal import Decimal
+        inc = Decimal("0.00000001")
+        for size in (0.1, 0.3, 1.23456789, 0.0030000001, 123.45678912345, 7e-8):
+            expected = format((Decimal(repr(size)) // inc) * inc, "f")
+            assert client.truncate_base_size("ETH-USD", size) == expected
+
+    def test_huge_value_falls_back_to_decimal(self, client):
+        assert client.truncate_base_size("ETH-USD", 123456789012.123456789) == "123456789012.12346000"
+
+    def test_huge_value_coarse_increment(self, client):
+        client.client.get_product.side_effect = None
+        client.client.get_product.return_value = {"base_increment": "0.05", "quote_increment": "0.01"}
+        assert client.truncate_base_size("XYZ-USD", 5e14 + 0.3125) == "500000000000000.30"
+        assert client.truncate_base_size("XYZ-USD", 1.27) == "1.25"
+
+    def test_product_fetched_once(self, client):
+        client.truncate_base_size("ETH-USD", 1.0)
+        client.truncate_quote_size("ETH-USD", 1.0)
+        assert client.client.get_product.call_count == 1
+
+
+class TestGetProduct:
+    def test_refetches_by_default(self, client):
+        client.get_product("ETH-USD")
+        client.get_product("ETH-USD")
+        assert client.client.get_product.call_count == 2
+
+    def test_reuses_recent_fetch_within_max_age(self, client):
+        client.get_product("ETH-USD", max_age=60)
+        product = client.get_product("ETH-USD", max_age=60)
+        assert product["price"] == "2000.00"
+        assert client.client.get_product.call_count == 1
+
+
+class TestGetProducts:
+    @pytest.fixture(autouse=True)
+    def products(self, client):
+        prices = {"ETH-USD": "2000.00", "SOL-USD": "150.00"}
+        client.client.get_products.side_effect = lambda product_ids: {"products": [
+            {"product_id": pid, "price": prices[pid]} for pid in product_ids if pid in prices
+        ]}
+
+    def test_fetches_all_in_one_request(self, client):
+        products = client.get_products(["ETH-USD", "SOL-USD", "XYZ-USD"])
+        assert {pid: p["price"] for pid, p in products.items()} == {"ETH-USD": "2000.00", "SOL-USD": "150.00"}
+        client.client.get_products.assert_called_once_with(product_ids=["ETH-USD", "SOL-USD", "XYZ-USD"])
+
+    def test_only_stale_products_refetched(self, client):
+        client.get_product("ETH-USD")
+        client.get_products(["ETH-USD", "SOL-USD"], max_age=60)
+        client.client.get_products.assert_called_once_with(product_ids=["SOL-USD"])
+        assert client.get_product("SOL-USD", max_age=60)["price"] == "150.00"
+
+
+class TestGetOrders:
+    def test_follows_pagination(self, client):
+        pages = [
+            {"orders": [{"order_id": "o1", "status": "FILLED"}], "has_next": True, "cursor": "c1"},
+            {"orders": [{"order_id": "o2", "status": "OPEN"}], "has_next": False, "cursor": ""},
+        ]
+        client.client.list_orders.side_effect = pages
+        orders = client.get_orders(["o1", "o2", "o3"])
+        assert {oid: o["status"] for oid, o in orders.items()} == {"o1": "FILLED", "o2": "OPEN"}
+        assert client.client.list_orders.call_args_list[1].kwargs == {"order_ids": ["o1", "o2", "o3"], "cursor": "c1"}
+
+
+class TestGetCandles:
+    def test_parses_dict_response(self, client):
+        client.client.get_candles.return_value = {"candles": [
+            {"start": "1700003600", "low": "99", "high": "102", "open": "100", "close": "101", "volume": "5"},
+            {"start": "1700000000", "low": "98", "high": "101", "open": "99", "close": "100", "volume": "7"},
+        ]}
+        df = client.get_candles("ETH-USD", 1700000000, 1700007200, "ONE_HOUR")
+        assert list(df.columns) == ["timestamp", "open", "high", "low", "close", "volume"]
+        assert df["timestamp"].tolist() == [1700003600, 1700000000]
+        assert df["close"].dtype == "float64"
+
+    def test_empty_response(self, client):
+        client.client.get_candles.return_value = {"candles": []}
+        df = client.get_candles("ETH-USD", 0, 3600, "ONE_HOUR")
+        assert df.empty
+        assert list(df.columns) == ["timestamp", "open", "high", "low", "close", "volume"]
+
+
+class TestAccounts:
+    ACCOUNTS = {"accounts": [
+        {"uuid": "a1", "name": "USD Wallet", "available_balance": {"value": "250.5", "currency": "USD"}},
+        {"uuid": "a2", "name": "ETH Wallet", "available_balance": {"value": "0.1", "currency": "ETH"}},
+        {"uuid": "a3", "name": "SOL Wallet", "available_balance": {"value": "0", "currency": "SOL"}},
+    ]}
+
+    def test_list_accounts_skips_zero_balances(self, client):
+        client.client.get_accounts.return_value = self.ACCOUNTS
+        accounts = client.list_accounts()
+        assert [a["currency"] for a in accounts] == ["USD", "ETH"]
+        assert accounts[0] == {"uuid": "a1", "name": "USD Wallet", "currency": "USD", "balance": 250.5}
+
+    def test_list_accounts_cached(self, client):
+        client.client.get_accounts.return_value = self.ACCOUNTS
+        client.list_accounts()
+        client.list_accounts()
+        assert client.get_usd_balance() == 250.5
+        assert client.client.get_accounts.call_count == 1
+
+    def test_get_balance_without_cache(self, client):
+        client.client.get_accounts.return_value = self.ACCOUNTS
+        assert client.get_balance("ETH") == 0.1
+        assert client.get_balance("DOGE") == 0.0
+
+
+class TestFastJSONResponse:
+    def test_decodes_once(self):
+        response = _FastJSONResponse()
+        response._content = b'{"candles": [{"start": "1700000000", "close": "101.5"}]}'
+        first = response.json()
+        assert first["candles"][0]["close"] == "101.5"
+        assert response.json() is first
+
+
+class TestGetClient:
+    def test_returns_shared_instance(self, monkeypatch):
+        monkeypatch.setattr(coinbase_client, "_SINGLETON", None)
+        monkeypatch.setattr(coinbase_client, "CoinbaseClient", MagicMock(side_effect=object))
+        first = get_client()
+        assert get_client() is first
+        assert coinbase_client.CoinbaseClient.call_count == 1
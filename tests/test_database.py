@@ -1,12 +1,16 @@
 """Tests for database models and repository."""
 
+import json
 import os
 import tempfile
 
 import pytest
 
-from src.database.models import init_db
-from src.database.repository import Repository
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+from src.database.models import GridOrder, SignalLog, init_db
+from src.database.repository import BulkWriter, Repository
 from src.portfolio.portfolio_manager import ClosedTrade
 from src.strategy.signal_generator import Signal, SignalType
 
@@ -20,6 +24,15 @@ def repo():
         yield Repository(Session)
 
 
+def _signal(product_id="SOL-USD"):
+    return Signal(SignalType.BUY, product_id, 100.0, 97.5, 104.0, 0.75, ["RSI oversold"])
+
+
+def _signal_count(repo):
+    with repo.Session() as session:
+        return session.query(SignalLog).count()
+
+
 class TestRepository:
     def test_save_and_get_trade(self, repo):
         trade_id = repo.save_trade_open(
@@ -65,6 +78,29 @@ class TestRepository:
         trades = repo.get_trades()
         assert trades[0].exit_price == 2080.0
         assert trades[0].pnl == 0.24
+        assert trades[0].exit_time >= trades[0].entry_time
+        assert repo.get_open_trades() == []
+
+    def test_save_trade_close_updates_latest_open_only(self, repo):
+        for order_id in ("first", "second"):
+            repo.save_trade_open("ETH-USD", 2000.0, 0.003, 6.0, 1950.0, 2080.0, order_id, True)
+        closed = ClosedTrade("ETH-USD", 2000.0, 2080.0, 0.003, 6.0, 6.24, 0.24, 0.04, "take_profit")
+        repo.save_trade_close("ETH-USD", closed)
+        assert [t.order_id for t in repo.get_open_trades()] == ["first"]
+
+    def test_save_trade_close_by_trade_id(self, repo):
+        ids = [repo.save_trade_open("ETH-USD", 2000.0, 0.003, 6.0, 1950.0, 2080.0, order_id, True)
+               for order_id in ("first", "second")]
+        closed = ClosedTrade("ETH-USD", 2000.0, 2080.0, 0.003, 6.0, 6.24, 0.24, 0.04, "take_profit",
+                             trade_id=ids[0])
+        repo.save_trade_close("ETH-USD", closed)
+        assert [t.order_id for t in repo.get_open_trades()] == ["second"]
+
+    def test_save_grid_order(self, repo):
+        order_id = repo.save_grid_order("ETH-USD", "BUY", 1980.0, 0.005, "g-0", 2000.0, -1, True)
+        order, = repo.get_open_grid_orders("ETH-USD")
+        assert (order.id, order.level_index, order.paper) == (order_id, -1, 1)
+        assert order.created_at is not None
 
     def test_save_signal(self, repo):
         signal = Signal(
@@ -77,6 +113,9 @@ class TestRepository:
             reasons=["RSI oversold", "EMA bullish"],
         )
         repo.save_signal(signal, acted_on=True)
+        with repo.Session() as session:
+            reasons = session.query(SignalLog.reasons).scalar()
+        assert json.loads(reasons) == ["RSI oversold", "EMA bullish"]
 
     def test_daily_performance(self, repo):
         repo.save_daily_performance("2025-01-15", {
@@ -90,3 +129,163 @@ class TestRepository:
         records = repo.get_daily_performance(days=7)
         assert len(records) == 1
         assert records[0].realized_pnl == 2.50
+
+    def test_daily_performance_updates_existing_day(self, repo):
+        repo.save_daily_performance("2025-01-15", {"capital": 302.5, "total_trades": 3, "wins": 2})
+        repo.save_daily_performance("2025-01-15", {"capital": 305.0, "total_trades": 4, "wins": 3})
+        record, = repo.get_daily_performance()
+        assert (record.ending_capital, record.trades_count, record.wins) == (305.0, 4, 3)
+
+
+class TestIndexes:
+    def test_open_trade_lookup_uses_partial_index(self, tmp_path):
+        db_path = str(tmp_path / "trades.db")
+        _, Session = init_db(db_path)
+        closed = {"product_id": "ETH-USD", "side": "BUY", "entry_price": 1.0, "size": 1.0,
+                  "usd_cost": 1.0, "exit_price": 1.1}
+        Repository(Session).save_trades_bulk([closed] * 200 + [{**closed, "exit_price": None}])
+        _, Session = init_db(db_path)  # restart: stats now cover the trades
+        with Session() as session:
+            plan = session.execute(text(
+                "EXPLAIN QUERY PLAN SELECT * FROM trades WHERE product_id = 'ETH-USD' "
+                "AND exit_price IS NULL ORDER BY id DESC LIMIT 1"
+            )).fetchall()
+        assert "ix_trades_open" in plan[0][-1]
+
+    def test_indexes_added_to_existing_db(self, tmp_path):
+        db_path = str(tmp_path / "old.db")
+        engine, _ = init_db(db_path)
+        with engine.begin() as conn:
+            conn.execute(text("DROP INDEX ix_grid_orders_open"))
+        engine, _ = init_db(db_path)
+        with engine.connect() as conn:
+            names = conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'")).scalars().all()
+        assert "ix_grid_orders_open" in names
+
+
+class TestBulkWrites:
+    def test_wal_mode_enabled(self, repo):
+        with repo.Session() as session:
+            assert session.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert session.execute(text("PRAGMA temp_store")).scalar() == 2  # MEMORY
+            assert session.execute(text("PRAGMA cache_size")).scalar() == -65536
+
+    def test_sessions_reuse_pooled_connection(self, repo):
+        with repo.Session() as session:
+            first = session.connection().connection.dbapi_connection
+        with repo.Session() as session:
+            assert session.connection().connection.dbapi_connection is first
+
+    def test_save_trades_bulk(self, repo):
+        rows = [
+            {"product_id": pid, "side": "BUY", "entry_price": 10.0, "size": 1.0,
+             "usd_cost": 10.0, "order_id": f"bt-{i}", "paper": 1}
+            for i, pid in enumerate(["ETH-USD", "SOL-USD", "ADA-USD"])
+        ]
+        assert repo.save_trades_bulk(rows) == 3
+        trades = repo.get_trades()
+        assert [t.product_id for t in trades] == ["ADA-USD", "SOL-USD", "ETH-USD"]
+        assert all(t.entry_time is not None for t in trades)
+        assert len(repo.get_open_trades()) == 3
+
+    def test_save_grid_orders_bulk(self, repo):
+        rows = [
+            {"product_id": "ETH-USD", "side": side, "level_price": price, "base_size": 0.005,
+             "order_id": f"g-{i}", "grid_center": 2000.0, "level_index": i, "paper": 1,
+             "status": "open"}
+            for i, (side, price) in enumerate([("BUY", 1980.0), ("SELL", 2020.0)])
+        ]
+        repo.save_grid_orders_bulk(rows)
+        repo.fill_grid_order("g-1", 2020.0, pnl=0.2)
+        assert [o.order_id for o in repo.get_open_grid_orders("ETH-USD")] == ["g-0"]
+        assert repo.get_grid_pnl() == pytest.approx(0.2)
+        assert repo.get_grid_pnl("SOL-USD") == 0.0
+        repo.cancel_grid_orders("ETH-USD")
+        assert repo.get_open_grid_orders() == []
+
+    def test_queued_signals_written_on_flush(self, repo):
+        repo.queue_signal(_signal())
+        repo.queue_signal(_signal("ETH-USD"), acted_on=True)
+        assert _signal_count(repo) == 0
+        repo.flush()
+        assert _signal_count(repo) == 2
+        repo.flush()  # nothing left to write
+        assert _signal_count(repo) == 2
+
+    def test_queued_grid_fills(self, repo):
+        rows = [
+            {"product_id": "ETH-USD", "side": "SELL", "level_price": 2020.0 + i, "base_size": 0.005,
+             "order_id": f"g-{i}", "status": "open"}
+            for i in range(3)
+        ]
+        repo.save_grid_orders_bulk(rows)
+        repo.queue_grid_fill("g-0", 2020.0, pnl=0.2)
+        repo.queue_grid_fill("g-2", 2022.0, pnl=0.1)
+        assert len(repo.fill_writer) == 2
+        # Reads write pending fills first
+        assert [o.order_id for o in repo.get_open_grid_orders()] == ["g-1"]
+        assert repo.get_grid_pnl() == pytest.approx(0.3)
+
+    def test_cancel_keeps_queued_fills(self, repo):
+        repo.save_grid_orders_bulk([{"product_id": "ETH-USD", "side": "BUY", "level_price": 1980.0,
+                                     "base_size": 0.005, "order_id": "g-0", "status": "open"}])
+        repo.queue_grid_fill("g-0", 1980.0)
+        repo.cancel_grid_orders("ETH-USD")
+        with repo.Session() as session:
+            assert session.query(GridOrder.status).scalar() == "filled"
+
+    def test_writer_flushes_at_max_rows(self, repo):
+        writer = BulkWriter(repo.session_scope, SignalLog, max_rows=2)
+        writer.add(Repository._signal_row(_signal(), False))
+        assert len(writer) == 1
+        writer.add(Repository._signal_row(_signal(), False))
+        assert len(writer) == 0
+        assert _signal_count(repo) == 2
+
+    def test_failed_flush_keeps_rows(self, repo):
+        writer = BulkWriter(repo.session_scope, SignalLog)
+        writer.add(Repository._signal_row(_signal(), False))
+        writer.add({**Repository._signal_row(_signal(), False), "product_id": None})
+        with pytest.raises(IntegrityError):
+            writer.flush()
+        assert len(writer) == 2
+        assert _signal_count(repo) == 0
+        writer._rows[1]["product_id"] = "ETH-USD"
+        assert writer.flush() == 2
+        assert len(writer) == 0
+        assert _signal_count(repo) == 2
+
+
+class TestUnitOfWork:
+    def test_writes_share_one_transaction(self, repo):
+        with repo.unit_of_work():
+            trade_id = repo.save_trade_open("ETH-USD", 2000.0, 0.003, 6.0, 1950.0, 2080.0, "o-1", True)
+            assert trade_id is not None
+            repo.save_signal(_signal())
+            assert len(repo.get_open_trades()) == 1  # visible inside the unit
+            with repo.Session() as other:
+                assert other.query(SignalLog).count() == 0  # not committed yet
+        assert _signal_count(repo) == 1
+        assert [t.id for t in repo.get_open_trades()] == [trade_id]
+
+    def test_commits_when_block_raises(self, repo):
+        with pytest.raises(RuntimeError):
+            with repo.unit_of_work():
+                repo.save_signal(_signal())
+                raise RuntimeError("tick failed")
+        assert _signal_count(repo) == 1
+
+    def test_failed_flush_rolls_back_and_reraises(self, repo):
+        bad = Signal(SignalType.BUY, None, 100.0, 97.5, 104.0, 0.75, [])
+        with pytest.raises(IntegrityError):
+            with repo.unit_of_work():
+                repo.save_signal(_signal())
+                repo.save_signal(bad)
+                repo.get_open_trades()  # autoflush fails, leaving the session unusable
+        assert _signal_count(repo) == 0
+
+    def test_flush_inside_unit(self, repo):
+        with repo.unit_of_work():
+            repo.queue_signal(_signal())
+            repo.flush()
+        assert _signal_count(repo) == 1
@@ -0,0 +1,60 @@
+"""Tests for the historical candle downloader."""
+
+import time
+from unittest.mock import MagicMock
+
+import pandas as pd
+import pytest
+
+from scripts.download_historical import download
+
+HOUR = 3600
+
+
+def _history(n: int) -> pd.DataFrame:
+    """n hourly candles ending at the current hour."""
+    last = int(time.time()) // HOUR * HOUR
+    ts = [last - (n - 1 - i) * HOUR for i in range(n)]
+    return pd.DataFrame({
+        "timestamp": ts,
+        "open": [100.0] * n,
+        "high": [101.0] * n,
+        "low": [99.0] * n,
+        "close": [100.5] * n,
+        "volume": [10.0] * n,
+    })
+
+
+def _client(full: pd.DataFrame) -> MagicMock:
+    client = MagicMock()
+    client.get_candles.side_effect = lambda pid, start, end, granularity: full[
+        (full["timestamp"] >= start) & (full["timestamp"] <= end)
+    ].reset_index(drop=True)
+    return client
+
+
+class TestDownload:
+    def test_resume_replaces_partial_last_candle(self, tmp_path):
+        full = _history(10)
+        saved = full.iloc[:6].copy()
+        saved.loc[5, ["close", "volume"]] = [100.1, 0.5]  # in progress when saved
+        path = tmp_path / "ETH_USD_ONE_HOUR.parquet"
+        saved.to_parquet(path)
+
+        df = download("ETH-USD", _client(full), days=1, path=str(path))
+        pd.testing.assert_frame_equal(df, full, check_dtype=False)
+
+    def test_failed_chunk_raises(self):
+        full = _history(30 * 24)
+        client = _client(full)
+        fetch = client.get_candles.side_effect
+        first = int(full["timestamp"].iloc[0])
+
+        def flaky(pid, start, end, granularity):
+            if start > first:  # every chunk after the first
+                raise ConnectionError("boom")
+            return fetch(pid, start, end, granularity)
+
+        client.get_candles.side_effect = flaky
+        with pytest.raises(RuntimeError, match="chunks failed"):
+            download("ETH-USD", client, days=30)
@@ -1,11 +1,15 @@
 """Tests for grid backtest engine."""
 
+import dataclasses
+
 import pytest
 import pandas as pd
 import numpy as np
 
 from src.backtesting.grid_backtest import GridBacktestEngine
 
+pytestmark = pytest.mark.backtest
+
 
 @pytest.fixture
 def config():
@@ -24,37 +28,32 @@ def config():
 
 def make_candles(prices: list[float]) -> pd.DataFrame:
     """Create a simple OHLCV DataFrame from a list of close prices."""
-    rows = []
-    for i, p in enumerate(prices):
-        rows.append({
-            "timestamp": 1700000000 + i * 3600,
-            "open": p,
-            "high": p * 1.005,
-            "low": p * 0.995,
-            "close": p,
-            "volume": 1000.0,
-        })
-    return pd.DataFrame(rows)
+    p = np.asarray(prices, dtype=np.float64)
+    return pd.DataFrame({
+        "timestamp": 1700000000 + np.arange(len(p)) * 3600,
+        "open": p,
+        "high": p * 1.005,
+        "low": p * 0.995,
+        "close": p,
+        "volume": 1000.0,
+    })
 
 
 def make_oscillating_candles(center: float, amplitude_pct: float, periods: int) -> pd.DataFrame:
     """Create candles that oscillate around a center price."""
-    rows = []
-    for i in range(periods):
-        # Oscillate using sine wave
-        offset = np.sin(i * 2 * np.pi / 10) * center * amplitude_pct
-        close = center + offset
-        high = close + abs(offset) * 0.2
-        low = close - abs(offset) * 0.2
-        rows.append({
-            "timestamp": 1700000000 + i * 3600,
-            "open": close,
-            "high": max(high, close),
-            "low": min(low, close),
-            "close": close,
-            "volume": 1000.0,
-        })
-    return pd.DataFrame(rows)
+    i = np.arange(periods)
+    # Oscillate using sine wave
+    offset = np.sin(i * 2 * np.pi / 10) * center * amplitude_pct
+    close = center + offset
+    spread = np.abs(offset) * 0.2
+    return pd.DataFrame({
+        "timestamp": 1700000000 + i * 3600,
+        "open": close,
+        "high": np.maximum(close + spread, close),
+        "low": np.minimum(close - spread, close),
+        "close": close,
+        "volume": 1000.0,
+    })
 
 
 class TestGridBacktestBasic:
@@ -67,7 +66,7 @@ class TestGridBacktestBasic:
     def test_flat_market_no_fills(self, config):
         """In a perfectly flat market, grid levels shouldn't fill."""
         # All candles at exactly 1000 — high/low within 0.5% won't hit 2% grid levels
-        data = {"ETH-USD": make_candles([1000.0] * 50)}
+        data = {"ETH-USD": make_candles(np.full(50, 1000.0))}
         engine = GridBacktestEngine(config)
         result = engine.run(data)
         # With 0.5% natural range vs 2% grid spacing, no fills expected
@@ -85,11 +84,8 @@ class TestGridBacktestBasic:
         data = {"ETH-USD": make_oscillating_candles(1000.0, 0.03, 100)}
         engine = GridBacktestEngine(config)
         result = engine.run(data)
-        assert hasattr(result, "total_pnl")
-        assert hasattr(result, "total_buys")
-        assert hasattr(result, "total_sells")
-        assert hasattr(result, "grid_capital")
-        assert hasattr(result, "return_pct")
+        names = {f.name for f in dataclasses.fields(result)}
+        assert {"total_pnl", "total_buys", "total_sells", "grid_capital", "return_pct"} <= names
         assert result.grid_capital == 100.0
 
 
@@ -113,3 +109,15 @@ class TestGridBacktestPnL:
         result = engine.run(data)
         assert result.total_buys >= 0
         assert isinstance(result.return_pct, float)
+
+
+class TestGridBacktestEvents:
+    def test_quiet_candles_skipped_without_missing_events(self, config):
+        """Fills and rebalances after long quiet stretches land on the right candles."""
+        prices = [1000.0] * 150 + [979.0] + [1000.0] * 150 + [1120.0] * 5
+        data = {"ETH-USD": make_candles(prices)}
+        result = GridBacktestEngine(config).run(data)
+        buy, = [t for t in result.trades if t.side == "BUY"]
+        assert buy.candle_idx == 150
+        assert buy.price == pytest.approx(980.0)
+        assert result.num_rebalances == 2
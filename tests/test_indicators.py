@@ -3,7 +3,9 @@
 import numpy as np
 import pandas as pd
 import pytest
+import ta
 
+from src.strategy import indicators
 from src.strategy.indicators import (
     add_all_indicators,
     calc_bollinger_bands,
@@ -13,40 +15,36 @@ from src.strategy.indicators import (
 )
 
 
-def _make_df(prices: list[float], volumes: list[float] | None = None) -> pd.DataFrame:
-    """Create a minimal OHLCV DataFrame from close prices."""
-    n = len(prices)
-    return pd.DataFrame({
-        "timestamp": range(n),
-        "open": prices,
-        "high": [p * 1.01 for p in prices],
-        "low": [p * 0.99 for p in prices],
-        "close": prices,
-        "volume": volumes if volumes else [100.0] * n,
-    })
+def _close_df(prices) -> pd.DataFrame:
+    """Close-only frame, for the indicators that read nothing else."""
+    return pd.DataFrame({"close": np.asarray(prices, dtype=np.float64)})
+
+
+@pytest.fixture(scope="module")
+def random_walk_df(make_df):
+    """100-bar random walk around 100; shared, so tests must not modify it."""
+    rng = np.random.default_rng(42)
+    return make_df(np.cumsum(rng.standard_normal(100)) + 100)
 
 
 class TestRSI:
-    def test_rsi_range(self):
+    def test_rsi_range(self, random_walk_df):
         """RSI should be between 0 and 100."""
-        np.random.seed(42)
-        prices = list(np.cumsum(np.random.randn(100)) + 100)
-        df = _make_df(prices)
-        rsi = calc_rsi(df, period=14)
+        rsi = calc_rsi(random_walk_df, period=14)
         valid = rsi.dropna()
-        assert all(0 <= v <= 100 for v in valid)
+        assert valid.between(0, 100).all()
 
     def test_rsi_overbought_on_rally(self):
         """Sustained price increase should push RSI above 70."""
         prices = [100 + i * 2 for i in range(50)]
-        df = _make_df(prices)
+        df = _close_df(prices)
         rsi = calc_rsi(df, period=14)
         assert rsi.iloc[-1] > 70
 
     def test_rsi_oversold_on_decline(self):
         """Sustained price decline should push RSI below 30."""
         prices = [200 - i * 2 for i in range(50)]
-        df = _make_df(prices)
+        df = _close_df(prices)
         rsi = calc_rsi(df, period=14)
         assert rsi.iloc[-1] < 30
 
@@ -55,17 +53,17 @@ class TestEMA:
     def test_ema_follows_trend(self):
         """EMA should trend with price."""
         prices = [100 + i for i in range(50)]
-        df = _make_df(prices)
+        df = _close_df(prices)
         ema = calc_ema(df, period=12)
         valid = ema.dropna()
         # EMA should be increasing
         diffs = valid.diff().dropna()
-        assert all(d > 0 for d in diffs)
+        assert (diffs.to_numpy() > 0).all()
 
     def test_fast_ema_responds_faster(self):
         """Fast EMA should be closer to recent price than slow EMA."""
         prices = [100] * 30 + [100 + i * 3 for i in range(20)]
-        df = _make_df(prices)
+        df = _close_df(prices)
         fast = calc_ema(df, period=12)
         slow = calc_ema(df, period=26)
         # At end of uptrend, fast EMA should be above slow
@@ -75,53 +73,77 @@ class TestEMA:
 class TestBollingerBands:
     def test_bands_contain_price(self):
         """Most prices should be within Bollinger Bands."""
-        np.random.seed(42)
-        prices = list(np.cumsum(np.random.randn(100) * 0.5) + 100)
-        df = _make_df(prices)
+        rng = np.random.default_rng(42)
+        prices = np.cumsum(rng.standard_normal(100) * 0.5) + 100
+        df = _close_df(prices)
         upper, middle, lower = calc_bollinger_bands(df, period=20, std_dev=2.0)
         close = df["close"]
         # Check last 50 candles (after warmup)
-        within = sum(
-            1 for i in range(50, 100)
-            if pd.notna(lower.iloc[i]) and lower.iloc[i] <= close.iloc[i] <= upper.iloc[i]
-        )
+        within = ((lower.iloc[50:] <= close.iloc[50:]) & (close.iloc[50:] <= upper.iloc[50:])).sum()
         assert within >= 40  # at least 80% within bands
 
     def test_upper_above_lower(self):
         """Upper band should always be above lower band."""
         prices = [100 + i * 0.1 for i in range(50)]
-        df = _make_df(prices)
+        df = _close_df(prices)
         upper, _, lower = calc_bollinger_bands(df, period=20)
-        for i in range(20, 50):
-            if pd.notna(upper.iloc[i]):
-                assert upper.iloc[i] > lower.iloc[i]
+        mask = upper.notna()
+        assert (upper[mask] > lower[mask]).all()
 
 
 class TestVolumeRatio:
-    def test_normal_volume_near_one(self):
+    def test_normal_volume_near_one(self, make_df):
         """Constant volume should give ratio ~1.0."""
-        prices = [100] * 50
-        volumes = [1000] * 50
-        df = _make_df(prices, volumes)
+        prices = np.full(50, 100.0)
+        volumes = np.full(50, 1000.0)
+        df = make_df(prices, volumes)
         ratio = calc_volume_ratio(df, period=20)
         valid = ratio.dropna()
-        assert all(abs(v - 1.0) < 0.01 for v in valid)
+        np.testing.assert_allclose(valid.to_numpy(), 1.0, rtol=0, atol=0.01)
 
-    def test_spike_detected(self):
+    def test_spike_detected(self, make_df):
         """Volume spike should produce ratio > 1.5."""
-        prices = [100] * 50
-        volumes = [1000] * 49 + [3000]  # 3x spike
-        df = _make_df(prices, volumes)
+        prices = np.full(50, 100.0)
+        volumes = np.full(50, 1000.0)
+        volumes[-1] = 3000.0  # 3x spike
+        df = make_df(prices, volumes)
         ratio = calc_volume_ratio(df, period=20)
         assert ratio.iloc[-1] > 1.5
 
 
+class TestMatchesTa:
+    """calc_rsi / calc_ema agree with ta on both the compiled-loop and pandas paths."""
+
+    @pytest.fixture(params=[True, False], ids=["loop", "pandas"])
+    def loop_path(self, request, monkeypatch):
+        monkeypatch.setattr(indicators, "HAVE_NUMBA", request.param)
+
+    @pytest.fixture
+    def df(self):
+        rng = np.random.default_rng(7)
+        prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 300)))
+        prices[[50, 51, 200]] = np.nan  # gaps, as pandas ewm handles them
+        return _close_df(prices)
+
+    def test_rsi(self, loop_path, df):
+        expected = ta.momentum.RSIIndicator(close=df["close"], window=14).rsi()
+        np.testing.assert_allclose(calc_rsi(df, period=14), expected, rtol=0, atol=1e-9)
+
+    @pytest.mark.parametrize("period", [12, 26])
+    def test_ema(self, loop_path, df, period):
+        expected = ta.trend.EMAIndicator(close=df["close"], window=period).ema_indicator()
+        np.testing.assert_allclose(calc_ema(df, period=period), expected, rtol=0, atol=1e-9)
+
+    def test_short_frame_all_nan(self, loop_path):
+        df = _close_df([100.0, 101.0, 102.0])
+        assert calc_rsi(df, period=14).isna().all()
+        assert calc_ema(df, period=12).isna().all()
+
+
+@pytest.mark.indicators
 class TestAddAllIndicators:
-    def test_all_columns_present(self):
+    def test_all_columns_present(self, random_walk_df):
         """add_all_indicators should add all expected columns."""
-        np.random.seed(42)
-        prices = list(np.cumsum(np.random.randn(100)) + 100)
-        df = _make_df(prices)
         config = {
             "indicators": {
                 "rsi": {"period": 14},
@@ -130,6 +152,14 @@ class TestAddAllIndicators:
                 "volume": {"period": 20},
             }
         }
-        result = add_all_indicators(df, config)
+        result = add_all_indicators(random_walk_df, config)
         expected = {"rsi", "ema_fast", "ema_slow", "bb_upper", "bb_middle", "bb_lower", "volume_ratio"}
         assert expected.issubset(set(result.columns))
+
+    def test_input_unchanged_and_rerun_replaces_columns(self, random_walk_df):
+        df = random_walk_df
+        once = add_all_indicators(df, {})
+        assert list(df.columns) == ["timestamp", "open", "high", "low", "close", "volume"]
+        twice = add_all_indicators(once, {})
+        assert list(twice.columns) == list(once.columns)
+        pd.testing.assert_frame_equal(twice, once)
@@ -6,38 +6,28 @@ from unittest.mock import MagicMock
 from src.api.order_executor import OrderExecutor, OrderSide
 
 
-@pytest.fixture
+@pytest.fixture(scope="class")
 def paper_executor():
+    # Paper orders only bump the executor's id counter, so one per class is enough
     mock_client = MagicMock()
     return OrderExecutor(mock_client, mode="paper")
 
 
 class TestPaperLimitOrders:
-    def test_limit_buy_creates_unfilled_order(self, paper_executor):
-        result = paper_executor.limit_buy("ETH-USD", 0.005, 2000.0)
-        assert result.side == OrderSide.BUY
-        assert result.price == 2000.0
-        assert result.size == 0.005
-        assert result.filled is False
-        assert result.paper is True
-
-    def test_limit_sell_creates_unfilled_order(self, paper_executor):
-        result = paper_executor.limit_sell("ETH-USD", 0.005, 2100.0)
-        assert result.side == OrderSide.SELL
-        assert result.price == 2100.0
+    @pytest.mark.parametrize("method, price, side, quote", [
+        ("limit_buy", 2000.0, OrderSide.BUY, 10.0),
+        ("limit_sell", 2100.0, OrderSide.SELL, 10.5),
+    ])
+    def test_limit_order_creates_unfilled_order(self, paper_executor, method, price, side, quote):
+        result = getattr(paper_executor, method)("ETH-USD", 0.005, price)
+        assert result.side == side
+        assert result.price == price
         assert result.size == 0.005
         assert result.filled is False
         assert result.paper is True
+        assert result.quote_spent == pytest.approx(quote)
 
     def test_limit_order_has_unique_ids(self, paper_executor):
         r1 = paper_executor.limit_buy("ETH-USD", 0.005, 2000.0)
         r2 = paper_executor.limit_buy("ETH-USD", 0.005, 1990.0)
         assert r1.order_id != r2.order_id
-
-    def test_limit_buy_quote_calculation(self, paper_executor):
-        result = paper_executor.limit_buy("ETH-USD", 0.005, 2000.0)
-        assert result.quote_spent == pytest.approx(10.0)
-
-    def test_limit_sell_quote_calculation(self, paper_executor):
-        result = paper_executor.limit_sell("ETH-USD", 0.005, 2100.0)
-        assert result.quote_spent == pytest.approx(10.5)
@@ -0,0 +1,117 @@
+"""Tests for the bot loop."""
+
+import os
+import signal
+from unittest.mock import MagicMock
+
+import pandas as pd
+import pytest
+
+from src.api.candle_feed import FEED_CANDLE_SECONDS, CandleFeed
+from src.main import TradingBot
+from src.portfolio.portfolio_manager import PortfolioManager
+from src.portfolio.protected_assets import ProtectedAssets
+from src.risk.risk_manager import RiskManager
+from src.strategy.signal_generator import SignalGenerator
+
+T0 = 1700000100
+N = 40
+
+CONFIG = {
+    "risk": {"max_open_positions": 3, "daily_loss_limit_pct": 0.05, "daily_loss_limit_usd": 15.0},
+    "capital": {"initial_usd": 300.0},
+    "protected_assets": [],
+}
+
+
+def _rest_frame(n: int) -> pd.DataFrame:
+    return pd.DataFrame({
+        "timestamp": [T0 + i * FEED_CANDLE_SECONDS for i in range(n)],
+        "open": [100.0] * n,
+        "high": [101.0] * n,
+        "low": [99.0] * n,
+        "close": [100.5] * n,
+        "volume": [10.0] * n,
+    })
+
+
+@pytest.fixture
+def feed():
+    feed = CandleFeed(["ETH-USD"], maxlen=N)
+    feed.seed("ETH-USD", _rest_frame(N))
+    return feed
+
+
+@pytest.fixture
+def bot(feed):
+    # Only the pieces _check_entries touches; no client, database or SMS
+    bot = TradingBot.__new__(TradingBot)
+    bot.config = CONFIG
+    bot.trading_pairs = ["ETH-USD"]
+    bot.granularity = "FIVE_MINUTE"
+    bot.lookback = N
+    bot.portfolio = PortfolioManager(CONFIG)
+    bot.risk_mgr = RiskManager(CONFIG, ProtectedAssets(CONFIG))
+    bot.market_data = MagicMock()
+    bot.market_data.get_candles_multi.side_effect = lambda pids, **kw: {
+        pid: feed.get_candles(pid, N) for pid in pids
+    }
+    gen = SignalGenerator(CONFIG)
+    bot.signal_gen = MagicMock(wraps=gen)
+    bot.repo = MagicMock()
+    bot._signal_cache = {}
+    bot._pair_backoff = {}
+    return bot
+
+
+class TestSignalCache:
+    def test_unchanged_frame_reuses_signal(self, bot):
+        bot._check_entries()
+        bot._check_entries()
+        assert bot.signal_gen.generate.call_count == 1
+
+    def test_in_progress_candle_update_recomputes_signal(self, bot, feed):
+        bot._check_entries()
+        feed._apply({
+            "product_id": "ETH-USD", "start": str(T0 + (N - 1) * FEED_CANDLE_SECONDS),
+            "open": "100", "high": "103", "low": "99", "close": "102.5", "volume": "55",
+        })
+        bot._check_entries()
+        assert bot.signal_gen.generate.call_count == 2
+        df = bot.signal_gen.generate.call_args[0][0]
+        assert df["close"].iloc[-1] == 102.5
+        assert df["volume"].iloc[-1] == 55.0
+
+
+@pytest.fixture
+def restore_signal_handlers():
+    saved = {signum: signal.getsignal(signum) for signum in (signal.SIGTERM, signal.SIGINT)}
+    yield
+    for signum, handler in saved.items():
+        signal.signal(signum, handler)
+
+
+class TestShutdown:
+    @pytest.mark.parametrize("signum", [signal.SIGTERM, signal.SIGINT])
+    def test_signal_stops_loop_and_flushes(self, restore_signal_handlers, signum):
+        bot = TradingBot.__new__(TradingBot)
+        bot.config = {"bot": {"mode": "paper", "loop_interval_seconds": 3600}}
+        bot.portfolio = PortfolioManager(CONFIG)
+        bot.grid_strategy = None
+        bot.strategy_mode = "signal"
+        bot.trading_pairs = ["ETH-USD"]
+        bot.running = True
+        bot.sms = MagicMock()
+        bot.repo = MagicMock()
+        bot.market_data = MagicMock()
+        bot._start_candle_feed = bot._start_ticker_feed = lambda: None
+        bot._tick = MagicMock(side_effect=lambda: os.kill(os.getpid(), signum))
+
+        bot.run()  # returns without waiting out the hour-long interval
+
+        assert bot.running is False
+        bot._tick.assert_called_once()
+        bot.repo.flush.assert_called()
+        bot.sms.flush.assert_called_once()
+        bot.market_data.candle_feed.stop.assert_called_once()
+        bot.market_data.ticker_feed.stop.assert_called_once()
@@ -0,0 +1,157 @@
+"""Tests for MarketData candle fetching and caching."""
+
+import time
+from unittest.mock import MagicMock
+
+import orjson
+import pandas as pd
+import pytest
+
+from src.api.candle_feed import CandleFeed
+from src.api.market_data import MarketData, dedupe_candles
+from src.api.ticker_feed import TickerFeed
+
+
+def _candles(n: int, start: int = 1700000000, step: int = 3600) -> pd.DataFrame:
+    ts = [start + i * step for i in range(n)]
+    return pd.DataFrame({
+        "timestamp": ts,
+        "open": [100.0] * n,
+        "high": [101.0] * n,
+        "low": [99.0] * n,
+        "close": [100.5] * n,
+        "volume": [10.0] * n,
+    })
+
+
+@pytest.fixture
+def market_data(tmp_path):
+    client = MagicMock()
+    client.get_candles.return_value = _candles(50)
+    return MarketData(client, {"data": {"cache_dir": str(tmp_path)}})
+
+
+class TestGetCandles:
+    def test_returns_sorted_ohlcv(self, market_data):
+        market_data.client.get_candles.return_value = _candles(50).iloc[::-1]
+        df = market_data.get_candles("ETH-USD", num_candles=50)
+        assert list(df.columns) == ["timestamp", "open", "high", "low", "close", "volume"]
+        assert df["timestamp"].is_monotonic_increasing
+
+    def test_repeat_call_hits_memory_cache(self, market_data):
+        market_data.get_candles("ETH-USD", num_candles=50)
+        market_data.get_candles("ETH-USD", num_candles=50)
+        # Closed candles fetched once; only the in-progress candle each call
+        assert market_data.client.get_candles.call_count == 3
+
+    def test_in_progress_candle_refetched_each_call(self, market_data):
+        bucket = int(time.time()) // 3600 * 3600
+        closes = iter([100.7, 101.3])
+
+        def get_candles(pid, start, end, gran):
+            if start >= bucket:  # the in-progress candle
+                partial = _candles(1, start=bucket)
+                partial["close"] = next(closes)
+                return partial
+            return _candles(50, start=bucket - 50 * 3600)
+
+        market_data.client.get_candles.side_effect = get_candles
+        first = market_data.get_candles("ETH-USD", num_candles=50)
+        again = market_data.get_candles("ETH-USD", num_candles=50)
+        assert len(first) == 51 and first["timestamp"].iloc[-1] == bucket
+        assert first["close"].iloc[-1] == 100.7
+        assert again["close"].iloc[-1] == 101.3
+        # The disk cache holds closed candles only
+        cached = market_data._load_cache(
+            market_data._cache_key("ETH-USD", "ONE_HOUR", bucket - 50 * 3600, bucket)
+        )
+        assert cached["timestamp"].max() < bucket
+
+    def test_cached_frame_not_mutated_by_caller(self, market_data):
+        df = market_data.get_candles("ETH-USD", num_candles=50)
+        df["rsi"] = 50.0
+        again = market_data.get_candles("ETH-USD", num_candles=50)
+        assert "rsi" not in again.columns
+
+    def test_cached_values_not_mutated_by_caller(self, market_data):
+        df = market_data.get_candles("ETH-USD", num_candles=50)
+        df.loc[0, "close"] = 0.0
+        again = market_data.get_candles("ETH-USD", num_candles=50)
+        assert again.loc[0, "close"] == 100.5
+
+    def test_empty_response(self, market_data):
+        market_data.client.get_candles.return_value = _candles(0)
+        df = market_data.get_candles("ETH-USD", num_candles=50)
+        assert df.empty
+        assert df["timestamp"].dtype == "int64"
+        assert df["close"].dtype == "float64"
+
+    def test_long_window_fetches_all_chunks(self, market_data):
+        market_data.client.get_candles.side_effect = (
+            lambda pid, start, end, gran: _candles((end - start) // 3600, start=start)
+        )
+        df = market_data.get_candles("ETH-USD", num_candles=700)
+        assert market_data.client.get_candles.call_count == 4  # 3 closed chunks + in-progress candle
+        assert df["timestamp"].is_monotonic_increasing
+        assert df["timestamp"].is_unique
+
+
+class TestGetCandlesMulti:
+    def test_fetches_each_product(self, market_data):
+        frames = market_data.get_candles_multi(["ETH-USD", "SOL-USD"], num_candles=50)
+        assert list(frames) == ["ETH-USD", "SOL-USD"]
+        assert all(len(df) == 50 for df in frames.values())
+        assert market_data.client.get_candles.call_count == 4  # closed + in-progress, per product
+
+    def test_failed_product_left_out(self, market_data):
+        def get_candles(pid, start, end, gran):
+            if pid == "SOL-USD":
+                raise ConnectionError("timeout")
+            return _candles(50)
+        market_data.client.get_candles.side_effect = get_candles
+        assert list(market_data.get_candles_multi(["ETH-USD", "SOL-USD"], num_candles=50)) == ["ETH-USD"]
+
+
+class TestCandleFeedSource:
+    def test_feed_serves_seeded_products(self, market_data):
+        market_data.candle_feed = CandleFeed(["ETH-USD"], maxlen=50)
+        first = market_data.get_candles_multi(["ETH-USD"], granularity="FIVE_MINUTE", num_candles=50)
+        again = market_data.get_candles_multi(["ETH-USD"], granularity="FIVE_MINUTE", num_candles=50)
+        assert market_data.client.get_candles.call_count == 2  # REST only to seed
+        pd.testing.assert_frame_equal(again["ETH-USD"], first["ETH-USD"])
+
+    def test_other_granularities_use_rest(self, market_data):
+        market_data.candle_feed = CandleFeed(["ETH-USD"], maxlen=50)
+        market_data.get_candles_multi(["ETH-USD"], granularity="ONE_HOUR", num_candles=50)
+        assert market_data.candle_feed.get_candles("ETH-USD", 50) is None
+
+
+class TestDedupeCandles:
+    def test_keeps_last_duplicate_and_sorts(self):
+        df = pd.concat([_candles(3, start=200, step=100), _candles(3, start=0, step=100)],
+                       ignore_index=True)
+        df.loc[0, "close"] = 111.0  # timestamp 200, repeated by the second frame
+        out = dedupe_candles(df)
+        assert out["timestamp"].tolist() == [0, 100, 200, 300, 400]
+        assert out.loc[out["timestamp"] == 200, "close"].item() == 100.5
+        assert out.index.tolist() == list(range(5))
+
+
+class TestGetCurrentPrices:
+    def test_prices_from_one_call(self, market_data):
+        market_data.client.get_products.return_value = {
+            "ETH-USD": {"price": "2000.5"}, "SOL-USD": {"price": "150"},
+        }
+        assert market_data.get_current_prices(["ETH-USD", "SOL-USD"]) == {"ETH-USD": 2000.5, "SOL-USD": 150.0}
+        assert market_data.client.get_products.call_count == 1
+
+    def test_ticker_feed_prices_skip_rest(self, market_data):
+        market_data.ticker_feed = TickerFeed(["ETH-USD", "SOL-USD"])
+        market_data.ticker_feed.on_message(orjson.dumps({
+            "channel": "ticker",
+            "events": [{"tickers": [{"product_id": "ETH-USD", "price": "2001"}]}],
+        }).decode())
+        market_data.client.get_products.return_value = {"SOL-USD": {"price": "150"}}
+        prices = market_data.get_current_prices(["ETH-USD", "SOL-USD"])
+        assert prices == {"ETH-USD": 2001.0, "SOL-USD": 150.0}
+        market_data.client.get_products.assert_called_once_with(["SOL-USD"], max_age=1.0)
@@ -4,6 +4,8 @@ import pytest
 
 from src.portfolio.portfolio_manager import PortfolioManager
 
+pytestmark = pytest.mark.unit
+
 
 class TestPortfolioManager:
     def _make_pm(self, capital=300.0):
@@ -24,6 +26,11 @@ class TestPortfolioManager:
         assert pm.capital > 294.0  # got back more than cost
         assert pm.open_position_count == 0
 
+    def test_closed_trade_keeps_trade_id(self):
+        pm = self._make_pm(300.0)
+        pm.open_position("ETH-USD", 2000.0, 0.003, 6.0, 1950.0, 2080.0).trade_id = 7
+        assert pm.close_position("ETH-USD", 2100.0, "take_profit").trade_id == 7
+
     def test_close_nonexistent_returns_none(self):
         pm = self._make_pm()
         result = pm.close_position("FAKE-USD", 100.0, "test")
@@ -37,6 +44,14 @@ class TestPortfolioManager:
         assert pm.loss_count == 0
         assert pm.total_pnl > 0
 
+    def test_running_totals(self):
+        pm = self._make_pm(300.0)
+        for exit_price in (104.0, 97.5, 100.0, 110.0):
+            pm.open_position("ETH-USD", 100.0, 0.06, 6.0, 97.5, 104.0)
+            pm.close_position("ETH-USD", exit_price, "signal")
+        assert (pm.win_count, pm.loss_count) == (2, 2)
+        assert pm.total_pnl == pytest.approx(sum(t.pnl for t in pm.closed_trades))
+
     def test_multiple_positions(self):
         pm = self._make_pm(300.0)
         pm.open_position("ETH-USD", 2000.0, 0.003, 6.0, 1950.0, 2080.0)
@@ -51,6 +66,17 @@ class TestPortfolioManager:
         pnl = pm.unrealized_pnl({"ETH-USD": 2100.0})
         assert pnl > 0
 
+    def test_unrealized_pnl_after_close_marks_unpriced_at_entry(self):
+        pm = self._make_pm(300.0)
+        pm.open_position("ETH-USD", 100.0, 0.1, 10.0, 97.0, 104.0)
+        pm.open_position("SOL-USD", 50.0, 0.2, 10.0, 48.0, 52.0)
+        pm.open_position("ADA-USD", 1.0, 5.0, 5.0, 0.9, 1.1)
+        pm.close_position("ETH-USD", 100.0, "signal")
+        # ADA is unpriced and marked at entry
+        assert pm.unrealized_pnl({"SOL-USD": 55.0}) == pytest.approx(1.0)
+        assert pm.unrealized_pnl({"ADA-USD": 1.2, "SOL-USD": 50.0}) == pytest.approx(1.0)
+        assert pm.unrealized_pnl({}) == 0.0
+
     def test_summary(self):
         pm = self._make_pm(300.0)
         pm.open_position("ETH-USD", 100.0, 0.06, 6.0, 97.5, 104.0)
@@ -0,0 +1,60 @@
+"""Tests for the shared API rate limiter."""
+
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from requests.exceptions import HTTPError
+
+from src.api.rate_limiter import RateLimiter, call_with_backoff
+
+
+def _http_error(status: int, headers: dict | None = None) -> HTTPError:
+    response = MagicMock()
+    response.status_code = status
+    response.headers = headers or {}
+    return HTTPError(f"{status} Client Error", response=response)
+
+
+class TestRateLimiter:
+    def test_spaces_request_starts(self):
+        limiter = RateLimiter(max_concurrent=4, min_interval=0.02)
+        start = time.monotonic()
+        for _ in range(4):
+            with limiter:
+                pass
+        # Three gaps of 20ms between four starts
+        assert time.monotonic() - start >= 0.06
+
+    def test_releases_slot_on_error(self):
+        limiter = RateLimiter(max_concurrent=1, min_interval=0)
+        with pytest.raises(ValueError):
+            with limiter:
+                raise ValueError("boom")
+        with limiter:  # would block forever if the slot leaked
+            pass
+
+
+class TestCallWithBackoff:
+    def test_retries_on_429(self):
+        fn = MagicMock(side_effect=[_http_error(429), _http_error(429), "ok"])
+        assert call_with_backoff(fn, "ETH-USD", base_delay=0.001) == "ok"
+        assert fn.call_count == 3
+
+    def test_other_errors_not_retried(self):
+        fn = MagicMock(side_effect=_http_error(500))
+        with pytest.raises(HTTPError):
+            call_with_backoff(fn, base_delay=0.001)
+        assert fn.call_count == 1
+
+    def test_gives_up_after_max_retries(self):
+        fn = MagicMock(side_effect=_http_error(429))
+        with pytest.raises(HTTPError):
+            call_with_backoff(fn, max_retries=2, base_delay=0.001)
+        assert fn.call_count == 3
+
+    def test_honors_retry_after(self):
+        fn = MagicMock(side_effect=[_http_error(429, {"Retry-After": "0.05"}), "ok"])
+        start = time.monotonic()
+        assert call_with_backoff(fn, base_delay=0.001) == "ok"
+        assert time.monotonic() - start >= 0.05
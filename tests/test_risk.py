@@ -1,12 +1,38 @@
 """Tests for risk management."""
 
+from datetime import date, datetime
+from types import SimpleNamespace
+
 import pytest
 
 from src.portfolio.protected_assets import ProtectedAssetError, ProtectedAssets
+from src.risk import risk_manager
 from src.risk.position_sizer import PositionSizer
 from src.risk.risk_manager import RiskManager
 from src.risk.stop_loss import StopLossManager
 
+pytestmark = pytest.mark.unit
+
+# Base configs; the managers only read them, so tests share one dict each
+RISK_CONFIG = {
+    "risk": {
+        "max_open_positions": 3,
+        "daily_loss_limit_pct": 0.05,
+        "daily_loss_limit_usd": 15.0,
+    },
+    "capital": {"initial_usd": 300.0},
+    "protected_assets": ["SHIB", "BTC"],
+}
+
+STOP_LOSS_CONFIG = {
+    "risk": {
+        "stop_loss_pct": 0.025,
+        "take_profit_pct": 0.04,
+        "trailing_stop_activate_pct": 0.03,
+        "trailing_stop_distance_pct": 0.015,
+    }
+}
+
 
 class TestProtectedAssets:
     def test_shib_is_protected(self):
@@ -48,18 +74,32 @@ class TestPositionSizer:
         assert r2["usd_amount"] == r1["usd_amount"] * 2
 
 
+@pytest.fixture
+def clock(monkeypatch):
+    """Local wall clock seen by risk_manager (date.today() and time.time())."""
+    class Clock:
+        now = datetime(2026, 1, 1)
+
+        def set(self, now: datetime):
+            self.now = now
+
+    clock = Clock()
+
+    class FakeDate(date):
+        @classmethod
+        def today(cls):
+            return clock.now.date()
+
+    monkeypatch.setattr(risk_manager, "date", FakeDate)
+    monkeypatch.setattr(risk_manager, "time", SimpleNamespace(time=lambda: clock.now.timestamp()))
+    return clock
+
+
 class TestRiskManager:
     def _make_rm(self, **overrides):
-        config = {
-            "risk": {
-                "max_open_positions": 3,
-                "daily_loss_limit_pct": 0.05,
-                "daily_loss_limit_usd": 15.0,
-            },
-            "capital": {"initial_usd": 300.0},
-            "protected_assets": ["SHIB", "BTC"],
-        }
-        config["risk"].update(overrides)
+        config = RISK_CONFIG
+        if overrides:
+            config = {**RISK_CONFIG, "risk": {**RISK_CONFIG["risk"], **overrides}}
         pa = ProtectedAssets(config)
         return RiskManager(config, pa)
 
@@ -98,18 +138,28 @@ class TestRiskManager:
         rm.record_loss(7.0)
         assert rm.is_paused
 
+    def test_resets_after_midnight(self, clock):
+        clock.set(datetime(2026, 3, 10, 12, 0))
+        rm = self._make_rm(daily_loss_limit_usd=10.0)
+        rm.record_loss(11.0)
+        assert rm.is_paused
+
+        clock.set(datetime(2026, 3, 10, 23, 59))
+        assert rm.is_paused
+
+        clock.set(datetime(2026, 3, 11, 0, 1))
+        assert not rm.is_paused
+        assert rm.daily_loss == 0.0
+
+        # The next day's limit applies from scratch, and resets again after midnight
+        rm.record_loss(11.0)
+        assert rm.is_paused
+        clock.set(datetime(2026, 3, 12, 0, 0))
+        assert not rm.is_paused
 
 class TestStopLossManager:
     def _make_slm(self):
-        config = {
-            "risk": {
-                "stop_loss_pct": 0.025,
-                "take_profit_pct": 0.04,
-                "trailing_stop_activate_pct": 0.03,
-                "trailing_stop_distance_pct": 0.015,
-            }
-        }
-        return StopLossManager(config)
+        return StopLossManager(STOP_LOSS_CONFIG)
 
     def test_stop_loss_triggered(self):
         slm = self._make_slm()
@@ -143,3 +193,31 @@ class TestStopLossManager:
         assert slm.check("ETH-USD", 100.5) is None
         assert slm.check("ETH-USD", 99.0) is None
         assert slm.check("ETH-USD", 101.0) is None
+
+    def test_check_all_one_pass(self):
+        slm = self._make_slm()
+        slm.register("ETH-USD", 100.0, 97.5, 104.0)
+        slm.register("SOL-USD", 50.0, 48.0, 52.0)
+        slm.register("ADA-USD", 1.0, 0.9, 1.1)
+        exits = slm.check_all({"ETH-USD": 97.0, "SOL-USD": 52.5, "ADA-USD": 1.0})
+        assert exits == {"ETH-USD": "stop_loss", "SOL-USD": "take_profit"}
+
+    def test_check_all_skips_missing_price(self):
+        slm = self._make_slm()
+        slm.register("ETH-USD", 100.0, 97.5, 104.0)
+        assert slm.check_all({}) == {}
+        assert slm.get_state("ETH-USD").highest_price == 100.0
+
+    def test_slots_reused_and_grown(self):
+        slm = self._make_slm()
+        pids = [f"P{i}-USD" for i in range(20)]
+        for pid in pids:
+            slm.register(pid, 100.0, 97.5, 104.0)
+        slm.check("P0-USD", 103.1)
+        slm.unregister("P1-USD")
+        slm.register("NEW-USD", 10.0, 9.0, 11.0)
+        assert slm.get_state("P0-USD").trailing_active
+        assert not slm.get_state("NEW-USD").trailing_active
+        assert slm.get_state("P19-USD").entry_price == 100.0
+        assert slm.get_state("P1-USD") is None
+        assert len(slm.tracked_products) == 20
@@ -1,11 +1,12 @@
 """Tests for signal generation."""
 
 import numpy as np
-import pandas as pd
 import pytest
 
 from src.strategy.indicators import add_all_indicators
-from src.strategy.signal_generator import SignalGenerator, SignalType
+from src.strategy.signal_generator import (
+    SIGNAL_BUY, SIGNAL_HOLD, SIGNAL_SELL, SignalGenerator, SignalType,
+)
 
 
 def _default_config():
@@ -21,49 +22,40 @@ def _default_config():
     }
 
 
-def _make_df(prices, volumes=None):
-    n = len(prices)
-    return pd.DataFrame({
-        "timestamp": range(n),
-        "open": prices,
-        "high": [p * 1.01 for p in prices],
-        "low": [p * 0.99 for p in prices],
-        "close": prices,
-        "volume": volumes or [100.0] * n,
-    })
+@pytest.fixture(scope="module")
+def random_walk_with_indicators(make_df):
+    """100-bar random walk with indicator columns; shared, so tests must not modify it."""
+    rng = np.random.default_rng(42)
+    prices = np.cumsum(rng.standard_normal(100) * 0.5) + 100
+    return add_all_indicators(make_df(prices), _default_config())
 
 
 class TestSignalGenerator:
-    def test_hold_on_insufficient_data(self):
+    def test_hold_on_insufficient_data(self, make_df):
         config = _default_config()
         gen = SignalGenerator(config)
-        df = _make_df([100.0])
+        df = make_df([100.0])
         signal = gen.generate(df, "ETH-USD")
         assert signal.signal_type == SignalType.HOLD
 
-    def test_hold_on_mixed_signals(self):
+    def test_hold_on_mixed_signals(self, random_walk_with_indicators):
         """Flat market with no clear trend should produce HOLD."""
-        config = _default_config()
-        gen = SignalGenerator(config)
-        np.random.seed(42)
-        prices = list(np.cumsum(np.random.randn(100) * 0.2) + 100)
-        df = _make_df(prices)
-        df = add_all_indicators(df, config)
-        signal = gen.generate(df, "ETH-USD")
+        gen = SignalGenerator(_default_config())
+        signal = gen.generate(random_walk_with_indicators, "ETH-USD")
         # With random walk, likely HOLD
         assert signal.signal_type in (SignalType.HOLD, SignalType.BUY, SignalType.SELL)
         assert signal.product_id == "ETH-USD"
 
-    def test_buy_signal_has_stop_loss_and_take_profit(self):
+    def test_buy_signal_has_stop_loss_and_take_profit(self, make_df):
         """When a BUY signal fires, it should include SL and TP levels."""
         config = _default_config()
         config["strategy"]["min_confirmations"] = 1  # easier to trigger
         gen = SignalGenerator(config)
 
         # Strong downtrend then reversal with volume
-        prices = [200 - i * 2 for i in range(40)] + [120 + i * 3 for i in range(20)]
-        volumes = [100] * 55 + [300] * 5  # volume spike at end
-        df = _make_df(prices, volumes)
+        prices = np.concatenate([200.0 - 2.0 * np.arange(40), 120.0 + 3.0 * np.arange(20)])
+        volumes = np.where(np.arange(60) < 55, 100.0, 300.0)  # volume spike at end
+        df = make_df(prices, volumes)
         df = add_all_indicators(df, config)
         signal = gen.generate(df, "SOL-USD")
 
@@ -73,15 +65,26 @@ class TestSignalGenerator:
             assert signal.stop_loss < signal.price
             assert signal.confidence > 0
 
-    def test_signal_respects_min_confirmations(self):
+    def test_signal_respects_min_confirmations(self, random_walk_with_indicators):
         """Signal should require min_confirmations indicators."""
         config = _default_config()
         config["strategy"]["min_confirmations"] = 4  # require all 4
         gen = SignalGenerator(config)
-        np.random.seed(42)
-        prices = list(np.cumsum(np.random.randn(100) * 0.5) + 100)
-        df = _make_df(prices)
-        df = add_all_indicators(df, config)
-        signal = gen.generate(df, "ETH-USD")
+        signal = gen.generate(random_walk_with_indicators, "ETH-USD")
         # Very hard to get 4 confirmations on random data → likely HOLD
         assert signal.signal_type == SignalType.HOLD
+
+    @pytest.mark.parametrize("min_confirmations", [1, 2, 3])
+    def test_precompute_signals_matches_generate(self, make_df, min_confirmations):
+        """Vectorized per-bar codes agree with generate() on every prefix."""
+        config = _default_config()
+        config["strategy"]["min_confirmations"] = min_confirmations
+        gen = SignalGenerator(config)
+        rng = np.random.default_rng(11)
+        prices = np.cumsum(rng.standard_normal(150)) + 100
+        volumes = rng.uniform(50, 300, 150)
+        df = add_all_indicators(make_df(prices, volumes), config)
+        codes = gen.precompute_signals(df)
+        to_code = {SignalType.BUY: SIGNAL_BUY, SignalType.SELL: SIGNAL_SELL, SignalType.HOLD: SIGNAL_HOLD}
+        expected = [to_code[gen.generate(df.iloc[:i + 1], "ETH-USD").signal_type] for i in range(len(df))]
+        assert codes.tolist() == expected
@@ -0,0 +1,47 @@
+"""Tests for the SMS queue-file notifier."""
+
+import pytest
+
+from src.notifications import sms_notifier
+from src.notifications.sms_notifier import SMSNotifier
+
+
+@pytest.fixture
+def notifier(tmp_path, monkeypatch):
+    monkeypatch.setattr(sms_notifier, "MSG_QUEUE", str(tmp_path / "sms_queue.txt"))
+    monkeypatch.setattr(sms_notifier, "_is_quiet_hours", lambda: False)
+    monkeypatch.setenv("SMS_PHONE_NUMBER", "+15550100")
+    return SMSNotifier()
+
+
+def _queued():
+    with open(sms_notifier.MSG_QUEUE) as f:
+        return f.read().splitlines()
+
+
+class TestSend:
+    def test_send_writes_one_line(self, notifier):
+        notifier.send("GRID BUY FILLED ETH-USD\nPrice: $2,000.0000")
+        assert _queued() == ["GRID BUY FILLED ETH-USD | Price: $2,000.0000"]
+
+    def test_send_async_written_by_flush(self, notifier):
+        for i in range(5):
+            notifier.send_async(f"fill {i}")
+        notifier.flush()
+        assert _queued() == [f"fill {i}" for i in range(5)]
+
+    def test_quiet_hours_suppress(self, notifier, monkeypatch):
+        monkeypatch.setattr(sms_notifier, "_is_quiet_hours", lambda: True)
+        notifier.send_async("muted")
+        notifier.flush()
+        notifier.send("also muted")
+        with pytest.raises(FileNotFoundError):
+            _queued()
+
+    def test_send_async_burst_is_one_write(self, notifier, monkeypatch):
+        writes = []
+        monkeypatch.setattr(notifier, "_append", writes.append)
+        for i in range(3):
+            notifier.send_async(f"fill {i}")
+        notifier.flush()
+        assert writes == [["fill 0\n", "fill 1\n", "fill 2\n"]]
@@ -0,0 +1,37 @@
+"""Tests for the websocket ticker price cache."""
+
+import orjson
+import pytest
+
+from src.api import ticker_feed
+from src.api.ticker_feed import TickerFeed
+
+
+def _message(*prices: tuple[str, float], channel: str = "ticker") -> str:
+    tickers = [{"type": "ticker", "product_id": pid, "price": str(price)} for pid, price in prices]
+    return orjson.dumps({"channel": channel, "events": [{"type": "update", "tickers": tickers}]}).decode()
+
+
+@pytest.fixture
+def feed():
+    return TickerFeed(["ETH-USD", "SOL-USD"])
+
+
+class TestTickerFeed:
+    def test_latest_price_wins(self, feed):
+        feed.on_message(_message(("ETH-USD", 2000.0), ("SOL-USD", 100.0)))
+        feed.on_message(_message(("ETH-USD", 2001.5)))
+        assert feed.get_prices(["ETH-USD", "SOL-USD"]) == {"ETH-USD": 2001.5, "SOL-USD": 100.0}
+
+    def test_unseen_product_left_out(self, feed):
+        feed.on_message(_message(("ETH-USD", 2000.0)))
+        assert feed.get_prices(["SOL-USD"]) == {}
+
+    def test_other_channels_ignored(self, feed):
+        feed.on_message(_message(("ETH-USD", 2000.0), channel="heartbeats"))
+        assert feed.get_prices(["ETH-USD"]) == {}
+
+    def test_stale_price_left_out(self, feed, monkeypatch):
+        feed.on_message(_message(("ETH-USD", 2000.0)))
+        monkeypatch.setattr(ticker_feed, "TICKER_STALE_SECONDS", -1.0)
+        assert feed.get_prices(["ETH-USD"]) == {}